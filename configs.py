@@ -14,11 +14,23 @@ class Config:
     # 海拔相关配置
     ELEVATION_THRESHOLD = 50  # 海拔阈值（米）
     ELEVATION_PENALTY_WEIGHT = 0.2  # 海拔惩罚权重
+    DEM_INTERPOLATION = 'nearest'  # DEM插值方式: 'nearest'(与原实现一致) 或 'bilinear'
 
     # 训练相关配置
     SEED = 42
     DRONE_NUM = 8  # 无人机库数量
     DRONE_RADIUS = 8000  # 无人机覆盖半径(米)
+    MAX_STEPS = 100  # 每个回合最大步数
+    
+    # 覆盖计算配置
+    COVERAGE_MODE = 'shapely'  # 区域覆盖计算方式: 'shapely'(精确多边形运算)、'raster'(栅格求和) 或 'candidates'(位置对齐到候选点后查预计算的覆盖矩阵)
+    RASTER_RESOLUTION = 200  # 栅格模式的栅格边长(米)
+    CANDIDATE_SPACING = 1000  # 候选点模式的候选点间距(米)
+    CANDIDATE_CELL_RESOLUTION = 500  # 候选点模式统计覆盖面积的栅格边长(米)
+    CANDIDATE_CACHE_DIR = os.path.join(DATA_PATH, 'cache')  # 候选点覆盖索引的缓存目录，为None时不保存
+    OVERLAP_MODE = 'shapely'  # 重叠面积计算方式: 'shapely'(多边形两两求交) 或 'analytic'(圆透镜面积解析公式)
+    OVERLAP_CLIP_TO_REGION = False  # 解析模式下是否用栅格掩膜只统计区域内的重叠面积
+    METRIC_CRS = 'auto'  # 奖励计算所用的米制坐标系，'auto'为区域所在的UTM分带，None时按1度≈111km的经纬度近似计算
     
     # PPO算法超参数
     GAMMA = 0.99  # 折扣因子
@@ -33,19 +45,35 @@ class Config:
     LEARNING_RATE = 3e-4  # 学习率
     
     # 训练过程配置
-    EPOCHS = 500  # 总训练轮次
-    BATCH_SIZE = 64  # 批大小
+    EPOCHS = 50  # 训练迭代次数，每次迭代收集NUM_STEPS步经验并更新一次
+    BATCH_SIZE = 64  # 小批次大小
     # NUM_STEPS = 2048  # 每轮收集的步数
-    NUM_STEPS = 1000  # 每轮收集的步数
-    NUM_MINI_BATCHES = 4  # 小批次数
+    NUM_STEPS = 1000  # 每次迭代收集的环境步数 (跨越回合边界，与MAX_STEPS无关)
+    PPO_EPOCHS = 4  # 每次更新对缓冲区完整遍历的轮数 (至少为1)，每轮按BATCH_SIZE划分全部经验
+    TARGET_KL = 0.02  # 一轮结束时近似KL散度超过该值则提前停止更新，为None时不提前停止
+    NUM_ENVS = 1  # 并行环境数量，大于1时使用VectorDroneEnvironment批量收集经验
+    NUM_WORKERS = 0  # 经验收集子进程数量，大于0时用RolloutPool在多个进程中运行NUM_ENVS个环境
+    ROLLOUT_POLICY = 'numpy'  # 经验收集时的策略推理方式，'numpy' 用NumpyPolicy权重快照，'torch' 直接调用PPO
     EVAL_INTERVAL = 10  # 评估间隔
-    SAVE_INTERVAL = 100  # 保存模型间隔
-    VISUAL_INTERVAL = 1  # 可视化间隔
+    SAVE_INTERVAL = 10  # 保存模型间隔 (迭代次数)
+    CHECKPOINT_KEEP = 5  # 定期保存的model_*.pth最多保留的数量，为None时全部保留
+    VISUAL_INTERVAL = 1  # 可视化间隔 (迭代次数)
+    VISUAL_WORKERS = 1  # 绘制训练快照的子进程数量，为0时在训练线程中同步绘制
+    VISUAL_QUEUE_SIZE = 2  # 等待绘制的快照数量上限，队列满时丢弃最早的快照
+    
+    # 经典选址求解器配置 (main.py --mode solve)
+    POI_POPULATION_WEIGHT = 0.5  # POI权重 = importance × (1 + 系数 × 人口/1000)，POI文件缺少这两列时权重都为1
+    MILP_SPACING = 2000  # 精确求解 (混合整数规划) 的候选点间距(米)
+    MILP_CELL_RESOLUTION = 2000  # 精确求解统计覆盖与重叠面积的栅格边长(米)
+    MILP_TIME_LIMIT = 60  # 精确求解的时间上限(秒)，超时时返回当前最好的解与对偶界
+    ANNEAL_TIME_BUDGET = 5  # 模拟退火优化的运行时间(秒)
+    ANNEAL_MOVE_PROB = 0.7  # 模拟退火中选择移动邻域 (换到附近候选点) 的概率，其余为交换邻域 (换到任意候选点)
     
     # 目录配置
     RESULT_DIR = 'result'
     MODEL_DIR = os.path.join(RESULT_DIR, 'models')
     VISUAL_DIR = os.path.join(RESULT_DIR, 'visuals')
+    SOLVE_DIR = os.path.join(RESULT_DIR, 'solve')
     
     # 设备配置
     DEVICE = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
@@ -54,4 +82,5 @@ class Config:
     @staticmethod
     def make_dirs():
         os.makedirs(Config.MODEL_DIR, exist_ok=True)
-        os.makedirs(Config.VISUAL_DIR, exist_ok=True) 
\ No newline at end of file
+        os.makedirs(Config.VISUAL_DIR, exist_ok=True)
+        os.makedirs(Config.SOLVE_DIR, exist_ok=True) 
\ No newline at end of file
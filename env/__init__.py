@@ -1 +1,3 @@
-from env.drone_env import DroneEnvironment 
\ No newline at end of file
+from env.drone_env import DroneEnvironment
+from env.vector_env import VectorDroneEnvironment
+from env.rollout_pool import RolloutPool
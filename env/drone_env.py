@@ -1,26 +1,66 @@
 import os
 import numpy as np
-import geopandas as gpd
-import pandas as pd
+import shapely
 from shapely.geometry import Point, Polygon, MultiPolygon
 import gymnasium as gym
 from gymnasium import spaces
-import rasterio
-from rasterio.warp import transform
-from rasterio.transform import Affine
-from pyproj import Transformer
+from reward.incremental import IncrementalCoverage
+from reward.overlap import pairwise_overlap
+from scenario.loader import Scenario
+
+def layout_min_distance(drone_radius):
+    """
+    初始布局中无人机库之间的最小间距
+
+    参数:
+        drone_radius: 无人机覆盖半径 (米)
+
+    返回:
+        min_distance: 最小间距 (度)，为覆盖半径的20%
+    """
+    return drone_radius / 111000 * 0.2
+
+
+def disperse_positions(positions, bounds, rng=None):
+    """
+    主动分散逻辑: 与前面某个库距离小于0.001度的库随机扰动一次并裁剪到区域边界框内
+
+    这是DroneEnvironment.step与VectorDroneEnvironment.step的状态转移，不使用动作。
+    依次处理每个库以保持先后依赖，对B个布局同时计算。
+
+    参数:
+        positions: 形状为(B, K, 2)的经纬度位置
+        bounds: 区域边界 (min_x, min_y, max_x, max_y)
+        rng: numpy随机数生成器，为None时使用全局np.random
+
+    返回:
+        new_positions: 分散后的位置
+    """
+    rng = np.random if rng is None else rng
+    new_positions = positions.copy()
+    low = np.array([bounds[0], bounds[1]], dtype=np.float32)
+    high = np.array([bounds[2], bounds[3]], dtype=np.float32)
+    for i in range(1, positions.shape[1]):
+        distance = np.linalg.norm(new_positions[:, i:i + 1] - new_positions[:, :i], axis=-1)
+        too_close = (distance < 0.001).any(axis=1)
+        if too_close.any():
+            noise = rng.uniform(-0.01, 0.01, size=(int(too_close.sum()), 2))
+            new_positions[too_close, i] = np.clip(new_positions[too_close, i] + noise, low, high)
+    return new_positions
+
 
 class DroneEnvironment(gym.Env):
     """
     无人机库选址环境
     """
     
-    def __init__(self, config):
+    def __init__(self, config, scenario=None):
         """
         初始化环境
         
         参数:
             config: 配置类实例
+            scenario: 已加载的Scenario实例，为None时按配置从文件加载
         """
         super(DroneEnvironment, self).__init__()
         
@@ -30,37 +70,60 @@ class DroneEnvironment(gym.Env):
         self.elevation_threshold = config.ELEVATION_THRESHOLD
         self.elevation_penalty_weight = config.ELEVATION_PENALTY_WEIGHT
         
-        # 加载区域边界数据 (GCJ-02坐标系)
-        print(f"加载区域数据: {config.REGION_FILE}")
-        self.region_gdf = gpd.read_file(config.REGION_FILE)
-        self.region_geometry = self.region_gdf.geometry.iloc[0]
-        
-        # 获取区域边界的坐标范围
-        self.bounds = self.region_geometry.bounds  # (min_x, min_y, max_x, max_y)
-        print(f"区域边界: {self.bounds}")
-        
-        # 加载POI数据 (GCJ-02坐标系)
-        print(f"加载POI数据: {config.POI_FILE}")
-        self.poi_df = pd.read_csv(config.POI_FILE)
-        self.poi_gdf = gpd.GeoDataFrame(
-            self.poi_df, 
-            geometry=gpd.points_from_xy(self.poi_df.longitude, self.poi_df.latitude),
-            crs="EPSG:4326"  # 假设为WGS84，但实际数据为GCJ-02
-        )
-        print(f"加载POI点数量: {len(self.poi_gdf)}")
-        
-        # 加载DEM数据
-        print(f"加载DEM数据: {config.DEM_FILE}")
-        try:
-            self.dem_data = rasterio.open(config.DEM_FILE)
-            print(f"DEM数据加载成功，形状: {self.dem_data.shape}, CRS: {self.dem_data.crs}")
-            
-            # 创建坐标转换器 (GCJ-02 -> EPSG:4326，因为DEM通常是WGS84)
-            self.transformer = Transformer.from_crs("EPSG:4326", self.dem_data.crs.to_string(), always_xy=True)
-        except Exception as e:
-            print(f"加载DEM数据失败: {e}")
-            self.dem_data = None
-            self.transformer = None
+        # 加载区域边界、POI与DEM数据 (GCJ-02坐标系)，多个环境可共享同一份场景
+        self.scenario = scenario if scenario is not None else Scenario.from_config(config)
+        self.region_gdf = self.scenario.region_gdf
+        self.region_geometry = self.scenario.region_geometry
+        self.region_index = self.scenario.region_index
+        self.region_sampler = self.scenario.region_sampler()
+        self.bounds = self.scenario.bounds  # (min_x, min_y, max_x, max_y)
+        self.poi_df = self.scenario.poi_df
+        self.poi_gdf = self.scenario.poi_gdf
+        self.poi_kernel = self.scenario.poi_kernel
+        self.elevation_grid = self.scenario.elevation_grid
+        
+        # 奖励计算所用的场景: METRIC_CRS不为None时区域、POI与DEM已一次性投影到米制坐标系，
+        # 覆盖范围是真实的圆，奖励计算全部以米为单位；否则沿用1度≈111km的经纬度近似
+        self.reward_scenario = self.scenario.for_reward(config)
+        self.reward_index = self.reward_scenario.region_index
+        self.reward_poi_kernel = self.reward_scenario.poi_kernel
+        self.reward_radius = self.drone_radius * self.reward_scenario.units_per_metre
+        
+        # 栅格覆盖模式: 预计算区域掩膜与栅格面积，每步用栅格求和代替多边形运算
+        self.coverage_mode = config.COVERAGE_MODE
+        self.overlap_mode = config.OVERLAP_MODE
+        self.raster_coverage = None
+        if self.coverage_mode == 'raster' or (self.overlap_mode == 'analytic' and config.OVERLAP_CLIP_TO_REGION):
+            self.raster_coverage = self.reward_scenario.raster_coverage(
+                config.RASTER_RESOLUTION * self.reward_scenario.units_per_metre,
+                self.reward_radius
+            )
+            print(f"栅格覆盖模式: 分辨率{config.RASTER_RESOLUTION}米, 栅格大小{self.raster_coverage.counts.shape}")
+        
+        # 解析重叠模式下是否用栅格掩膜把重叠面积裁剪到区域内
+        self.overlap_raster = self.raster_coverage if config.OVERLAP_CLIP_TO_REGION else None
+        
+        # 候选点模式: 位置对齐到最近的候选点，覆盖面积、重叠面积与POI覆盖都从预计算的稀疏矩阵中查出
+        self.candidate_index = None
+        if self.coverage_mode == 'candidates':
+            units = self.reward_scenario.units_per_metre
+            self.candidate_index = self.reward_scenario.candidate_index(
+                config.CANDIDATE_SPACING * units,
+                self.reward_radius,
+                config.CANDIDATE_CELL_RESOLUTION * units,
+                config.CANDIDATE_CACHE_DIR
+            )
+        
+        # 栅格模式下保存增量覆盖状态，每步只更新坐标发生变化的无人机库
+        self.coverage_state = None
+        if self.coverage_mode == 'raster':
+            self.coverage_state = IncrementalCoverage(
+                self.reward_poi_kernel,
+                self.raster_coverage,
+                self.reward_radius,
+                overlap_mode='analytic' if self.overlap_mode == 'analytic' else 'raster',
+                overlap_raster=self.overlap_raster
+            )
         
         # 初始化动作空间和观察空间
         # 动作空间: 8个无人机库的坐标 (每个库2个坐标值)
@@ -82,7 +145,7 @@ class DroneEnvironment(gym.Env):
         # 初始化状态
         self.state = None
         self.current_step = 0
-        self.max_steps = 100  # 每个回合最大步数
+        self.max_steps = config.MAX_STEPS  # 每个回合最大步数
         
         print(f"环境初始化完成，无人机数量: {self.drone_num}, 无人机覆盖半径: {self.drone_radius}米")
         
@@ -105,11 +168,10 @@ class DroneEnvironment(gym.Env):
         # 验证生成的位置
         positions_2d = positions.reshape(-1, 2)
         print(f"重置环境，生成{len(positions_2d)}个无人机位置")
-        in_region_count = 0
+        inside = self.region_index.contains(positions_2d)
+        in_region_count = int(inside.sum())
         for i, pos in enumerate(positions_2d):
-            point = Point(pos[0], pos[1])
-            if self.region_geometry.contains(point):
-                in_region_count += 1
+            if inside[i]:
                 print(f"  无人机 {i+1}: 经度={pos[0]:.6f}, 纬度={pos[1]:.6f} (在区域内)")
             else:
                 print(f"  无人机 {i+1}: 经度={pos[0]:.6f}, 纬度={pos[1]:.6f} (在区域外!)")
@@ -119,6 +181,8 @@ class DroneEnvironment(gym.Env):
         
         self.state = positions
         self.current_step = 0
+        if self.coverage_state is not None:
+            self.coverage_state.reset(self.reward_scenario.from_lonlat(positions.reshape(-1, 2)))
         
         info = {}
         return self.state, info
@@ -128,7 +192,7 @@ class DroneEnvironment(gym.Env):
         执行一步动作
         
         参数:
-            action: 更新后的无人机库位置坐标
+            action: 更新后的无人机库位置坐标 (目前不参与状态转移，位置只按disperse_positions的主动分散逻辑更新)
             
         返回:
             observation: 新的状态
@@ -139,47 +203,14 @@ class DroneEnvironment(gym.Env):
         """
         self.current_step += 1
         
-        # 将当前状态和动作重塑为n个无人机的坐标
-        action_reshaped = action.reshape(-1, 2)
-        current_state = self.state.reshape(-1, 2)
-        
-        # 探索参数
-        exploration_noise = max(0.1, 0.5 * (1 - self.current_step / self.max_steps))  # 递减的探索噪声
-        step_size = 0.005  # 每步动作的最大变化幅度（经纬度单位）
-        
-        # 创建新的状态数组，用于增量更新
-        new_state = np.copy(current_state)
-        
-        # 修改后的主动分散逻辑
-        for i in range(len(new_state)):
-            for j in range(i):
-                if np.linalg.norm(new_state[i] - new_state[j]) < 0.001:
-                    # 添加扰动
-                    new_state[i, 0] += np.random.uniform(-0.01, 0.01)
-                    new_state[i, 1] += np.random.uniform(-0.01, 0.01)
-                    
-                    # ✅ 强制裁剪（使用 np.clip 的精确计算）
-                    new_state[i, 0] = np.clip(
-                        new_state[i, 0], 
-                        np.float32(self.bounds[0]),  # 保持数据类型一致
-                        np.float32(self.bounds[2])
-                    )
-                    new_state[i, 1] = np.clip(
-                        new_state[i, 1],
-                        np.float32(self.bounds[1]),
-                        np.float32(self.bounds[3])
-                    )
-                    break
+        # 当前状态重塑为n个无人机的坐标，按主动分散逻辑更新 (动作目前不参与状态转移)
+        new_state = disperse_positions(self.state.reshape(1, -1, 2), self.bounds)[0]
         
         # 将处理后的状态重新展平
         self.state = new_state.flatten()
         
         # 检查是否所有点都有效
-        valid_positions = 0
-        for pos in new_state:
-            point = Point(pos[0], pos[1])
-            if self.region_geometry.contains(point):
-                valid_positions += 1
+        valid_positions = int(self.region_index.contains(new_state).sum())
         
         if valid_positions == 0:
             print("严重警告: 所有无人机点都在区域外，重新生成随机点")
@@ -201,28 +232,10 @@ class DroneEnvironment(gym.Env):
         返回:
             positions: 无人机库位置坐标数组
         """
-        positions = []
-        min_distance_degree = self.drone_radius / 111000 * 0.2  # 最小距离为无人机半径的20%，转为度
-        
-        # 获取区域内的随机点的备选方法
-        def get_random_point_in_region(max_attempts=100):
-            # 方法1: 边界框采样
-            for _ in range(max_attempts):
-                x = np.random.uniform(self.bounds[0], self.bounds[2])
-                y = np.random.uniform(self.bounds[1], self.bounds[3])
-                point = Point(x, y)
-                if self.region_geometry.contains(point):
-                    return [x, y]
-                
-            # 方法2: 如果方法1失败，使用区域质心，并添加小扰动
-            centroid = self.region_geometry.centroid
-            return [
-                centroid.x + np.random.uniform(-0.01, 0.01),
-                centroid.y + np.random.uniform(-0.01, 0.01)
-            ]
+        min_distance_degree = layout_min_distance(self.drone_radius)  # 最小距离为无人机半径的20%，转为度
         
         # 确保空间足够放置所有无人机
-        region_area = self.region_geometry.area
+        region_area = self.region_sampler.area
         min_area_needed = self.drone_num * (np.pi * min_distance_degree**2)
         if region_area < min_area_needed:
             print(f"警告: 区域面积({region_area:.6f})可能不足以放置{self.drone_num}个无人机(最小所需面积:{min_area_needed:.6f})")
@@ -230,45 +243,16 @@ class DroneEnvironment(gym.Env):
             min_distance_degree *= 0.5
             print(f"降低最小距离要求为: {min_distance_degree * 111000:.0f}米")
         
-        # 尝试生成无人机位置
-        max_placement_attempts = 30  # 每个无人机的最大尝试次数
-        print(f"开始生成{self.drone_num}个无人机位置，最小间距: {min_distance_degree * 111000:.0f}米")
+        # 在区域的三角剖分上均匀采样候选点，并用背景网格保证最小间距
+        positions = self.region_sampler.sample_spaced(self.drone_num, min_distance_degree)
         
-        for i in range(self.drone_num):
-            point_added = False
-            attempts = 0
-            
-            while not point_added and attempts < max_placement_attempts:
-                # 获取随机点
-                candidate = get_random_point_in_region()
-                
-                # 检查与现有点的最小距离
-                too_close = False
-                for j in range(0, len(positions), 2):
-                    distance = np.sqrt(
-                        (candidate[0] - positions[j])**2 + 
-                        (candidate[1] - positions[j+1])**2
-                    )
-                    if distance < min_distance_degree:
-                        too_close = True
-                        break
-                
-                if not too_close:
-                    positions.extend(candidate)
-                    point_added = True
-                    print(f"  成功放置无人机 {i+1}: 经度={candidate[0]:.6f}, 纬度={candidate[1]:.6f}")
-                
-                attempts += 1
-            
-            # 如果经过多次尝试还是没有成功，就忽略最小距离限制
-            if not point_added:
-                print(f"警告: 无人机 {i+1} 无法满足最小距离要求，忽略距离限制")
-                candidate = get_random_point_in_region()
-                positions.extend(candidate)
-                print(f"  放置无人机 {i+1}: 经度={candidate[0]:.6f}, 纬度={candidate[1]:.6f}")
-        
-        print(f"成功生成{len(positions)//2}个无人机位置")
-        return np.array(positions, dtype=np.float32)
+        # 如果无法满足最小距离要求，剩余的无人机忽略距离限制
+        if len(positions) < self.drone_num:
+            print(f"警告: 只有{len(positions)}个无人机满足最小距离要求，其余忽略距离限制")
+            positions = np.vstack([positions, self.region_sampler.sample(self.drone_num - len(positions))])
+        
+        print(f"成功生成{len(positions)}个无人机位置，最小间距: {min_distance_degree * 111000:.0f}米")
+        return positions.reshape(-1).astype(np.float32)
     
     def _get_elevation(self, lon, lat):
         """
@@ -281,28 +265,40 @@ class DroneEnvironment(gym.Env):
         返回:
             elevation: 海拔高度 (米)，如果无法获取则返回0
         """
-        if self.dem_data is None:
-            return 0
+        return float(self._get_elevations([[lon, lat]])[0])
+    
+    def _get_elevations(self, positions):
+        """
+        批量获取无人机库位置的海拔高度
         
-        try:
-            # 转换坐标 (GCJ-02 -> DEM的坐标系统)
-            x, y = self.transformer.transform(lon, lat)
+        参数:
+            positions: 形状为(N, 2)的经纬度数组
             
-            # 将坐标转换为像素索引
-            row, col = self.dem_data.index(x, y)
+        返回:
+            elevations: 形状为(N,)的海拔数组 (米)，无法获取的位置为0
+        """
+        positions = np.asarray(positions).reshape(-1, 2)
+        return self._sample_elevations(self.reward_scenario.from_lonlat(positions))
+    
+    def _sample_elevations(self, reward_positions):
+        """
+        在奖励场景的坐标系中批量查询海拔高度
+        
+        参数:
+            reward_positions: 形状为(N, 2)的奖励场景坐标
             
-            # 读取高程值
-            if 0 <= row < self.dem_data.height and 0 <= col < self.dem_data.width:
-                elevation = self.dem_data.read(1)[row, col]
-                # 检查是否为NODATA
-                if elevation == self.dem_data.nodata:
-                    return 0
-                return float(elevation)
-            else:
-                return 0
+        返回:
+            elevations: 形状为(N,)的海拔数组 (米)，无法获取的位置为0
+        """
+        elevation_grid = self.reward_scenario.elevation_grid
+        if elevation_grid is None:
+            return np.zeros(len(reward_positions))
+        
+        try:
+            return elevation_grid.sample(reward_positions)
         except Exception as e:
             print(f"获取海拔高度时出错: {e}")
-            return 0
+            return np.zeros(len(reward_positions))
     
     def _compute_reward(self):
         """
@@ -314,84 +310,87 @@ class DroneEnvironment(gym.Env):
         """
         # 重塑状态为无人机库坐标列表
         drone_positions = self.state.reshape(-1, 2)
+        # 转换到奖励场景的坐标系 (米制或经纬度)，之后的计算都在该坐标系中进行
+        reward_positions = self.reward_scenario.from_lonlat(drone_positions)
         
-        # 构建无人机库的点
-        drone_points = []
-        # 存储无人机海拔高度
-        drone_elevations = []
-        
-        for pos in drone_positions:
-            point = Point(pos[0], pos[1])
-            drone_points.append(point)
-            # 获取无人机位置的海拔高度
-            elevation = self._get_elevation(pos[0], pos[1])
-            drone_elevations.append(elevation)
+        # 批量获取无人机位置的海拔高度
+        drone_elevations = self._sample_elevations(reward_positions).tolist()
         
         try:
             # 检查无人机库是否都在区域内
-            for i, point in enumerate(drone_points):
-                if not self.region_geometry.contains(point):
-                    print(f"警告: 无人机 {i+1} 不在区域边界内，坐标: {point.x}, {point.y}")
-                    print(f"  区域边界: {self.bounds}")
-            
-            # 计算每个无人机库的覆盖范围 (buffer) - 注意单位转换
-            # GCJ-02坐标是经纬度，约1度=111km，所以需要将米转为度
-            drone_radius_degree = self.drone_radius / 111000  # 转换为度
-            drone_buffers = [point.buffer(drone_radius_degree) for point in drone_points]
+            inside, outside_distance = self.reward_index.locate(reward_positions)
+            for i in np.flatnonzero(~inside):
+                print(f"警告: 无人机 {i+1} 不在区域边界内，坐标: {drone_positions[i, 0]}, {drone_positions[i, 1]}, "
+                      f"距区域边界约{outside_distance[i] / self.reward_scenario.units_per_metre:.0f}米")
+                print(f"  区域边界: {self.bounds}")
             
-            # 合并所有覆盖范围
-            merged_buffer = None
-            if drone_buffers:
-                merged_buffer = drone_buffers[0]
-                for buffer in drone_buffers[1:]:
-                    merged_buffer = merged_buffer.union(buffer)
+            # 覆盖半径已换算为奖励场景的坐标单位
+            radius = self.reward_radius
+            region_area = self.reward_index.area
             
-            # 计算覆盖重叠度
-            overlap_area = 0
-            for i in range(len(drone_buffers)):
-                for j in range(i + 1, len(drone_buffers)):
+            if self.coverage_mode == 'raster':
+                # 栅格模式: 增量更新覆盖计数，得到覆盖面积、重叠面积与POI覆盖数量
+                drone_buffers = None
+                merged_buffer = None
+                coverage_area, overlap_area, poi_covered = self.coverage_state.update(reward_positions)
+            elif self.coverage_mode == 'candidates':
+                # 候选点模式: 对齐到最近的候选点后查表
+                drone_buffers = None
+                merged_buffer = None
+                coverage_area, overlap_area, poi_covered = self.candidate_index.evaluate(reward_positions)
+            else:
+                drone_points = [Point(pos[0], pos[1]) for pos in reward_positions]
+                drone_buffers = [point.buffer(radius) for point in drone_points]
+                
+                # 合并所有覆盖范围
+                merged_buffer = None
+                if drone_buffers:
+                    merged_buffer = drone_buffers[0]
+                    for buffer in drone_buffers[1:]:
+                        merged_buffer = merged_buffer.union(buffer)
+                
+                # 计算覆盖重叠度
+                overlap_area = 0
+                if self.overlap_mode == 'shapely':
+                    for i in range(len(drone_buffers)):
+                        for j in range(i + 1, len(drone_buffers)):
+                            try:
+                                intersection = drone_buffers[i].intersection(drone_buffers[j])
+                                if not intersection.is_empty:
+                                    overlap_area += intersection.area
+                            except Exception as e:
+                                print(f"计算重叠区域时出错: {e}")
+                
+                # 计算与行政区域的交集面积
+                coverage_area = 0
+                
+                if merged_buffer and region_area > 0:
                     try:
-                        intersection = drone_buffers[i].intersection(drone_buffers[j])
-                        if not intersection.is_empty:
-                            overlap_area += intersection.area
+                        if isinstance(merged_buffer, MultiPolygon):
+                            coverage_area = sum(
+                                p.intersection(self.reward_scenario.region_geometry).area 
+                                for p in merged_buffer.geoms 
+                                if not p.is_empty
+                            )
+                        else:
+                            intersection = merged_buffer.intersection(self.reward_scenario.region_geometry)
+                            if not intersection.is_empty:
+                                coverage_area = intersection.area
                     except Exception as e:
-                        print(f"计算重叠区域时出错: {e}")
+                        print(f"计算有效覆盖区域时出错: {e}")
             
-            # 计算与行政区域的交集面积
-            region_area = self.region_geometry.area
-            coverage_area = 0
-            
-            if merged_buffer and region_area > 0:
-                try:
-                    if isinstance(merged_buffer, MultiPolygon):
-                        coverage_area = sum(
-                            p.intersection(self.region_geometry).area 
-                            for p in merged_buffer.geoms 
-                            if not p.is_empty
-                        )
-                    else:
-                        intersection = merged_buffer.intersection(self.region_geometry)
-                        if not intersection.is_empty:
-                            coverage_area = intersection.area
-                except Exception as e:
-                    print(f"计算有效覆盖区域时出错: {e}")
+            if self.overlap_mode == 'analytic' and self.coverage_state is None:
+                # 等半径圆的两两透镜面积有解析解，一次向量化计算全部圆对
+                overlap_area, _ = pairwise_overlap(reward_positions, radius, self.overlap_raster)
             
             # 计算覆盖率
             coverage_ratio = coverage_area / region_area if region_area > 0 else 0
             
-            # 计算POI覆盖率
-            poi_covered = 0
-            for _, poi in self.poi_gdf.iterrows():
-                poi_point = poi.geometry
-                for buffer in drone_buffers:
-                    try:
-                        if buffer.contains(poi_point):
-                            poi_covered += 1
-                            break
-                    except Exception as e:
-                        print(f"计算POI覆盖时出错: {e}")
+            # 计算POI覆盖率 (向量化的距离矩阵 + any归约)
+            if self.coverage_state is None and self.candidate_index is None:
+                poi_covered = self.reward_poi_kernel.count(reward_positions, radius)
             
-            poi_coverage_ratio = poi_covered / len(self.poi_gdf) if len(self.poi_gdf) > 0 else 0
+            poi_coverage_ratio = poi_covered / len(self.poi_kernel) if len(self.poi_kernel) > 0 else 0
             
             # 计算海拔惩罚
             elevation_penalty = 0
@@ -448,16 +447,60 @@ class DroneEnvironment(gym.Env):
             'area_coverage': coverage_ratio,
             'overlap_ratio': normalized_overlap,
             'poi_covered': poi_covered,
-            'total_poi': len(self.poi_gdf),
+            'total_poi': len(self.poi_kernel),
             'drone_positions': drone_positions,
-            'drone_buffers': drone_buffers if 'drone_buffers' in locals() else None,
-            'merged_buffer': merged_buffer if 'merged_buffer' in locals() else None,
             'drone_elevations': drone_elevations if 'drone_elevations' in locals() else [0] * len(drone_positions),
             'elevation_penalty': elevation_penalty if 'elevation_penalty' in locals() else 0
         }
         
         return reward, info
     
+    def render_info(self, info):
+        """
+        生成绘制用的信息: 在step返回的info上加入经纬度的覆盖范围
+        
+        覆盖圆在奖励场景的坐标系中生成 (有米制坐标系时为真实的圆) 再转换回经纬度。
+        只在实际绘制时调用，训练中每步不再把覆盖多边形转换回经纬度。
+        
+        参数:
+            info: step返回的信息
+            
+        返回:
+            info: 增加了drone_buffers (各库的覆盖范围) 与merged_buffer (合并的覆盖范围) 的信息副本
+        """
+        reward_positions = self.reward_scenario.from_lonlat(np.asarray(info['drone_positions']).reshape(-1, 2))
+        # 与Point.buffer相同的分段数
+        buffers = shapely.buffer(shapely.points(reward_positions), self.reward_radius, quad_segs=16)
+        info = dict(info)
+        info['drone_buffers'] = list(self.reward_scenario.to_lonlat_geometry(buffers))
+        info['merged_buffer'] = self.reward_scenario.to_lonlat_geometry(shapely.union_all(buffers))
+        return info
+    
+    def get_state(self):
+        """
+        返回环境的可恢复状态 (用于断点续训)
+        
+        返回:
+            state: 包含当前位置、步数与增量覆盖状态的字典
+        """
+        return {
+            'state': None if self.state is None else self.state.copy(),
+            'current_step': self.current_step,
+            'coverage_state': self.coverage_state.get_state() if self.coverage_state is not None else None
+        }
+    
+    def set_state(self, state):
+        """
+        恢复get_state返回的状态
+        
+        参数:
+            state: get_state返回的字典
+        """
+        self.state = None if state['state'] is None else state['state'].copy()
+        self.current_step = state['current_step']
+        if self.coverage_state is not None and state['coverage_state'] is not None:
+            self.coverage_state.set_state(state['coverage_state'])
+    
     def render(self):
         """
         渲染环境 (用于可视化)
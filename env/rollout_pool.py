@@ -0,0 +1,317 @@
+import time
+import traceback
+import types
+import multiprocessing as mp
+import numpy as np
+from env.vector_env import VectorDroneEnvironment
+from scenario.loader import Scenario
+from scenario.shared_memory import SharedArray, SharedScenario
+
+
+# 通过共享缓冲区返回的逐环境信息字段: (名称, 每个环境的形状, 类型)
+INFO_FIELDS = [
+    ('poi_coverage', (), np.float64),
+    ('area_coverage', (), np.float64),
+    ('overlap_ratio', (), np.float64),
+    ('poi_covered', (), np.int64),
+    ('total_poi', (), np.int64),
+    ('elevation_penalty', (), np.float64),
+    ('drone_elevations', ('drone_num',), np.float64),
+    ('drone_positions', ('drone_num', 2), np.float32),
+]
+
+
+def config_values(config):
+    """
+    提取配置中的普通数值，子进程不需要导入torch即可使用
+
+    参数:
+        config: 配置类实例
+
+    返回:
+        values: 只包含大写配置项 (不含DEVICE) 的命名空间
+    """
+    values = {key: getattr(config, key) for key in dir(config) if key.isupper() and key != 'DEVICE'}
+    return types.SimpleNamespace(**values)
+
+
+def _rollout_worker(worker_index, env_slice, config, scenario_handle, buffer_handles, conn):
+    """
+    子进程主循环: 映射共享场景与缓冲区，按父进程的指令重置或推进自己负责的那一段环境
+
+    参数:
+        worker_index: 子进程编号
+        env_slice: 负责的环境下标范围 (start, stop)
+        config: 配置命名空间
+        scenario_handle: SharedScenario句柄
+        buffer_handles: 共享缓冲区句柄
+        conn: 与父进程通信的管道
+    """
+    attached = []
+    try:
+        scenario, attached = SharedScenario.attach(scenario_handle)
+        buffers = {key: SharedArray.attach(handle) for key, handle in buffer_handles.items()}
+        attached.extend(buffers.values())
+        arrays = {key: shared.array for key, shared in buffers.items()}
+
+        start, stop = env_slice
+        vector_env = VectorDroneEnvironment(config, stop - start, scenario=scenario)
+        conn.send(('ready', None))
+
+        while True:
+            command, argument = conn.recv()
+            if command == 'reset':
+                observations, _ = vector_env.reset(seed=argument)
+                arrays['observations'][start:stop] = observations
+                arrays['terminated'][start:stop] = False
+                arrays['truncated'][start:stop] = False
+            elif command == 'step':
+                observations, rewards, terminated, truncated, infos = vector_env.step(arrays['actions'][start:stop])
+                arrays['observations'][start:stop] = observations
+                arrays['rewards'][start:stop] = rewards
+                arrays['terminated'][start:stop] = terminated
+                arrays['truncated'][start:stop] = truncated
+                if 'final_observation' in infos:
+                    arrays['final_observations'][start:stop] = infos['final_observation']
+                for name, _, _ in INFO_FIELDS:
+                    arrays[name][start:stop] = infos[name]
+            elif command == 'get_state':
+                # 子进程有自己的全局随机数状态，一并保存
+                conn.send(('ok', {'env': vector_env.get_state(), 'numpy_random': np.random.get_state()}))
+                continue
+            elif command == 'set_state':
+                vector_env.set_state(argument['env'])
+                np.random.set_state(argument['numpy_random'])
+            elif command == 'close':
+                break
+            conn.send(('ok', None))
+    except Exception:
+        conn.send(('error', f"子进程 {worker_index} 出错:\n{traceback.format_exc()}"))
+    finally:
+        for shared in attached:
+            shared.close()
+        conn.close()
+
+
+class RolloutPool:
+    """
+    多进程经验收集池
+
+    父进程只加载一次场景，并把POI数组、DEM窗口和区域栅格发布到共享内存；
+    每个子进程映射这些数组后运行一段VectorDroneEnvironment。
+    观察、奖励和信息通过预先分配的共享缓冲区返回，管道中只传递很小的指令。
+    """
+
+    def __init__(self, config, num_envs, num_workers, scenario=None):
+        """
+        初始化经验收集池
+
+        参数:
+            config: 配置类实例
+            num_envs: 环境总数
+            num_workers: 子进程数量
+            scenario: 已加载的Scenario实例，为None时按配置从文件加载
+        """
+        self.config = config
+        self.num_envs = num_envs
+        self.num_workers = min(num_workers, num_envs)
+        self.drone_num = config.DRONE_NUM
+        obs_dim = self.drone_num * 2
+
+        # 父进程加载一次场景，预先完成米制投影并构建栅格，子进程直接共享这些数组
+        self.scenario = scenario if scenario is not None else Scenario.from_config(config)
+        reward_scenario = self.scenario.for_reward(config)
+        reward_scenario.raster_coverage(config.RASTER_RESOLUTION * reward_scenario.units_per_metre,
+                                        config.DRONE_RADIUS * reward_scenario.units_per_metre)
+        if config.COVERAGE_MODE == 'candidates':
+            # 候选点索引在父进程中构建并写入缓存目录，子进程直接从磁盘加载
+            units = reward_scenario.units_per_metre
+            reward_scenario.candidate_index(config.CANDIDATE_SPACING * units, config.DRONE_RADIUS * units,
+                                            config.CANDIDATE_CELL_RESOLUTION * units, config.CANDIDATE_CACHE_DIR)
+        self.shared_scenario = SharedScenario(self.scenario)
+
+        # 预先分配的共享缓冲区
+        self.buffers = {
+            'observations': SharedArray((num_envs, obs_dim), np.float32),
+            'actions': SharedArray((num_envs, obs_dim), np.float32),
+            'rewards': SharedArray((num_envs,), np.float64),
+            'terminated': SharedArray((num_envs,), np.bool_),
+            'truncated': SharedArray((num_envs,), np.bool_),
+            'final_observations': SharedArray((num_envs, obs_dim), np.float32),
+        }
+        for name, shape, dtype in INFO_FIELDS:
+            shape = tuple(self.drone_num if dim == 'drone_num' else dim for dim in shape)
+            self.buffers[name] = SharedArray((num_envs,) + shape, dtype)
+        self.arrays = {key: shared.array for key, shared in self.buffers.items()}
+
+        # 启动子进程 (spawn方式，子进程不继承父进程中的torch等状态)
+        context = mp.get_context('spawn')
+        values = config_values(config)
+        scenario_handle = self.shared_scenario.handle()
+        buffer_handles = {key: shared.handle() for key, shared in self.buffers.items()}
+        bounds = np.linspace(0, num_envs, self.num_workers + 1).astype(int)
+        self.slices = [(int(bounds[i]), int(bounds[i + 1])) for i in range(self.num_workers)]
+
+        self.connections = []
+        self.processes = []
+        for worker_index, env_slice in enumerate(self.slices):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_rollout_worker,
+                args=(worker_index, env_slice, values, scenario_handle, buffer_handles, child_conn),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+        self._wait()
+        self.closed = False
+        print(f"经验收集池启动完成: {self.num_workers}个子进程, {num_envs}个环境")
+
+    def _send(self, command, arguments=None):
+        """
+        向所有子进程发送指令
+        """
+        for i, conn in enumerate(self.connections):
+            conn.send((command, arguments[i] if arguments is not None else None))
+
+    def _wait(self):
+        """
+        等待所有子进程完成当前指令
+        
+        返回:
+            results: 每个子进程返回的结果列表
+        """
+        results = []
+        for conn in self.connections:
+            status, message = conn.recv()
+            if status == 'error':
+                raise RuntimeError(message)
+            results.append(message)
+        return results
+
+    def reset(self, seed=None, options=None):
+        """
+        重置所有环境
+
+        参数:
+            seed: 随机种子，子进程i使用seed+i
+
+        返回:
+            observations: 形状为(num_envs, 2*DRONE_NUM)的初始状态
+            infos: 额外信息
+        """
+        seeds = None if seed is None else [seed + i for i in range(self.num_workers)]
+        self._send('reset', seeds)
+        self._wait()
+        return self.arrays['observations'].copy(), {}
+
+    def step(self, actions):
+        """
+        所有环境同时执行一步
+
+        参数:
+            actions: 形状为(num_envs, 2*DRONE_NUM)的动作
+
+        返回:
+            与VectorDroneEnvironment.step相同
+        """
+        self.arrays['actions'][...] = actions
+        self._send('step')
+        self._wait()
+
+        observations = self.arrays['observations'].copy()
+        rewards = self.arrays['rewards'].copy()
+        terminated = self.arrays['terminated'].copy()
+        truncated = self.arrays['truncated'].copy()
+
+        mask = np.ones(self.num_envs, dtype=bool)
+        infos = {}
+        for name, _, _ in INFO_FIELDS:
+            infos[name] = self.arrays[name].copy()
+            infos[f'_{name}'] = mask
+
+        done = terminated | truncated
+        if done.any():
+            infos['final_observation'] = np.where(done[:, None], self.arrays['final_observations'], 0)
+            infos['_final_observation'] = done
+            infos['final_info'] = np.array([VectorDroneEnvironment.info_at(infos, i) if done[i] else None
+                                            for i in range(self.num_envs)], dtype=object)
+            infos['_final_info'] = done
+
+        return observations, rewards, terminated, truncated, infos
+
+    def get_state(self):
+        """
+        返回所有子进程中环境的可恢复状态 (含各子进程的随机数状态)
+        
+        返回:
+            state: 每个子进程一项的列表
+        """
+        self._send('get_state')
+        return self._wait()
+    
+    def set_state(self, state):
+        """
+        恢复get_state返回的状态，子进程数量必须相同
+        
+        参数:
+            state: get_state返回的列表
+        """
+        if len(state) != self.num_workers:
+            raise ValueError(f"状态中有{len(state)}个子进程，当前经验收集池有{self.num_workers}个")
+        self._send('set_state', state)
+        self._wait()
+    
+    def close(self):
+        """
+        关闭子进程并释放共享内存
+        """
+        if self.closed:
+            return
+        for conn in self.connections:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for shared in self.buffers.values():
+            shared.close()
+        self.shared_scenario.close()
+        self.closed = True
+
+
+if __name__ == "__main__":
+    # 吞吐量随子进程数量的变化
+    import os
+    import contextlib
+    import io
+    from configs import Config
+
+    config = Config()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scenario = Scenario.from_config(config)
+    envs_per_worker = 16
+    steps = 50
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, 16, 32, cores} & set(range(1, cores + 1)))
+
+    print(f"CPU核数: {cores}, 每个子进程{envs_per_worker}个环境, 每次测量{steps}步")
+    for num_workers in worker_counts:
+        num_envs = num_workers * envs_per_worker
+        start = time.perf_counter()
+        pool = RolloutPool(config, num_envs, num_workers, scenario=scenario)
+        startup = time.perf_counter() - start
+
+        pool.reset(seed=config.SEED)
+        actions = np.zeros((num_envs, config.DRONE_NUM * 2), dtype=np.float32)
+        start = time.perf_counter()
+        for _ in range(steps):
+            pool.step(actions)
+        elapsed = time.perf_counter() - start
+        pool.close()
+        print(f"子进程 {num_workers:>2}: 启动 {startup:.2f} s, 吞吐量 {num_envs * steps / elapsed:,.0f} 环境步/秒")
@@ -0,0 +1,319 @@
+import numpy as np
+import shapely
+import gymnasium as gym
+from gymnasium import spaces
+from gymnasium.vector.utils import batch_space
+from reward.overlap import pairwise_overlap_batch
+from scenario.loader import Scenario
+from env.drone_env import disperse_positions, layout_min_distance
+
+
+class VectorDroneEnvironment(gym.vector.VectorEnv):
+    """
+    批量无人机库选址环境
+
+    同时推进B个选址回合，所有布局保存在形状为(B, DRONE_NUM, 2)的数组中，
+    重置、主动分散、区域包含检查和奖励计算都对B个布局一起做数组运算。
+    接口与gymnasium的向量环境一致，回合结束的环境在同一步内自动重置。
+    """
+
+    def __init__(self, config, num_envs, scenario=None):
+        """
+        初始化批量环境
+
+        参数:
+            config: 配置类实例
+            num_envs: 并行的回合数B
+            scenario: 已加载的Scenario实例，为None时按配置从文件加载
+        """
+        self.config = config
+        self.num_envs = num_envs
+        self.scenario = scenario if scenario is not None else Scenario.from_config(config)
+
+        self.drone_num = config.DRONE_NUM
+        self.drone_radius = config.DRONE_RADIUS
+        self.elevation_threshold = config.ELEVATION_THRESHOLD
+        self.elevation_penalty_weight = config.ELEVATION_PENALTY_WEIGHT
+        self.region_geometry = self.scenario.region_geometry
+        self.region_index = self.scenario.region_index
+        self.region_sampler = self.scenario.region_sampler()
+        self.bounds = self.scenario.bounds
+        self.poi_kernel = self.scenario.poi_kernel
+        self.elevation_grid = self.scenario.elevation_grid
+        self.max_steps = config.MAX_STEPS
+
+        # 奖励计算所用的场景 (米制或经纬度近似)，与DroneEnvironment一致
+        self.reward_scenario = self.scenario.for_reward(config)
+        self.reward_radius = self.drone_radius * self.reward_scenario.units_per_metre
+        self.region_area = self.reward_scenario.region_index.area
+
+        # 区域覆盖与重叠的计算方式与DroneEnvironment一致: shapely模式对B个布局一起做多边形数组运算，
+        # 栅格模式 (或解析重叠需要裁剪到区域内时) 预计算栅格
+        self.coverage_mode = config.COVERAGE_MODE
+        self.overlap_mode = config.OVERLAP_MODE
+        self.raster_coverage = None
+        if self.coverage_mode == 'raster' or (self.overlap_mode == 'analytic' and config.OVERLAP_CLIP_TO_REGION):
+            self.raster_coverage = self.reward_scenario.raster_coverage(
+                config.RASTER_RESOLUTION * self.reward_scenario.units_per_metre,
+                self.reward_radius
+            )
+        self.overlap_raster = self.raster_coverage if config.OVERLAP_CLIP_TO_REGION else None
+
+        # 候选点模式下覆盖面积、重叠面积与POI覆盖都查预计算的候选点覆盖矩阵
+        self.candidate_index = None
+        if self.coverage_mode == 'candidates':
+            units = self.reward_scenario.units_per_metre
+            self.candidate_index = self.reward_scenario.candidate_index(
+                config.CANDIDATE_SPACING * units,
+                self.reward_radius,
+                config.CANDIDATE_CELL_RESOLUTION * units,
+                config.CANDIDATE_CACHE_DIR
+            )
+
+        # gymnasium向量环境接口
+        space = spaces.Box(
+            low=np.array([self.bounds[0], self.bounds[1]] * self.drone_num),
+            high=np.array([self.bounds[2], self.bounds[3]] * self.drone_num),
+            shape=(self.drone_num * 2,),
+            dtype=np.float32
+        )
+        self.single_observation_space = space
+        self.single_action_space = space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.closed = False
+
+        self.positions = None  # (B, DRONE_NUM, 2)
+        self.current_step = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self, seed=None, options=None):
+        """
+        重置所有环境
+
+        返回:
+            observations: 形状为(B, 2*DRONE_NUM)的初始状态
+            infos: 额外信息
+        """
+        if seed is not None:
+            np.random.seed(seed)
+
+        self.positions = self._generate_random_positions(self.num_envs)
+        self.current_step[:] = 0
+        return self._observations(), {}
+
+    def step(self, actions):
+        """
+        所有环境同时执行一步
+
+        参数:
+            actions: 形状为(B, 2*DRONE_NUM)的动作
+
+        返回:
+            observations: 新的状态
+            rewards: 形状为(B,)的奖励
+            terminated: 形状为(B,)的结束标志
+            truncated: 形状为(B,)的截断标志
+            infos: 以数组形式组织的额外信息
+        """
+        self.current_step += 1
+
+        # 与DroneEnvironment.step保持一致: 动作只做形状检查，位置更新来自主动分散逻辑
+        actions = np.asarray(actions).reshape(self.num_envs, self.drone_num, 2)
+
+        self.positions = disperse_positions(self.positions, self.bounds)
+
+        # 检查是否所有点都有效，全部在区域外的布局重新生成
+        inside = self.region_index.contains(self.positions)
+        all_outside = ~inside.any(axis=1)
+        if all_outside.any():
+            print(f"严重警告: {int(all_outside.sum())}个环境的所有无人机点都在区域外，重新生成随机点")
+            self.positions[all_outside] = self._generate_random_positions(int(all_outside.sum()))
+
+        rewards, infos = self._compute_reward(self.positions)
+
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        truncated = self.current_step >= self.max_steps
+        observations = self._observations()
+
+        # 回合结束的环境自动重置，结束时的状态与信息放在final_observation/final_info中
+        done = terminated | truncated
+        if done.any():
+            infos['final_observation'] = np.where(done[:, None], observations, 0)
+            infos['_final_observation'] = done
+            infos['final_info'] = np.array([self.info_at(infos, i) if done[i] else None
+                                            for i in range(self.num_envs)], dtype=object)
+            infos['_final_info'] = done
+            self.positions[done] = self._generate_random_positions(int(done.sum()))
+            self.current_step[done] = 0
+            observations = self._observations()
+
+        return observations, rewards, terminated, truncated, infos
+
+    def _observations(self):
+        """
+        返回展平的观察数组
+        """
+        return self.positions.reshape(self.num_envs, -1).astype(np.float32)
+
+    def _generate_random_positions(self, num_layouts, candidates_per_drone=16):
+        """
+        批量生成随机的无人机库位置 (确保在区域内)
+
+        参数:
+            num_layouts: 需要生成的布局数量
+            candidates_per_drone: 每个库的候选点数量
+
+        返回:
+            positions: 形状为(num_layouts, K, 2)的位置
+        """
+        min_distance_degree = layout_min_distance(self.drone_radius)  # 最小距离为无人机半径的20%，转为度
+        num_candidates = self.drone_num * candidates_per_drone
+
+        # 在区域的三角剖分上一次性均匀采样全部候选点 (都在区域内)
+        candidates = self.region_sampler.sample((num_layouts, num_candidates))
+        available = np.ones((num_layouts, num_candidates), dtype=bool)
+
+        positions = np.zeros((num_layouts, self.drone_num, 2), dtype=np.float64)
+        layout_index = np.arange(num_layouts)
+        for k in range(self.drone_num):
+            ok = available.copy()
+            if k > 0:
+                distance = np.linalg.norm(candidates[:, :, None, :] - positions[:, None, :k, :], axis=-1)
+                ok &= (distance >= min_distance_degree).all(axis=2)
+
+            # 优先选满足最小间距的点，否则忽略间距
+            choice = np.where(ok.any(axis=1), ok.argmax(axis=1), available.argmax(axis=1))
+            positions[:, k] = candidates[layout_index, choice]
+            available[layout_index, choice] = False
+
+        return positions.astype(np.float32)
+
+    def _compute_reward(self, positions):
+        """
+        批量计算奖励
+
+        参数:
+            positions: 形状为(B, K, 2)的位置
+
+        返回:
+            rewards: 形状为(B,)的奖励
+            infos: 以数组形式组织的额外信息
+        """
+        num_layouts = len(positions)
+        # 一次性转换到奖励场景的坐标系
+        reward_positions = self.reward_scenario.from_lonlat(positions)
+
+        # 海拔
+        elevation_grid = self.reward_scenario.elevation_grid
+        if elevation_grid is not None:
+            drone_elevations = elevation_grid.sample(reward_positions.reshape(-1, 2)).reshape(num_layouts, -1)
+        else:
+            drone_elevations = np.zeros((num_layouts, self.drone_num))
+
+        # 区域覆盖、重叠与POI覆盖
+        if self.coverage_mode == 'candidates':
+            coverage_area, overlap_area, poi_covered = self.candidate_index.evaluate_batch(reward_positions)
+        else:
+            if self.coverage_mode == 'raster':
+                coverage_area, overlap_area = self.raster_coverage.evaluate_batch(reward_positions)
+            else:
+                coverage_area, overlap_area = self._shapely_coverage(reward_positions)
+            poi_covered = self.reward_scenario.poi_kernel.count_batch(reward_positions, self.reward_radius)
+        if self.overlap_mode == 'analytic':
+            overlap_area, _ = pairwise_overlap_batch(reward_positions, self.reward_radius, self.overlap_raster)
+        coverage_ratio = coverage_area / self.region_area
+        normalized_overlap = overlap_area / self.region_area
+        poi_coverage_ratio = poi_covered / len(self.poi_kernel) if len(self.poi_kernel) > 0 else np.zeros(num_layouts)
+
+        # 海拔惩罚
+        elevation_penalty = (np.maximum(drone_elevations - self.elevation_threshold, 0) / 100).sum(axis=1)
+
+        poi_term = np.nan_to_num(poi_coverage_ratio * 1, nan=0.0, posinf=0.0, neginf=0.0)
+        area_term = np.nan_to_num(coverage_ratio * 0.3, nan=0.0, posinf=0.0, neginf=0.0)
+        overlap_term = np.nan_to_num(normalized_overlap * 0.1, nan=0.0, posinf=0.0, neginf=0.0)
+        elevation_term = np.nan_to_num(elevation_penalty * self.elevation_penalty_weight, nan=0.0, posinf=0.0, neginf=0.0)
+        rewards = poi_term + area_term - overlap_term - elevation_term
+
+        mask = np.ones(num_layouts, dtype=bool)
+        infos = {
+            'poi_coverage': poi_coverage_ratio, '_poi_coverage': mask,
+            'area_coverage': coverage_ratio, '_area_coverage': mask,
+            'overlap_ratio': normalized_overlap, '_overlap_ratio': mask,
+            'poi_covered': poi_covered, '_poi_covered': mask,
+            'total_poi': np.full(num_layouts, len(self.poi_kernel)), '_total_poi': mask,
+            'drone_positions': positions.copy(), '_drone_positions': mask,
+            'drone_elevations': drone_elevations, '_drone_elevations': mask,
+            'elevation_penalty': elevation_penalty, '_elevation_penalty': mask
+        }
+        return rewards, infos
+
+    def _shapely_coverage(self, reward_positions):
+        """
+        用多边形运算批量计算覆盖面积与重叠面积 (与DroneEnvironment的shapely模式相同)
+
+        参数:
+            reward_positions: 形状为(B, K, 2)的奖励场景坐标
+
+        返回:
+            coverage_area: 形状为(B,)的合并覆盖范围与区域的交集面积
+            overlap_area: 形状为(B,)的两两重叠面积之和，重叠模式不是'shapely'时为0 (由解析公式另行计算)
+        """
+        # 与Point.buffer相同的分段数
+        buffers = shapely.buffer(shapely.points(reward_positions), self.reward_radius, quad_segs=16)
+        merged = shapely.union_all(buffers, axis=1)
+        coverage_area = shapely.area(shapely.intersection(merged, self.reward_scenario.region_geometry))
+
+        overlap_area = np.zeros(len(reward_positions))
+        if self.overlap_mode == 'shapely':
+            i, j = np.triu_indices(self.drone_num, 1)
+            overlap_area = shapely.area(shapely.intersection(buffers[:, i], buffers[:, j])).sum(axis=1)
+        return coverage_area, overlap_area
+
+    @staticmethod
+    def info_at(infos, index):
+        """
+        取出单个环境的信息，格式与DroneEnvironment的info一致
+
+        参数:
+            infos: step返回的批量信息
+            index: 环境下标
+
+        返回:
+            info: 单个环境的信息字典
+        """
+        return {
+            'poi_coverage': float(infos['poi_coverage'][index]),
+            'area_coverage': float(infos['area_coverage'][index]),
+            'overlap_ratio': float(infos['overlap_ratio'][index]),
+            'poi_covered': int(infos['poi_covered'][index]),
+            'total_poi': int(infos['total_poi'][index]),
+            'drone_positions': infos['drone_positions'][index],
+            'drone_elevations': infos['drone_elevations'][index].tolist(),
+            'elevation_penalty': float(infos['elevation_penalty'][index])
+        }
+
+    def get_state(self):
+        """
+        返回环境的可恢复状态 (用于断点续训)
+        
+        返回:
+            state: 包含所有布局位置与步数的字典
+        """
+        return {'positions': None if self.positions is None else self.positions.copy(),
+                'current_step': self.current_step.copy()}
+    
+    def set_state(self, state):
+        """
+        恢复get_state返回的状态
+        
+        参数:
+            state: get_state返回的字典
+        """
+        self.positions = None if state['positions'] is None else state['positions'].copy()
+        self.current_step[:] = state['current_step']
+    
+    def close(self, **kwargs):
+        """
+        关闭环境
+        """
+        self.closed = True
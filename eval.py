@@ -6,9 +6,10 @@ from configs import Config
 from env import DroneEnvironment
 from models import PPO
 from view import visualize
-from shapely.geometry import Point
+from solve import compare_placements, print_placement, refine_placement
+from solvers import PlacementObjective
 
-def evaluate(model_path, num_episodes=10, render=True):
+def evaluate(model_path, num_episodes=10, render=True, compare=False, refine=False):
     """
     评估训练好的模型
     
@@ -16,6 +17,8 @@ def evaluate(model_path, num_episodes=10, render=True):
         model_path: 模型路径
         num_episodes: 评估的轮数
         render: 是否渲染
+        compare: 是否与贪心和混合整数规划的结果比较，给出相对最优解上界的差距
+        refine: 是否用模拟退火继续优化最佳回合的选址结果
     """
     # 创建配置
     config = Config()
@@ -37,6 +40,7 @@ def evaluate(model_path, num_episodes=10, render=True):
     poi_coverages = []
     area_coverages = []
     overlap_ratios = []
+    final_placements = []
     
     # 开始评估
     for episode in range(num_episodes):
@@ -78,6 +82,7 @@ def evaluate(model_path, num_episodes=10, render=True):
         poi_coverages.append(info['poi_coverage'])
         area_coverages.append(info['area_coverage'])
         overlap_ratios.append(info['overlap_ratio'])
+        final_placements.append(final_positions.copy())
         
         print(f"Episode {episode+1}: Reward = {episode_reward:.2f}, POI Coverage = {info['poi_coverage']:.2f}, Area Coverage = {info['area_coverage']:.2f}, Overlap = {info['overlap_ratio']:.2f}")
         
@@ -89,16 +94,13 @@ def evaluate(model_path, num_episodes=10, render=True):
                 output_path = os.path.join(config.VISUAL_DIR, f"eval_episode_{episode+1}.png")
                 
                 # 检查无人机位置是否在区域内
-                in_region_count = 0
-                for pos in drone_positions:
-                    if env.region_geometry.contains(Point(pos[0], pos[1])):
-                        in_region_count += 1
+                in_region_count = int(env.region_index.contains(drone_positions).sum())
                 
                 print(f"无人机在区域内的数量: {in_region_count}/{len(drone_positions)}")
                 
                 # 增加渲染信息
                 print(f"开始生成可视化结果，无人机数量: {len(drone_positions)}")
-                visualize(env.region_geometry, env.poi_gdf, drone_positions, config.DRONE_RADIUS, output_path, info)
+                visualize(env.region_geometry, env.poi_gdf, drone_positions, config.DRONE_RADIUS, output_path, env.render_info(info))
             except Exception as e:
                 print(f"渲染出错: {e}")
     
@@ -130,6 +132,21 @@ def evaluate(model_path, num_episodes=10, render=True):
     print(f"Area Coverage: {best_result['area_coverage']:.2f}")
     print(f"Overlap Ratio: {best_result['overlap_ratio']:.2f}")
     
+    if compare:
+        # 最佳回合的PPO选址与贪心、混合整数规划在同一目标函数下比较
+        rows = compare_placements(env.scenario, config, {'PPO': final_placements[best_idx]})
+        best_result['optimality_gap'] = rows['PPO']['gap']
+        best_result['greedy_gap'] = rows['greedy']['gap']
+        best_result['milp_gap'] = rows['milp']['gap']
+    
+    if refine:
+        # 最佳回合的PPO选址对齐到候选点后用模拟退火继续优化
+        objective = PlacementObjective.from_config(env.scenario, config)
+        refined = refine_placement(objective, objective.nearest_sites(final_placements[best_idx]), config, 'PPO',
+                                   os.path.join(config.VISUAL_DIR, "eval_refinement.png"))
+        print_placement(refined, objective.index.num_poi)
+        best_result['refined'] = refined
+    
     return best_result
 
 if __name__ == "__main__":
@@ -138,8 +155,10 @@ if __name__ == "__main__":
     parser.add_argument("--model", type=str, default="result/models/best_model.pth", help="Path to model file")
     parser.add_argument("--episodes", type=int, default=10, help="Number of episodes to evaluate")
     parser.add_argument("--render", action="store_true", help="Render evaluation")
+    parser.add_argument("--compare", action="store_true", help="Compare with greedy and MILP solutions")
+    parser.add_argument("--refine", action="store_true", help="Refine the best placement with simulated annealing")
     
     args = parser.parse_args()
     
     # 评估
-    evaluate(args.model, args.episodes, args.render) 
\ No newline at end of file
+    evaluate(args.model, args.episodes, args.render, args.compare, args.refine) 
\ No newline at end of file
@@ -0,0 +1,129 @@
+import os
+import inspect
+import argparse
+import numpy as np
+import shapely
+import torch
+import torch.nn as nn
+from configs import Config
+from models import ActorNetwork, NumpyPolicy
+from scenario import Scenario
+from env.drone_env import layout_min_distance
+
+class PlacementActor(nn.Module):
+    """
+    只输出动作均值的确定性Actor，用于导出
+    """
+
+    def __init__(self, actor):
+        """
+        初始化
+
+        参数:
+            actor: 训练好的ActorNetwork
+        """
+        super(PlacementActor, self).__init__()
+        self.actor = actor
+
+    def forward(self, states):
+        """
+        前向传播
+
+        参数:
+            states: 形状为(B, state_dim)的状态
+
+        返回:
+            mu: 形状为(B, action_dim)的动作均值
+        """
+        mu, _ = self.actor(states)
+        return mu
+
+def export_policy(model_path, output_dir, config=None):
+    """
+    把训练好的模型导出为TorchScript、NumPy权重与ONNX格式的Actor，并保存场景数据包
+
+    参数:
+        model_path: PPO.save_models保存的模型路径
+        output_dir: 输出目录
+        config: 配置类实例，为None时使用默认配置
+
+    返回:
+        paths: 导出文件路径的字典
+    """
+    config = config or Config()
+    os.makedirs(output_dir, exist_ok=True)
+
+    # CUDA上保存的模型也可以在只有CPU的机器上加载
+    checkpoint = torch.load(model_path, map_location='cpu')
+    state_dim = action_dim = 2 * config.DRONE_NUM
+    actor = ActorNetwork(state_dim, action_dim, config.HIDDEN_DIM)
+    actor.load_state_dict(checkpoint['actor'])
+    model = PlacementActor(actor).eval()
+    example = torch.zeros(1, state_dim)
+    paths = {}
+
+    # TorchScript
+    paths['torchscript'] = os.path.join(output_dir, 'actor.pt')
+    with torch.no_grad():
+        torch.jit.trace(model, example).save(paths['torchscript'])
+    print(f"TorchScript模型已保存到 {paths['torchscript']}")
+
+    # NumPy权重 (NumpyPolicy的权重字典，推理时不需要导入torch，加载最快)
+    paths['numpy'] = os.path.join(output_dir, 'actor.npz')
+    np.savez(paths['numpy'], **NumpyPolicy.from_state_dicts(checkpoint['actor'], checkpoint['critic']).weights)
+    print(f"NumPy权重已保存到 {paths['numpy']}")
+
+    # ONNX (需要安装onnx)
+    onnx_path = os.path.join(output_dir, 'actor.onnx')
+    kwargs = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+    try:
+        torch.onnx.export(model, example, onnx_path, input_names=['states'], output_names=['mu'],
+                          dynamic_axes={'states': {0: 'batch'}, 'mu': {0: 'batch'}}, **kwargs)
+        paths['onnx'] = onnx_path
+        print(f"ONNX模型已保存到 {onnx_path}")
+    except Exception as e:
+        print(f"跳过ONNX导出: {e}")
+
+    paths['scenario'] = os.path.join(output_dir, 'scenario.npz')
+    export_scenario_bundle(config, paths['scenario'])
+    return paths
+
+def export_scenario_bundle(config, path, scenario=None):
+    """
+    保存推理所需的场景数据包
+
+    包括区域几何 (WKB)、奖励坐标系下的POI坐标、坐标系名称，以及与环境一致的初始布局最小间距与回合步数，
+    推理时只需np.load，不再读取shapefile/CSV。
+
+    参数:
+        config: 配置类实例
+        path: 输出的.npz路径
+        scenario: 已加载的Scenario实例，为None时按配置从文件加载
+    """
+    scenario = scenario if scenario is not None else Scenario.from_config(config)
+    reward_scenario = scenario.for_reward(config)
+    crs = reward_scenario.projection.crs.to_string() if reward_scenario.projection is not None else ''
+
+    np.savez(
+        path,
+        region_wkb=np.frombuffer(shapely.to_wkb(scenario.region_geometry), dtype=np.uint8),
+        bounds=np.array(scenario.bounds),
+        poi_xs=reward_scenario.poi_kernel.xs, poi_ys=reward_scenario.poi_kernel.ys,
+        crs=np.array(crs),
+        drone_num=np.array(config.DRONE_NUM),
+        drone_radius=np.array(config.DRONE_RADIUS * reward_scenario.units_per_metre),
+        min_distance=np.array(layout_min_distance(config.DRONE_RADIUS)),
+        max_steps=np.array(config.MAX_STEPS)
+    )
+    print(f"场景数据包已保存到 {path}")
+
+if __name__ == "__main__":
+    # 解析命令行参数
+    parser = argparse.ArgumentParser(description="Export trained actor for inference")
+    parser.add_argument("--model", type=str, default="result/models/best_model.pth", help="Path to model file")
+    parser.add_argument("--output", type=str, default="result/export", help="Output directory")
+
+    args = parser.parse_args()
+
+    # 导出
+    export_policy(args.model, args.output)
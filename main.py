@@ -3,16 +3,26 @@ import os
 from configs import Config
 from train import train
 from eval import evaluate
+from export import export_policy
+from solve import solve
 
 def main():
     """
     项目主入口
     """
     parser = argparse.ArgumentParser(description="无人机库选址 - 深度强化学习项目")
-    parser.add_argument("--mode", type=str, default="train", choices=["train", "eval"], help="运行模式：train或eval")
-    parser.add_argument("--model", type=str, default=None, help="评估模式下的模型路径")
+    parser.add_argument("--mode", type=str, default="train", choices=["train", "eval", "export", "solve"], help="运行模式：train、eval、export或solve")
+    parser.add_argument("--model", type=str, default=None, help="评估与导出模式下的模型路径")
+    parser.add_argument("--output", type=str, default=None, help="导出模式下的输出目录，默认为result/export")
     parser.add_argument("--episodes", type=int, default=10, help="评估模式下的回合数")
+    parser.add_argument("--drones", type=int, default=None, help="求解模式下的无人机库数量，默认为Config.DRONE_NUM")
+    parser.add_argument("--solver", type=str, default="greedy", choices=["greedy", "milp", "random"],
+                        help="求解模式下的求解方法：greedy（惰性贪心）、milp（混合整数规划精确求解）或random（随机选址）")
+    parser.add_argument("--refine", action="store_true", help="求解与评估模式下是否再用模拟退火优化选址结果")
+    parser.add_argument("--compare", action="store_true", help="评估模式下与贪心和混合整数规划的结果比较最优性差距")
     parser.add_argument("--render", action="store_true", help="是否生成可视化结果")
+    parser.add_argument("--resume", type=str, nargs="?", const="", default=None,
+                        help="训练模式下从检查点继续训练，不指定路径时使用result/models/resume.pth")
     
     args = parser.parse_args()
     
@@ -21,10 +31,19 @@ def main():
     config.make_dirs()
     
     if args.mode == "train":
-        print("启动训练模式...")
-        train()
-    else:  # eval
-        print("启动评估模式...")
+        if args.resume is not None:
+            resume_path = args.resume or os.path.join(config.MODEL_DIR, "resume.pth")
+            if not os.path.exists(resume_path):
+                raise FileNotFoundError(f"没有找到断点续训的检查点: {resume_path}")
+            print("启动训练模式 (断点续训)...")
+            train(config, resume=resume_path)
+        else:
+            print("启动训练模式...")
+            train(config)
+    elif args.mode == "solve":
+        print("启动求解模式...")
+        solve(config, args.drones, args.render, args.solver, args.refine)
+    else:  # eval / export
         model_path = args.model
         if model_path is None:
             # 使用最佳模型
@@ -37,7 +56,12 @@ def main():
                 else:
                     raise FileNotFoundError("没有找到训练好的模型文件，请先训练或指定模型路径。")
         
-        evaluate(model_path, args.episodes, args.render)
+        if args.mode == "export":
+            print("启动导出模式...")
+            export_policy(model_path, args.output or os.path.join(config.RESULT_DIR, "export"), config)
+        else:
+            print("启动评估模式...")
+            evaluate(model_path, args.episodes, args.render, args.compare, args.refine)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
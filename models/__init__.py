@@ -1,3 +1,17 @@
-from models.networks import ActorNetwork, CriticNetwork
-from models.ppo import PPO
-from models.memory import Memory 
\ No newline at end of file
+from models.numpy_policy import NumpyPolicy
+
+# 依赖torch的类在第一次访问时才导入，只使用NumpyPolicy时 (如runner.py加载actor.npz) 不导入torch
+_LAZY = {
+    'CheckpointWriter': 'models.checkpoint',
+    'ActorNetwork': 'models.networks',
+    'CriticNetwork': 'models.networks',
+    'PPO': 'models.ppo',
+    'RolloutBuffer': 'models.rollout_buffer',
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module 'models' has no attribute '{name}'")
+    import importlib
+    return getattr(importlib.import_module(_LAZY[name]), name)
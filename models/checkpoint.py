@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+import torch
+
+
+def snapshot_to_cpu(obj):
+    """
+    复制一份CPU上的状态快照
+
+    递归处理state_dict中的字典、列表与张量，张量复制到CPU，之后训练线程继续更新参数不会影响快照。
+
+    参数:
+        obj: state_dict或其中的值
+
+    返回:
+        snapshot: 结构相同的快照
+    """
+    if torch.is_tensor(obj):
+        return obj.detach().to('cpu', copy=True)
+    if isinstance(obj, dict):
+        return {key: snapshot_to_cpu(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(snapshot_to_cpu(value) for value in obj)
+    return obj
+
+
+def write_checkpoint(state, path):
+    """
+    原子地写入检查点: 先写到同目录下的临时文件，再重命名为目标文件
+
+    写入过程中被中断时只会留下临时文件，不会留下损坏的目标文件。
+
+    参数:
+        state: 要保存的对象
+        path: 目标路径
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            torch.save(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class CheckpointWriter:
+    """
+    后台检查点写入器
+
+    训练线程只负责把状态复制成CPU快照并放入待写队列，序列化与写盘在后台线程中完成。
+    同一路径尚未写出的请求会被合并，只保留最新的快照 (例如频繁刷新的best_model.pth)；
+    同一组 (例如定期保存的model_*.pth) 只保留最近keep个文件。
+    """
+
+    def __init__(self, keep=None):
+        """
+        初始化写入器并启动后台线程
+
+        参数:
+            keep: 每组保留的检查点数量，为None时全部保留
+        """
+        self.keep = keep
+        self._pending = {}  # 路径 -> (状态, 组名)，保持提交顺序
+        self._groups = {}  # 组名 -> 已写出的路径列表
+        self._condition = threading.Condition()
+        self._writing = False
+        self._closed = False
+        self.num_written = 0
+        self.num_coalesced = 0
+        self.write_time = 0.0
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name='checkpoint-writer', daemon=True)
+        self._thread.start()
+
+    def save(self, path, state, group=None):
+        """
+        提交一个检查点，立即返回
+
+        参数:
+            path: 目标路径
+            state: 要保存的状态 (应为snapshot_to_cpu得到的快照)
+            group: 组名，按组执行保留数量限制
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("检查点写入器已关闭")
+            if path in self._pending:
+                self.num_coalesced += 1
+                del self._pending[path]  # 重新插入到队尾
+            self._pending[path] = (state, group)
+            self._condition.notify()
+
+    def flush(self):
+        """
+        等待所有已提交的检查点写完
+        """
+        with self._condition:
+            while self._pending or self._writing:
+                self._condition.wait()
+
+    def close(self):
+        """
+        写完剩余的检查点并停止后台线程
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        if self.error is not None:
+            print(f"检查点写入出错: {self.error}")
+
+    def _run(self):
+        """
+        后台线程: 依次取出待写的检查点并写盘
+        """
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                path = next(iter(self._pending))
+                state, group = self._pending.pop(path)
+                self._writing = True
+
+            start = time.perf_counter()
+            try:
+                write_checkpoint(state, path)
+                self._retain(path, group)
+            except Exception as e:
+                self.error = e
+                print(f"写入检查点 {path} 失败: {e}")
+
+            with self._condition:
+                self.write_time += time.perf_counter() - start
+                self.num_written += 1
+                self._writing = False
+                self._condition.notify_all()
+
+    def _retain(self, path, group):
+        """
+        记录组内已写出的路径，超过保留数量时删除最早的文件
+        """
+        if group is None:
+            return
+        paths = self._groups.setdefault(group, [])
+        if path in paths:
+            paths.remove(path)
+        paths.append(path)
+        while self.keep is not None and len(paths) > self.keep:
+            old_path = paths.pop(0)
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+
+if __name__ == "__main__":
+    # 同步保存与后台写入在训练线程上的耗时比较
+    import tempfile
+    from configs import Config
+    from models.ppo import PPO
+
+    config = Config()
+    agent = PPO(2 * config.DRONE_NUM, 2 * config.DRONE_NUM, config)
+    # 让Adam状态非空，与训练中的检查点大小一致
+    for optimizer, network in [(agent.actor_optimizer, agent.actor), (agent.critic_optimizer, agent.critic)]:
+        loss = sum(parameter.sum() for parameter in network.parameters())
+        loss.backward()
+        optimizer.step()
+
+    repeats = 200
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'best_model.pth')
+        start = time.perf_counter()
+        for _ in range(repeats):
+            agent.save_models(path)
+        sync_ms = (time.perf_counter() - start) / repeats * 1000
+
+        writer = CheckpointWriter(keep=3)
+        start = time.perf_counter()
+        for i in range(repeats):
+            writer.save(path, agent.checkpoint_state())
+            if i % 20 == 0:
+                writer.save(os.path.join(directory, f"model_{i}.pth"), agent.checkpoint_state(), group='periodic')
+        async_ms = (time.perf_counter() - start) / repeats * 1000
+        writer.close()
+
+        restored = torch.load(path, map_location='cpu')
+        same = all(torch.equal(restored['actor'][name], value) for name, value in agent.actor.state_dict().items())
+        periodic = sorted(name for name in os.listdir(directory) if name.startswith('model_'))
+        print(f"同步保存: 训练线程每次 {sync_ms:.2f} ms")
+        print(f"后台写入: 训练线程每次 {async_ms:.3f} ms, 实际写入 {writer.num_written} 次, 合并 {writer.num_coalesced} 次, "
+              f"后台写盘共 {writer.write_time * 1000:.0f} ms")
+        print(f"最终文件与当前参数一致: {same}, 保留的定期检查点: {periodic}")
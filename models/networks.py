@@ -3,12 +3,54 @@ import torch.nn as nn
 import torch.nn.functional as F
 import numpy as np
 
-class ActorNetwork(nn.Module):
+class InputNormalizedNetwork(nn.Module):
+    """
+    按观察空间的上下界把输入线性缩放到[-1, 1]的网络基类
+
+    状态是经纬度 (约120与30)，直接输入时每次梯度更新对输出的影响被放大上百倍，
+    sigma接近下限时新旧策略的KL散度可达上万。缩放所用的中心与半宽作为缓冲区随state_dict保存，
+    导出与评估时从检查点恢复；不含这两个缓冲区的旧检查点按不缩放加载 (与其训练时一致)。
+    """
+
+    def __init__(self, state_dim, observation_bounds=None):
+        """
+        初始化输入缩放
+
+        参数:
+            state_dim: 状态维度
+            observation_bounds: 观察空间的 (下界, 上界)，为None时不缩放
+        """
+        super(InputNormalizedNetwork, self).__init__()
+        center, scale = torch.zeros(state_dim), torch.ones(state_dim)
+        if observation_bounds is not None:
+            low, high = (torch.as_tensor(np.asarray(bound, dtype=np.float32)) for bound in observation_bounds)
+            center = (low + high) / 2
+            scale = torch.clamp((high - low) / 2, min=1e-6)
+        self.register_buffer('obs_center', center)
+        self.register_buffer('obs_scale', scale)
+
+    def normalize(self, state):
+        """
+        缩放输入状态
+        """
+        return (state - self.obs_center) / self.obs_scale
+
+    def load_state_dict(self, state_dict, *args, **kwargs):
+        """
+        加载参数，旧检查点缺少缩放缓冲区时按不缩放处理
+        """
+        state_dict = dict(state_dict)
+        state_dict.setdefault('obs_center', torch.zeros_like(self.obs_center))
+        state_dict.setdefault('obs_scale', torch.ones_like(self.obs_scale))
+        return super(InputNormalizedNetwork, self).load_state_dict(state_dict, *args, **kwargs)
+
+
+class ActorNetwork(InputNormalizedNetwork):
     """
     Actor网络，用于生成动作
     """
     
-    def __init__(self, state_dim, action_dim, hidden_dim=128):
+    def __init__(self, state_dim, action_dim, hidden_dim=128, observation_bounds=None):
         """
         初始化Actor网络
         
@@ -16,8 +58,9 @@ class ActorNetwork(nn.Module):
             state_dim: 状态维度
             action_dim: 动作维度
             hidden_dim: 隐藏层维度
+            observation_bounds: 观察空间的 (下界, 上界)，用于缩放输入，为None时不缩放
         """
-        super(ActorNetwork, self).__init__()
+        super(ActorNetwork, self).__init__(state_dim, observation_bounds)
         
         self.fc1 = nn.Linear(state_dim, hidden_dim)
         self.fc2 = nn.Linear(hidden_dim, hidden_dim)
@@ -35,7 +78,7 @@ class ActorNetwork(nn.Module):
             mu: 动作均值
             sigma: 动作标准差
         """
-        x = F.relu(self.fc1(state))
+        x = F.relu(self.fc1(self.normalize(state)))
         x = F.relu(self.fc2(x))
         mu = self.mu(x)
         
@@ -67,20 +110,21 @@ class ActorNetwork(nn.Module):
         return action, log_prob, entropy
 
 
-class CriticNetwork(nn.Module):
+class CriticNetwork(InputNormalizedNetwork):
     """
     Critic网络，用于估计价值函数
     """
     
-    def __init__(self, state_dim, hidden_dim=128):
+    def __init__(self, state_dim, hidden_dim=128, observation_bounds=None):
         """
         初始化Critic网络
         
         参数:
             state_dim: 状态维度
             hidden_dim: 隐藏层维度
+            observation_bounds: 观察空间的 (下界, 上界)，用于缩放输入，为None时不缩放
         """
-        super(CriticNetwork, self).__init__()
+        super(CriticNetwork, self).__init__(state_dim, observation_bounds)
         
         self.fc1 = nn.Linear(state_dim, hidden_dim)
         self.fc2 = nn.Linear(hidden_dim, hidden_dim)
@@ -96,7 +140,7 @@ class CriticNetwork(nn.Module):
         返回:
             value: 状态价值
         """
-        x = F.relu(self.fc1(state))
+        x = F.relu(self.fc1(self.normalize(state)))
         x = F.relu(self.fc2(x))
         value = self.value(x)
         
@@ -0,0 +1,186 @@
+import numpy as np
+
+
+class NumpyPolicy:
+    """
+    Actor与Critic权重的NumPy快照
+
+    只依赖NumPy完成前向计算与动作采样，适合单环境经验收集与评估中每次只推理少量状态的情况，
+    省去torch每次调用的调度开销，也可以在不导入torch的子进程中使用。
+    两个网络的第一层输入相同，拼接成一次矩阵乘法；Actor的mu与sigma两个输出层也拼接在一起。
+    接口 (select_action、select_actions、estimate_values) 与PPO一致，PPO每次更新后重新生成快照。
+    """
+
+    def __init__(self, weights, total_steps=0, sigma_min=0.01):
+        """
+        初始化策略快照
+
+        参数:
+            weights: 权重字典，键为 'actor.fc1.weight'、'critic.value.bias'、'actor.obs_center' 等，
+                     值为NumPy数组 (与nn.Linear布局相同)
+            total_steps: 生成快照时PPO的更新次数，用于探索噪声的衰减
+            sigma_min: 标准差下限，与ActorNetwork一致
+        """
+        self.weights = weights
+        self.total_steps = total_steps
+        self.sigma_min = sigma_min
+
+        def linear(prefix):
+            return weights[prefix + '.weight'].T.astype(np.float32), weights[prefix + '.bias'].astype(np.float32)
+
+        actor_fc1, critic_fc1 = linear('actor.fc1'), linear('critic.fc1')
+        # 输入缩放 (Actor与Critic由同一个观察空间创建，缩放相同)，旧的权重中没有时不缩放
+        state_dim = actor_fc1[0].shape[0]
+        self.obs_center = np.asarray(weights.get('actor.obs_center', np.zeros(state_dim)), dtype=np.float32)
+        self.obs_scale = np.asarray(weights.get('actor.obs_scale', np.ones(state_dim)), dtype=np.float32)
+        self.hidden_dim = actor_fc1[0].shape[1]
+        self.action_dim = weights['actor.mu.bias'].shape[0]
+        self.fc1 = (np.concatenate([actor_fc1[0], critic_fc1[0]], axis=1), np.concatenate([actor_fc1[1], critic_fc1[1]]))
+        self.actor_fc2 = linear('actor.fc2')
+        self.critic_fc2 = linear('critic.fc2')
+        mu, sigma = linear('actor.mu'), linear('actor.sigma')
+        self.heads = (np.concatenate([mu[0], sigma[0]], axis=1), np.concatenate([mu[1], sigma[1]]))
+        self.value = linear('critic.value')
+
+    @classmethod
+    def from_state_dicts(cls, actor_state, critic_state, total_steps=0):
+        """
+        由Actor与Critic的state_dict生成快照
+
+        参数:
+            actor_state: ActorNetwork.state_dict()
+            critic_state: CriticNetwork.state_dict()
+            total_steps: PPO的更新次数
+
+        返回:
+            policy: NumpyPolicy实例
+        """
+        weights = {}
+        for prefix, state in [('actor', actor_state), ('critic', critic_state)]:
+            for name, tensor in state.items():
+                weights[f"{prefix}.{name}"] = tensor.detach().cpu().numpy().copy()
+        return cls(weights, total_steps)
+
+    def forward(self, states):
+        """
+        前向计算
+
+        参数:
+            states: 形状为(B, state_dim)的状态
+
+        返回:
+            mu: 形状为(B, action_dim)的动作均值
+            sigma: 形状为(B, action_dim)的动作标准差
+            values: 形状为(B,)的状态价值
+        """
+        states = (np.asarray(states, dtype=np.float32) - self.obs_center) / self.obs_scale
+        hidden = np.maximum(states @ self.fc1[0] + self.fc1[1], 0)
+        actor_hidden = np.maximum(hidden[:, :self.hidden_dim] @ self.actor_fc2[0] + self.actor_fc2[1], 0)
+        critic_hidden = np.maximum(hidden[:, self.hidden_dim:] @ self.critic_fc2[0] + self.critic_fc2[1], 0)
+
+        heads = actor_hidden @ self.heads[0] + self.heads[1]
+        mu = heads[:, :self.action_dim]
+        sigma = np.logaddexp(0, heads[:, self.action_dim:]) + self.sigma_min  # softplus
+        values = (critic_hidden @ self.value[0] + self.value[1])[:, 0]
+        return mu, sigma, values
+
+    def select_actions(self, states, rng=None):
+        """
+        批量选择动作 (与PPO.select_actions相同的采样与探索噪声)
+
+        参数:
+            states: 形状为(B, state_dim)的状态
+            rng: numpy随机数生成器，为None时使用全局np.random
+
+        返回:
+            actions: 形状为(B, action_dim)的动作
+            log_probs: 形状为(B,)的动作对数概率
+            values: 形状为(B,)的状态价值
+        """
+        rng = np.random if rng is None else rng
+        mu, sigma, values = self.forward(states)
+        actions = mu + sigma * rng.standard_normal(mu.shape).astype(np.float32)
+
+        # 探索噪声，随着训练进行逐渐减小
+        exploration_decay = max(0.05, 0.3 - 0.0001 * self.total_steps)
+        noise_scale = max(0.001, 0.01 * (1.0 - self.total_steps / 10000))
+        explore = rng.random((len(actions), 1)) < exploration_decay
+        actions = actions + explore * rng.standard_normal(actions.shape).astype(np.float32) * noise_scale
+
+        # 实际执行的动作 (含探索噪声) 在当前策略下的对数概率
+        log_probs = self.log_prob(mu, sigma, actions)
+        return actions, log_probs, values
+
+    @staticmethod
+    def log_prob(mu, sigma, actions):
+        """
+        动作在对角正态分布下的对数概率
+
+        参数:
+            mu: 形状为(B, action_dim)的动作均值
+            sigma: 形状为(B, action_dim)的动作标准差
+            actions: 形状为(B, action_dim)的动作
+
+        返回:
+            log_probs: 形状为(B,)的对数概率
+        """
+        z = (actions - mu) / sigma
+        return (-0.5 * z ** 2 - np.log(sigma) - 0.5 * np.log(2 * np.pi)).sum(axis=-1)
+
+    def select_action(self, state, rng=None):
+        """
+        根据单个状态选择动作
+
+        返回:
+            action: 采样的动作
+            log_prob: 动作的对数概率
+            value: 状态价值
+        """
+        actions, log_probs, values = self.select_actions(np.asarray(state)[None], rng)
+        return actions[0], float(log_probs[0]), float(values[0])
+
+    def estimate_values(self, states):
+        """
+        估计状态价值
+
+        参数:
+            states: 形状为(state_dim,)或(B, state_dim)的状态
+
+        返回:
+            values: 形状为()或(B,)的价值数组
+        """
+        states = np.asarray(states, dtype=np.float32)
+        values = self.forward(states.reshape(-1, states.shape[-1]))[2]
+        return values.reshape(states.shape[:-1])
+
+
+if __name__ == "__main__":
+    # 单步延迟比较 (与torch网络输出的一致性见tests/test_numpy_policy.py)
+    import time
+    import torch
+    from configs import Config
+    from models.ppo import PPO
+
+    config = Config()
+    torch.set_num_threads(1)
+    state_dim = action_dim = 2 * config.DRONE_NUM
+    agent = PPO(state_dim, action_dim, config)
+    policy = agent.numpy_policy()
+
+    # 用接近真实的经纬度状态
+    rng = np.random.default_rng(config.SEED)
+    state = np.concatenate([rng.uniform(119.5, 120.2, config.DRONE_NUM),
+                            rng.uniform(29.7, 30.2, config.DRONE_NUM)]).astype(np.float32)
+
+    repeats = 2000
+    for name, select in [('PPO.select_action', agent.select_action), ('NumpyPolicy.select_action', policy.select_action)]:
+        select(state)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            select(state)
+        print(f"{name}: 每步 {(time.perf_counter() - start) / repeats * 1e6:.0f} µs")
+
+    start = time.perf_counter()
+    for _ in range(100):
+        agent.numpy_policy()
+    print(f"生成快照: {(time.perf_counter() - start) / 100 * 1000:.2f} ms")
@@ -1,8 +1,11 @@
+import time
 import torch
 import torch.nn as nn
 import torch.optim as optim
 import numpy as np
 from models.networks import ActorNetwork, CriticNetwork
+from models.checkpoint import snapshot_to_cpu, write_checkpoint
+from models.numpy_policy import NumpyPolicy
 import torch.nn.functional as F
 
 class PPO:
@@ -10,7 +13,7 @@ class PPO:
     PPO算法实现
     """
     
-    def __init__(self, state_dim, action_dim, config):
+    def __init__(self, state_dim, action_dim, config, observation_bounds=None):
         """
         初始化PPO算法
         
@@ -18,6 +21,7 @@ class PPO:
             state_dim: 状态维度
             action_dim: 动作维度
             config: 配置类实例
+            observation_bounds: 观察空间的 (下界, 上界)，网络据此把输入缩放到[-1, 1]，为None时不缩放
         """
         self.config = config
         self.device = config.DEVICE
@@ -30,10 +34,13 @@ class PPO:
         self.value_coef = config.VALUE_COEF
         self.max_grad_norm = config.MAX_GRAD_NORM
         self.learning_rate = config.LEARNING_RATE
+        # update至少遍历一轮缓冲区，损失与KL等统计量都来自最后一轮
+        if config.PPO_EPOCHS < 1:
+            raise ValueError(f"PPO_EPOCHS必须至少为1，当前为{config.PPO_EPOCHS}")
         
         # 创建Actor和Critic网络
-        self.actor = ActorNetwork(state_dim, action_dim, config.HIDDEN_DIM).to(self.device)
-        self.critic = CriticNetwork(state_dim, config.HIDDEN_DIM).to(self.device)
+        self.actor = ActorNetwork(state_dim, action_dim, config.HIDDEN_DIM, observation_bounds).to(self.device)
+        self.critic = CriticNetwork(state_dim, config.HIDDEN_DIM, observation_bounds).to(self.device)
         
         # 优化器
         self.actor_optimizer = optim.Adam(self.actor.parameters(), lr=self.learning_rate)
@@ -54,26 +61,43 @@ class PPO:
             log_prob: 动作的对数概率
             value: 状态价值
         """
-        state = torch.FloatTensor(state).unsqueeze(0).to(self.device)
-        
-        with torch.no_grad():
-            action, log_prob, _ = self.actor.sample(state)
-            value = self.critic(state)
+        actions, log_probs, values = self.select_actions(np.asarray(state)[None])
+        return actions[0], float(log_probs[0]), float(values[0])
+    
+    def select_actions(self, states):
+        """
+        批量选择动作
         
-        # 添加额外的探索噪声，随着训练进行逐渐减小
-        action_np = action.cpu().numpy()[0]
+        Actor与Critic在同一个inference_mode块中对整批状态各前向一次，探索噪声对整批一次生成，
+        结果整体转换为NumPy数组。返回的对数概率是加上探索噪声之后实际执行的动作在当前策略下的对数概率，
+        与update中evaluate_actions对同一动作的计算一致，更新开始时新旧策略的比值为1。
         
-        # 计算探索衰减因子 (随着训练步数增加，探索减少)
-        exploration_decay = max(0.05, 0.3 - 0.0001 * self.total_steps)  # 最小保留5%的探索
+        参数:
+            states: 形状为(B, state_dim)的状态
+            
+        返回:
+            actions: 形状为(B, action_dim)的动作
+            log_probs: 形状为(B,)的动作对数概率
+            values: 形状为(B,)的状态价值
+        """
+        states = torch.as_tensor(np.asarray(states), dtype=torch.float32, device=self.device)
         
-        # 添加正态分布噪声
-        if np.random.random() < exploration_decay:
-            # 噪声幅度也随着训练逐渐减小
+        with torch.inference_mode():
+            mu, sigma = self.actor(states)
+            dist = torch.distributions.Normal(mu, sigma)
+            action = dist.sample()
+            value = self.critic(states).squeeze(-1)
+            
+            # 添加额外的探索噪声，随着训练进行逐渐减小
+            # 计算探索衰减因子 (随着训练步数增加，探索减少)
+            exploration_decay = max(0.05, 0.3 - 0.0001 * self.total_steps)  # 最小保留5%的探索
+            # 每个环境以exploration_decay的概率添加正态分布噪声，噪声幅度也随着训练逐渐减小
             noise_scale = max(0.001, 0.01 * (1.0 - self.total_steps / 10000))
-            noise = np.random.normal(0, noise_scale, size=action_np.shape)
-            action_np = action_np + noise
+            explore = torch.rand(len(states), 1, device=self.device) < exploration_decay
+            action = action + explore * torch.randn_like(action) * noise_scale
+            log_prob = dist.log_prob(action).sum(dim=-1)
         
-        return action_np, log_prob.cpu().item(), value.cpu().item()
+        return action.cpu().numpy(), log_prob.cpu().numpy(), value.cpu().numpy()
     
     def evaluate_actions(self, states, actions):
         """
@@ -97,109 +121,185 @@ class PPO:
         
         return values, log_probs, entropy
     
-    def update(self, memory):
+    def update(self, buffer):
         """
         更新网络参数
         
+        每个PPO轮次把缓冲区打乱后完整划分为若干个BATCH_SIZE大小的小批次，共进行PPO_EPOCHS轮；
+        一轮结束时若新旧策略的近似KL散度超过TARGET_KL则提前停止。
+        
         参数:
-            memory: 经验回放缓冲区
+            buffer: RolloutBuffer经验缓冲区
             
         返回:
-            actor_loss: Actor网络损失
-            critic_loss: Critic网络损失
-        """
-        # 从经验回放中获取数据
-        states = torch.FloatTensor(memory.states).to(self.device)
-        actions = torch.FloatTensor(memory.actions).to(self.device)
-        old_log_probs = torch.FloatTensor(memory.log_probs).to(self.device)
-        rewards = torch.FloatTensor(memory.rewards).to(self.device)
-        dones = torch.FloatTensor(memory.dones).to(self.device)
-        
-        # 计算优势函数和回报
-        advantages, returns = self._compute_gae(rewards, dones, memory.values)
+            stats: 本次更新的统计信息字典，包括actor_loss、critic_loss、approx_kl、clip_fraction、
+                   epochs (实际轮数)、sample_reuse (每条经验平均参与梯度计算的次数)、update_time (秒)
+        """
+        start_time = time.perf_counter()
+        
+        # 缓冲区中的数据已经是连续的张量，按时间步优先展平后直接使用
+        num_samples = len(buffer)
+        shape = (buffer.step, buffer.num_envs)
+        rewards = buffer.flat('rewards').reshape(shape)
+        values = buffer.flat('values').reshape(shape)
+        
+        # 计算优势函数和回报: 在(T, E)布局上按时间反向扫描一次，所有环境同时计算
+        advantages, returns = self._compute_gae(
+            rewards, values,
+            buffer.flat('terminated').reshape(shape),
+            buffer.flat('truncated').reshape(shape),
+            buffer.flat('bootstrap_values').reshape(shape),
+            buffer.last_values.to(self.device)
+        )
+        advantages = advantages.reshape(-1)
+        returns = returns.reshape(-1)
         advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
         
-        # PPO更新
-        for _ in range(self.config.NUM_MINI_BATCHES):
-            # 随机采样
-            batch_indices = np.random.choice(len(states), self.config.BATCH_SIZE, replace=False)
-            
-            batch_states = states[batch_indices]
-            batch_actions = actions[batch_indices]
-            batch_old_log_probs = old_log_probs[batch_indices]
-            batch_advantages = advantages[batch_indices]
-            batch_returns = returns[batch_indices]
+        # PPO更新: 每轮打乱一次，依次使用全部小批次
+        batch_size = min(self.config.BATCH_SIZE, num_samples)
+        target_kl = self.config.TARGET_KL
+        samples_used = 0
+        epochs = 0
+        for _ in range(self.config.PPO_EPOCHS):
+            epochs += 1
+            kl_sum = 0.0
+            clipped = 0.0
+            for batch in buffer.minibatches(batch_size, advantages=advantages, returns=returns):
+                batch_states = batch['states']
+                batch_actions = batch['actions']
+                batch_old_log_probs = batch['log_probs']
+                batch_advantages = batch['advantages']
+                batch_returns = batch['returns']
+                
+                # 评估动作
+                values, log_probs, entropy = self.evaluate_actions(batch_states, batch_actions)
+                
+                # 计算actor损失
+                log_ratio = log_probs - batch_old_log_probs
+                ratio = torch.exp(log_ratio)
+                surr1 = ratio * batch_advantages
+                surr2 = torch.clamp(ratio, 1.0 - self.clip_ratio, 1.0 + self.clip_ratio) * batch_advantages
+                actor_loss = -torch.min(surr1, surr2).mean() - self.entropy_coef * entropy.mean()
+                
+                # 计算critic损失
+                values = values.squeeze(-1)
+                critic_loss = F.mse_loss(values, batch_returns)
+                
+                # 更新网络
+                self.actor_optimizer.zero_grad()
+                actor_loss.backward()
+                nn.utils.clip_grad_norm_(self.actor.parameters(), self.max_grad_norm)
+                self.actor_optimizer.step()
+                
+                self.critic_optimizer.zero_grad()
+                critic_loss.backward()
+                nn.utils.clip_grad_norm_(self.critic.parameters(), self.max_grad_norm)
+                self.critic_optimizer.step()
+                
+                # 近似KL散度 (k3估计) 与裁剪比例，按样本数累加
+                with torch.no_grad():
+                    kl_sum += ((ratio - 1) - log_ratio).sum().item()
+                    clipped += ((ratio - 1).abs() > self.clip_ratio).sum().item()
+                samples_used += len(batch_states)
             
-            # 评估动作
-            values, log_probs, entropy = self.evaluate_actions(batch_states, batch_actions)
-            
-            # 计算actor损失
-            ratio = torch.exp(log_probs - batch_old_log_probs)
-            surr1 = ratio * batch_advantages
-            surr2 = torch.clamp(ratio, 1.0 - self.clip_ratio, 1.0 + self.clip_ratio) * batch_advantages
-            actor_loss = -torch.min(surr1, surr2).mean() - self.entropy_coef * entropy.mean()
-            
-            # 计算critic损失
-            values = values.squeeze(-1)
-            critic_loss = F.mse_loss(values, batch_returns)
-            
-            # 更新网络
-            self.actor_optimizer.zero_grad()
-            actor_loss.backward()
-            nn.utils.clip_grad_norm_(self.actor.parameters(), self.max_grad_norm)
-            self.actor_optimizer.step()
-            
-            self.critic_optimizer.zero_grad()
-            critic_loss.backward()
-            nn.utils.clip_grad_norm_(self.critic.parameters(), self.max_grad_norm)
-            self.critic_optimizer.step()
+            approx_kl = kl_sum / num_samples
+            clip_fraction = clipped / num_samples
+            if target_kl is not None and approx_kl > target_kl:
+                break
         
         self.total_steps += 1
         
-        return actor_loss.item(), critic_loss.item()
+        return {
+            'actor_loss': actor_loss.item(),
+            'critic_loss': critic_loss.item(),
+            'approx_kl': approx_kl,
+            'clip_fraction': clip_fraction,
+            'epochs': epochs,
+            'sample_reuse': samples_used / num_samples,
+            'update_time': time.perf_counter() - start_time
+        }
     
-    def _compute_gae(self, rewards, dones, values):
+    def _compute_gae(self, rewards, values, terminated, truncated, bootstrap_values, last_values):
         """
         计算广义优势估计(GAE)和回报
         
+        所有输入为(T, E)布局。下一状态的价值默认取下一时间步的values，最后一步取last_values；
+        截断时取结束状态的bootstrap_values，真正终止时为0。终止与截断都会切断GAE的累积。
+        δ整体向量化计算，只有累积项需要沿时间反向扫描一次，每一步同时处理E个环境。
+        
         参数:
-            rewards: 奖励序列
-            dones: 结束标志序列
-            values: 价值估计序列
+            rewards: 奖励，形状为(T, E)
+            values: 价值估计，形状为(T, E)
+            terminated: 终止标志，形状为(T, E)
+            truncated: 截断标志，形状为(T, E)
+            bootstrap_values: 截断时结束状态的价值，形状为(T, E)
+            last_values: 收集结束时最后一个状态的价值，形状为(E,)
             
         返回:
-            advantages: 优势函数
-            returns: 回报
+            advantages: 优势函数，形状为(T, E)
+            returns: 回报，形状为(T, E)
         """
-        values = values + [0.0]  # 添加最后一个状态的价值(0)
-        
-        # 计算GAE
-        advantages = torch.zeros_like(rewards)
-        returns = torch.zeros_like(rewards)
-        gae = 0
+        next_values = torch.cat([values[1:], last_values.unsqueeze(0)])
+        next_values = torch.where(truncated > 0, bootstrap_values, next_values)
+        deltas = rewards + self.gamma * next_values * (1 - terminated) - values
+        discounts = self.gamma * self.gae_lambda * (1 - torch.maximum(terminated, truncated))
         
-        for t in reversed(range(len(rewards))):
-            delta = rewards[t] + self.gamma * values[t + 1] * (1 - dones[t]) - values[t]
-            gae = delta + self.gamma * self.gae_lambda * (1 - dones[t]) * gae
+        advantages = torch.empty_like(rewards)
+        gae = torch.zeros_like(last_values)
+        for t in range(len(rewards) - 1, -1, -1):
+            gae = deltas[t] + discounts[t] * gae
             advantages[t] = gae
-            returns[t] = advantages[t] + values[t]
+        returns = advantages + values
         
         return advantages, returns
     
-    def save_models(self, path):
+    def estimate_values(self, states):
         """
-        保存模型
+        批量估计状态价值
         
         参数:
-            path: 保存路径
+            states: 形状为(state_dim,)或(B, state_dim)的状态
+            
+        返回:
+            values: 形状为()或(B,)的价值数组
+        """
+        states = torch.as_tensor(np.asarray(states), dtype=torch.float32, device=self.device)
+        with torch.no_grad():
+            values = self.critic(states).squeeze(-1)
+        return values.cpu().numpy()
+    
+    def numpy_policy(self):
+        """
+        导出当前Actor与Critic权重的NumPy快照
+        
+        返回:
+            policy: NumpyPolicy实例
         """
-        torch.save({
+        return NumpyPolicy.from_state_dicts(self.actor.state_dict(), self.critic.state_dict(), self.total_steps)
+    
+    def checkpoint_state(self):
+        """
+        返回可保存的状态快照 (复制到CPU，之后继续训练不影响快照)
+        
+        返回:
+            state: 包含网络参数、优化器状态与更新次数的字典
+        """
+        return snapshot_to_cpu({
             'actor': self.actor.state_dict(),
             'critic': self.critic.state_dict(),
             'actor_optimizer': self.actor_optimizer.state_dict(),
             'critic_optimizer': self.critic_optimizer.state_dict(),
             'total_steps': self.total_steps
-        }, path)
+        })
+    
+    def save_models(self, path):
+        """
+        保存模型 (同步、原子写入)
+        
+        参数:
+            path: 保存路径
+        """
+        write_checkpoint(self.checkpoint_state(), path)
     
     def load_models(self, path):
         """
@@ -208,10 +308,109 @@ class PPO:
         参数:
             path: 加载路径
         """
-        checkpoint = torch.load(path)
+        self.load_state(torch.load(path, map_location=self.device))
+    
+    def load_state(self, checkpoint):
+        """
+        恢复checkpoint_state返回的状态
         
+        参数:
+            checkpoint: 状态字典
+        """
         self.actor.load_state_dict(checkpoint['actor'])
         self.critic.load_state_dict(checkpoint['critic'])
         self.actor_optimizer.load_state_dict(checkpoint['actor_optimizer'])
         self.critic_optimizer.load_state_dict(checkpoint['critic_optimizer'])
-        self.total_steps = checkpoint['total_steps'] 
\ No newline at end of file
+        self.total_steps = checkpoint['total_steps']
+
+def _scalar_gae(rewards, dones, values, gamma, gae_lambda):
+    """
+    原实现: 在一条展平的序列上逐元素反向计算GAE，末尾状态的价值固定为0 (用于对照)
+    """
+    values = values + [0.0]
+    advantages = torch.zeros_like(rewards)
+    returns = torch.zeros_like(rewards)
+    gae = 0
+    for t in reversed(range(len(rewards))):
+        delta = rewards[t] + gamma * values[t + 1] * (1 - dones[t]) - values[t]
+        gae = delta + gamma * gae_lambda * (1 - dones[t]) * gae
+        advantages[t] = gae
+        returns[t] = advantages[t] + values[t]
+    return advantages, returns
+
+
+if __name__ == "__main__":
+    # 向量化GAE与原逐元素实现的一致性检查和耗时比较
+    from configs import Config
+
+    config = Config()
+    agent = PPO(4, 4, config)
+    generator = torch.Generator().manual_seed(config.SEED)
+
+    for num_steps, num_envs in [(100, 1), (2048, 64)]:
+        shape = (num_steps, num_envs)
+        rewards = torch.rand(shape, generator=generator)
+        values = torch.rand(shape, generator=generator)
+        terminated = (torch.rand(shape, generator=generator) < 0.01).float()
+        terminated[-1] = 1.0
+        zeros = torch.zeros(shape)
+
+        # 只有终止、末尾价值为0时，两种实现应完全一致 (原实现按环境依次拼接成一条序列)
+        start = time.perf_counter()
+        scalar_advantages, scalar_returns = _scalar_gae(rewards.T.reshape(-1), terminated.T.reshape(-1),
+                                                        values.T.reshape(-1).tolist(), agent.gamma, agent.gae_lambda)
+        scalar_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        advantages, returns = agent._compute_gae(rewards, values, terminated, zeros, zeros, torch.zeros(num_envs))
+        vector_ms = (time.perf_counter() - start) * 1000
+
+        error = max((advantages.T.reshape(-1) - scalar_advantages).abs().max().item(),
+                    (returns.T.reshape(-1) - scalar_returns).abs().max().item())
+        print(f"T={num_steps}, E={num_envs}: 逐元素 {scalar_ms:.1f} ms, 向量化 {vector_ms:.2f} ms, "
+              f"加速 {scalar_ms / vector_ms:.0f}x, 最大误差 {error:.1e}")
+
+    # 截断: 等价于把γ·V(结束状态)加到奖励上后按终止处理
+    truncated = (torch.rand(shape, generator=generator) < 0.01).float() * (1 - terminated)
+    bootstrap_values = torch.rand(shape, generator=generator) * truncated
+    last_values = torch.rand(num_envs, generator=generator)
+    terminated[-1] = 0.0
+    advantages, _ = agent._compute_gae(rewards, values, terminated, truncated, bootstrap_values, last_values)
+    folded_rewards = rewards + agent.gamma * bootstrap_values * truncated
+    folded_rewards[-1] += agent.gamma * last_values * (1 - terminated[-1] - truncated[-1])
+    folded_dones = torch.maximum(terminated, truncated)
+    folded_dones[-1] = 1.0
+    expected, _ = agent._compute_gae(folded_rewards, values, folded_dones, zeros, zeros, torch.zeros(num_envs))
+    print(f"截断自举与末尾自举的最大误差: {(advantages - expected).abs().max().item():.1e}")
+
+    # 批量动作选择与逐个调用原select_action的延迟和吞吐量比较
+    def legacy_select_action(state):
+        state = torch.FloatTensor(state).unsqueeze(0).to(agent.device)
+        with torch.no_grad():
+            action, log_prob, _ = agent.actor.sample(state)
+            value = agent.critic(state)
+        action_np = action.cpu().numpy()[0]
+        exploration_decay = max(0.05, 0.3 - 0.0001 * agent.total_steps)
+        if np.random.random() < exploration_decay:
+            noise_scale = max(0.001, 0.01 * (1.0 - agent.total_steps / 10000))
+            action_np = action_np + np.random.normal(0, noise_scale, size=action_np.shape)
+        return action_np, log_prob.cpu().item(), value.cpu().item()
+
+    torch.set_num_threads(1)
+    agent = PPO(2 * config.DRONE_NUM, 2 * config.DRONE_NUM, config)
+    print(f"{'批大小':>6} {'逐个(ms)':>10} {'批量(ms)':>10} {'逐个(状态/秒)':>14} {'批量(状态/秒)':>14}")
+    for batch_size in [1, 64, 1024]:
+        states = np.random.random((batch_size, 2 * config.DRONE_NUM)).astype(np.float32)
+        repeats = max(2, 2000 // batch_size)
+        agent.select_actions(states)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for state in states:
+                legacy_select_action(state)
+        legacy_ms = (time.perf_counter() - start) / repeats * 1000
+        start = time.perf_counter()
+        for _ in range(repeats):
+            agent.select_actions(states)
+        batched_ms = (time.perf_counter() - start) / repeats * 1000
+        print(f"{batch_size:>6} {legacy_ms:>10.3f} {batched_ms:>10.3f} {batch_size / legacy_ms * 1000:>14.0f} "
+              f"{batch_size / batched_ms * 1000:>14.0f}")
@@ -0,0 +1,194 @@
+import numpy as np
+import torch
+
+
+class RolloutBuffer:
+    """
+    预分配的经验缓冲区
+
+    按(时间步T, 环境数E)的布局一次性分配连续的NumPy数组，并通过torch.from_numpy得到共享同一块内存的张量；
+    push时用NumPy原地写入下一个时间步 (比逐字段的torch拷贝开销小)，
+    可以一次写入单个环境的一步，也可以一次写入批量环境同一时间步的E条经验。
+    flat返回展平的张量视图，minibatches每轮只打乱一次，之后按连续切片给出小批次视图，不再逐批复制。
+    """
+
+    FIELDS = ('states', 'actions', 'log_probs', 'rewards', 'terminated', 'truncated', 'values', 'bootstrap_values')
+    BATCH_FIELDS = ('states', 'actions', 'log_probs', 'values')
+
+    def __init__(self, num_steps, state_dim, action_dim, num_envs=1, device='cpu'):
+        """
+        初始化缓冲区
+
+        参数:
+            num_steps: 每个环境最多保存的时间步数T
+            state_dim: 状态维度
+            action_dim: 动作维度
+            num_envs: 环境数E
+            device: 张量所在设备
+        """
+        self.num_steps = num_steps
+        self.num_envs = num_envs
+        self.state_dim = state_dim
+        self.action_dim = action_dim
+        self.device = torch.device(device)
+
+        shape = (num_steps, num_envs)
+        self.arrays = {
+            'states': np.zeros(shape + (state_dim,), dtype=np.float32),
+            'actions': np.zeros(shape + (action_dim,), dtype=np.float32),
+            'log_probs': np.zeros(shape, dtype=np.float32),
+            'rewards': np.zeros(shape, dtype=np.float32),
+            'terminated': np.zeros(shape, dtype=np.float32),
+            'truncated': np.zeros(shape, dtype=np.float32),
+            'values': np.zeros(shape, dtype=np.float32),
+            'bootstrap_values': np.zeros(shape, dtype=np.float32)  # 截断时结束状态的价值
+        }
+        # 与NumPy数组共享内存的张量
+        for name, array in self.arrays.items():
+            setattr(self, name, torch.from_numpy(array))
+
+        # 收集在回合中途停止时，最后一个状态的价值
+        self.last_values = torch.zeros(num_envs, dtype=torch.float32)
+
+        # 打乱后的数据放在另一组预分配的张量中，minibatches从中切片
+        self._shuffled = {name: torch.empty((num_steps * num_envs,) + self.arrays[name].shape[2:], dtype=torch.float32, device=self.device)
+                          for name in self.BATCH_FIELDS}
+        self.step = 0
+
+    def push(self, state, action, log_prob, reward, terminated, truncated, value, bootstrap_value=0.0):
+        """
+        写入一个时间步的经验
+
+        参数:
+            state: 状态，形状为(state_dim,)或(E, state_dim)
+            action: 动作，形状为(action_dim,)或(E, action_dim)
+            log_prob: 动作的对数概率，标量或(E,)
+            reward: 奖励，标量或(E,)
+            terminated: 回合是否真正结束 (之后的价值为0)，标量或(E,)
+            truncated: 回合是否被截断 (之后的价值取bootstrap_value)，标量或(E,)
+            value: 状态价值，标量或(E,)
+            bootstrap_value: 截断时结束状态的价值，标量或(E,)
+        """
+        if self.step >= self.num_steps:
+            raise RuntimeError(f"缓冲区已满 (容量{self.num_steps}步 × {self.num_envs}个环境)")
+
+        row = self.step
+        arrays = self.arrays
+        arrays['states'][row] = state
+        arrays['actions'][row] = action
+        arrays['log_probs'][row] = log_prob
+        arrays['rewards'][row] = reward
+        arrays['terminated'][row] = terminated
+        arrays['truncated'][row] = truncated
+        arrays['values'][row] = value
+        arrays['bootstrap_values'][row] = bootstrap_value
+        self.step += 1
+
+    def set_last_values(self, last_values):
+        """
+        记录收集结束时最后一个状态的价值，用于未结束轨迹的GAE自举
+
+        参数:
+            last_values: 标量或(E,)
+        """
+        self.last_values[:] = torch.as_tensor(last_values, dtype=torch.float32)
+
+    def flat(self, name):
+        """
+        返回已写入部分展平为(T*E, ...)的视图 (时间步优先)
+
+        参数:
+            name: 字段名
+
+        返回:
+            tensor: CPU上为不复制数据的视图，其他设备上为一次拷贝
+        """
+        tensor = getattr(self, name)[:self.step]
+        return tensor.reshape((self.step * self.num_envs,) + tensor.shape[2:]).to(self.device)
+
+    def minibatches(self, batch_size, generator=None, **extra):
+        """
+        打乱已写入的经验并按小批次给出
+
+        参数:
+            batch_size: 小批次大小
+            generator: torch随机数生成器
+            extra: 其他与经验一一对应、形状为(T*E, ...)的张量 (例如优势与回报)，一起打乱
+
+        返回:
+            生成器，每次给出BATCH_FIELDS与extra中字段名到张量视图的字典
+        """
+        size = len(self)
+        permutation = torch.randperm(size, generator=generator, device=self.device)
+        shuffled = {}
+        for name in self.BATCH_FIELDS:
+            shuffled[name] = torch.index_select(self.flat(name), 0, permutation, out=self._shuffled[name][:size])
+        for name, tensor in extra.items():
+            shuffled[name] = tensor[permutation]
+
+        for start in range(0, size, batch_size):
+            yield {name: tensor[start:start + batch_size] for name, tensor in shuffled.items()}
+
+    def clear(self):
+        """
+        清空缓冲区 (只重置写入位置，不释放内存)
+        """
+        self.step = 0
+        self.last_values.zero_()
+
+    def full(self):
+        """
+        返回缓冲区是否已满
+        """
+        return self.step >= self.num_steps
+
+    def __len__(self):
+        """
+        返回已写入的经验条数 (T*E)
+        """
+        return self.step * self.num_envs
+
+
+if __name__ == "__main__":
+    # 与基于列表的Memory + torch.FloatTensor的耗时比较
+    import time
+
+    num_steps, state_dim = 1000, 16
+    rng = np.random.default_rng(0)
+    transitions = [(rng.random(state_dim, dtype=np.float32), rng.random(state_dim, dtype=np.float32),
+                    float(rng.random()), float(rng.random()), False, False, float(rng.random())) for _ in range(num_steps)]
+
+    # 原实现: 六个列表逐条append (终止与截断合并为dones)，更新时torch.FloatTensor(列表)
+    start = time.perf_counter()
+    lists = [[] for _ in range(6)]
+    for transition in transitions:
+        for values, value in zip(lists, transition[:5] + transition[6:]):
+            values.append(value)
+    tensors = [torch.FloatTensor(values) for values in lists]
+    legacy_ms = (time.perf_counter() - start) * 1000
+
+    buffer = RolloutBuffer(num_steps, state_dim, state_dim)
+    start = time.perf_counter()
+    for transition in transitions:
+        buffer.push(*transition)
+    tensors = [buffer.flat(name) for name in buffer.FIELDS]
+    push_ms = (time.perf_counter() - start) * 1000
+    assert torch.equal(tensors[0], torch.from_numpy(np.array([transition[0] for transition in transitions])))
+    print(f"单环境{num_steps}步写入并转为张量: 列表 {legacy_ms:.2f} ms, RolloutBuffer {push_ms:.2f} ms")
+
+    num_envs = 64
+    batched = RolloutBuffer(num_steps // 10, state_dim, state_dim, num_envs=num_envs)
+    batch = (rng.random((num_envs, state_dim), dtype=np.float32), rng.random((num_envs, state_dim), dtype=np.float32),
+             rng.random(num_envs), rng.random(num_envs), np.zeros(num_envs, dtype=bool), np.zeros(num_envs, dtype=bool),
+             rng.random(num_envs))
+    start = time.perf_counter()
+    for _ in range(batched.num_steps):
+        batched.push(*batch)
+    batched_ms = (time.perf_counter() - start) * 1000
+    print(f"批量写入 {batched.num_steps}步 × {num_envs}个环境: {batched_ms:.2f} ms")
+
+    start = time.perf_counter()
+    batches = list(batched.minibatches(64))
+    shuffle_ms = (time.perf_counter() - start) * 1000
+    print(f"打乱并切分为{len(batches)}个小批次: {shuffle_ms:.2f} ms, "
+          f"小批次与预分配存储共享内存: {batches[0]['states'].data_ptr() == batched._shuffled['states'].data_ptr()}")
@@ -0,0 +1,284 @@
+import time
+import numpy as np
+from reward.overlap import lens_area, clipped_pair_area
+
+
+class IncrementalCoverage:
+    """
+    增量覆盖状态
+
+    保存每个POI被覆盖的次数、每个栅格被覆盖的次数以及两两重叠面积矩阵，
+    无人机库移动时只撤销旧位置、加入新位置对应的那一行，不必重新计算全部覆盖范围。
+    结果与RasterCoverage.evaluate、PoiCoverageKernel.count、pairwise_overlap的全量计算一致。
+    """
+
+    def __init__(self, poi_kernel, raster, radius, overlap_mode='raster', overlap_raster=None):
+        """
+        初始化增量覆盖状态
+
+        参数:
+            poi_kernel: PoiCoverageKernel实例
+            raster: RasterCoverage实例，用于覆盖面积 (以及raster模式下的重叠面积)
+            radius: 覆盖半径 (与坐标同单位)
+            overlap_mode: 重叠面积的计算方式，'raster' 用栅格计数，'analytic' 用两两重叠面积矩阵
+            overlap_raster: analytic模式下把重叠面积裁剪到区域内所用的RasterCoverage，为None时不裁剪
+        """
+        self.poi_kernel = poi_kernel
+        self.raster = raster
+        self.radius = float(radius)
+        self.overlap_mode = overlap_mode
+        self.overlap_raster = overlap_raster
+
+        self.counts = np.zeros((raster.height, raster.width), dtype=np.int16)
+        self.positions = None
+        self.blocks = []
+        self.coverage_area = 0.0
+        self.pair_cells = 0
+        self.poi_inside = None  # (N, K) 每个POI是否在每个库的覆盖范围内
+        self.poi_counts = None  # (N,) 每个POI被覆盖的次数
+        self.poi_covered = 0
+        self.pair_areas = None  # (K, K) 两两重叠面积
+
+    def reset(self, positions):
+        """
+        按一组完整的位置重建全部状态
+
+        参数:
+            positions: 形状为(K, 2)或展平的(2K,)的无人机库坐标
+
+        返回:
+            与evaluate相同
+        """
+        positions = np.array(positions, dtype=np.float64).reshape(-1, 2)
+        self.positions = positions
+
+        # 栅格计数
+        self.counts[...] = 0
+        self.blocks = [self.raster.disk(center) for center in positions]
+        for rows, cols, mask in self.blocks:
+            self.counts[rows, cols] += mask
+        self.coverage_area = 0.0
+        self.pair_cells = 0
+        for rows, cols, mask in self.blocks:
+            block_counts = self.counts[rows, cols][mask]
+            self.coverage_area += float((self.raster.cell_area[rows, cols][mask] / block_counts).sum())
+            self.pair_cells += int((block_counts - 1).sum())
+
+        # POI覆盖次数
+        self.poi_inside = self.poi_kernel.inside_matrix(positions, self.radius)
+        self.poi_counts = self.poi_inside.sum(axis=1, dtype=np.int32)
+        self.poi_covered = int(np.count_nonzero(self.poi_counts))
+
+        # 两两重叠面积
+        if self.overlap_mode == 'analytic':
+            self.pair_areas = np.zeros((len(positions), len(positions)))
+            for i in range(len(positions)):
+                self.pair_areas[i] = self.pair_areas[:, i] = self._overlap_row(i)
+
+        return self.evaluate()
+
+    def update(self, positions):
+        """
+        更新到一组新的位置，只处理坐标发生变化的无人机库
+
+        参数:
+            positions: 形状为(K, 2)或展平的(2K,)的无人机库坐标
+
+        返回:
+            与evaluate相同
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        if self.positions is None or positions.shape != self.positions.shape:
+            return self.reset(positions)
+
+        for index in np.flatnonzero((positions != self.positions).any(axis=1)):
+            self.move(index, positions[index])
+        return self.evaluate()
+
+    def move(self, index, position):
+        """
+        移动一个无人机库
+
+        参数:
+            index: 无人机库下标
+            position: 新坐标 (x, y)
+        """
+        self.positions[index] = position
+
+        # 栅格: 先撤销旧的圆，再盖上新的圆
+        self._remove_disk(self.blocks[index])
+        self.blocks[index] = self.raster.disk(self.positions[index])
+        self._add_disk(self.blocks[index])
+
+        # POI: 覆盖次数归零的POI不再被覆盖，从零变为非零的POI新被覆盖
+        old_column = self.poi_inside[:, index]
+        self.poi_counts -= old_column
+        self.poi_covered -= int(np.count_nonzero(old_column & (self.poi_counts == 0)))
+        new_column = self.poi_kernel.inside_matrix(self.positions[index], self.radius)[:, 0]
+        self.poi_covered += int(np.count_nonzero(new_column & (self.poi_counts == 0)))
+        self.poi_counts += new_column
+        self.poi_inside[:, index] = new_column
+
+        # 重叠面积矩阵: 只更新该库所在的行和列
+        if self.overlap_mode == 'analytic':
+            row = self._overlap_row(index)
+            self.pair_areas[index] = row
+            self.pair_areas[:, index] = row
+
+    def evaluate(self):
+        """
+        返回当前状态的覆盖结果
+
+        返回:
+            coverage_area: 覆盖范围与区域的交集面积
+            overlap_area: 两两重叠面积之和
+            poi_covered: 被覆盖的POI数量
+        """
+        if self.overlap_mode == 'analytic':
+            overlap_area = float(self.pair_areas.sum(axis=1).sum()) / 2
+        else:
+            overlap_area = self.pair_cells / 2 * self.raster.cell_area_full
+        return self.coverage_area, overlap_area, self.poi_covered
+
+    def get_state(self):
+        """
+        返回可恢复的状态副本 (累计的面积按原样保存，恢复后与不中断时逐位一致)
+        
+        返回:
+            state: 状态字典
+        """
+        copy = lambda value: None if value is None else value.copy()
+        return {
+            'positions': copy(self.positions),
+            'counts': self.counts.copy(),
+            'coverage_area': self.coverage_area,
+            'pair_cells': self.pair_cells,
+            'poi_inside': copy(self.poi_inside),
+            'poi_counts': copy(self.poi_counts),
+            'poi_covered': self.poi_covered,
+            'pair_areas': copy(self.pair_areas)
+        }
+    
+    def set_state(self, state):
+        """
+        恢复get_state返回的状态，每个库的栅格圆由位置重新计算
+        
+        参数:
+            state: get_state返回的字典
+        """
+        copy = lambda value: None if value is None else value.copy()
+        self.positions = copy(state['positions'])
+        self.counts[...] = state['counts']
+        self.coverage_area = state['coverage_area']
+        self.pair_cells = state['pair_cells']
+        self.poi_inside = copy(state['poi_inside'])
+        self.poi_counts = copy(state['poi_counts'])
+        self.poi_covered = state['poi_covered']
+        self.pair_areas = copy(state['pair_areas'])
+        self.blocks = [] if self.positions is None else [self.raster.disk(center) for center in self.positions]
+    
+    def _remove_disk(self, block):
+        """
+        从计数栅格中撤销一个圆，并扣除它单独覆盖的面积与参与的重叠栅格
+        """
+        rows, cols, mask = block
+        block_counts = self.counts[rows, cols][mask]
+        self.coverage_area -= float(self.raster.cell_area[rows, cols][mask][block_counts == 1].sum())
+        # pair_cells按每个栅格k*(k-1)累计 (与RasterCoverage.evaluate一致)，k减1时减少2*(k-1)
+        self.pair_cells -= 2 * int((block_counts - 1).sum())
+        self.counts[rows, cols] -= mask
+
+    def _add_disk(self, block):
+        """
+        向计数栅格中加入一个圆，并累加新覆盖的面积与新增的重叠栅格
+        """
+        rows, cols, mask = block
+        self.counts[rows, cols] += mask
+        block_counts = self.counts[rows, cols][mask]
+        self.coverage_area += float(self.raster.cell_area[rows, cols][mask][block_counts == 1].sum())
+        self.pair_cells += 2 * int((block_counts - 1).sum())
+
+    def _overlap_row(self, index):
+        """
+        计算一个无人机库与其他所有库的重叠面积
+
+        返回:
+            row: 形状为(K,)的重叠面积，自身位置为0
+        """
+        distance = np.sqrt(((self.positions - self.positions[index]) ** 2).sum(axis=-1))
+        if self.overlap_raster is None:
+            row = lens_area(distance, self.radius)
+        else:
+            row = np.zeros(len(self.positions))
+            disk = self.overlap_raster.disk(self.positions[index])
+            for j in np.flatnonzero(distance < 2 * self.radius):
+                if j != index:
+                    row[j] = clipped_pair_area(disk, self.overlap_raster.disk(self.positions[j]), self.overlap_raster)
+        row[index] = 0.0
+        return row
+
+
+if __name__ == "__main__":
+    # 只移动一个无人机库时，增量更新与全量重新计算的耗时比较
+    import contextlib
+    import io
+    from configs import Config
+    from reward.overlap import pairwise_overlap
+    from reward.poi_coverage import PoiCoverageKernel
+    from scenario.loader import Scenario
+
+    config = Config()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scenario = Scenario.from_config(config)
+    radius = config.DRONE_RADIUS / 111000
+    raster = scenario.raster_coverage(config.RASTER_RESOLUTION / 111000, radius)
+    index = scenario.region_index
+    rng = np.random.default_rng(config.SEED)
+    steps = 500
+
+    def random_points(num):
+        points = np.empty((0, 2))
+        while len(points) < num:
+            candidates = np.column_stack([rng.uniform(index.bounds[0], index.bounds[2], num),
+                                          rng.uniform(index.bounds[1], index.bounds[3], num)])
+            points = np.vstack([points, candidates[index.contains(candidates)]])
+        return points[:num]
+
+    print(f"{'POI数量':>8} {'重叠模式':>8} {'全量(ms)':>10} {'增量(ms)':>10} {'加速比':>8} {'最大误差':>10}")
+    for num_poi in [len(scenario.poi_kernel), 100000]:
+        if num_poi == len(scenario.poi_kernel):
+            kernel = scenario.poi_kernel
+        else:
+            poi = random_points(num_poi)
+            kernel = PoiCoverageKernel(poi[:, 0], poi[:, 1])
+
+        for overlap_mode in ['raster', 'analytic']:
+            # 每一步随机选一个库移动一小段距离
+            layouts = [random_points(config.DRONE_NUM)]
+            for _ in range(steps):
+                layout = layouts[-1].copy()
+                layout[rng.integers(config.DRONE_NUM)] += rng.uniform(-0.01, 0.01, 2)
+                layouts.append(layout)
+
+            start = time.perf_counter()
+            full = []
+            for layout in layouts[1:]:
+                coverage_area, overlap_area = raster.evaluate(layout)
+                if overlap_mode == 'analytic':
+                    overlap_area, _ = pairwise_overlap(layout, radius)
+                full.append((coverage_area, overlap_area, kernel.count(layout, radius)))
+            full_ms = (time.perf_counter() - start) / steps * 1000
+
+            state = IncrementalCoverage(kernel, raster, radius, overlap_mode=overlap_mode)
+            state.reset(layouts[0])
+            start = time.perf_counter()
+            incremental = [state.update(layout) for layout in layouts[1:]]
+            incremental_ms = (time.perf_counter() - start) / steps * 1000
+
+            full = np.array(full)
+            incremental = np.array(incremental)
+            assert np.array_equal(full[:, 2], incremental[:, 2])
+            error = np.abs(full[:, :2] - incremental[:, :2]).max() / raster.region_area
+            print(f"{num_poi:>8} {overlap_mode:>8} {full_ms:>10.3f} {incremental_ms:>10.3f} "
+                  f"{full_ms / incremental_ms:>7.1f}x {error:>10.1e}")
+    print("说明: 最大误差为覆盖/重叠面积差值占区域面积的比例，POI覆盖数量完全一致")
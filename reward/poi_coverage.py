@@ -0,0 +1,254 @@
+import time
+import numpy as np
+
+
+class PoiCoverageKernel:
+    """
+    POI覆盖计算核
+
+    POI坐标在初始化时一次性保存为连续的float64数组，
+    每次计算时用广播构造 POI × 无人机库 的距离矩阵，再按行做any归约，
+    取代逐个POI调用shapely的 buffer.contains。
+
+    shapely的buffer是圆的内接正多边形 (默认每1/4圆16段，共64边)，
+    为了与原实现的覆盖计数完全一致，落在多边形边心距与半径之间的
+    少量POI会再按多边形的边做一次精确判断。
+    """
+
+    def __init__(self, xs, ys, quad_segs=16, chunk_size=65536):
+        """
+        初始化POI覆盖计算核
+
+        参数:
+            xs: POI横坐标 (经度)
+            ys: POI纵坐标 (纬度)
+            quad_segs: 与shapely buffer一致的每1/4圆分段数，为None时按真实圆形判断
+            chunk_size: 分块大小，POI数量很大时按块计算以限制距离矩阵的内存占用
+        """
+        self.xs = np.ascontiguousarray(xs, dtype=np.float64)
+        self.ys = np.ascontiguousarray(ys, dtype=np.float64)
+        self.num_poi = len(self.xs)
+        self.quad_segs = quad_segs
+        self.chunk_size = chunk_size
+
+    def __len__(self):
+        """
+        返回POI数量
+        """
+        return self.num_poi
+
+    def distance_sq(self, centers, start=0, stop=None):
+        """
+        计算POI到各无人机库的距离平方矩阵
+
+        参数:
+            centers: 无人机库坐标，形状为(K, 2)或展平的(2K,)
+            start: POI起始下标
+            stop: POI结束下标
+
+        返回:
+            dist_sq: 形状为(N, K)的距离平方矩阵
+        """
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        dx = self.xs[start:stop, None] - centers[None, :, 0]
+        dy = self.ys[start:stop, None] - centers[None, :, 1]
+        return dx * dx + dy * dy
+
+    def covered_mask(self, centers, radius):
+        """
+        计算每个POI是否被至少一个无人机库覆盖
+
+        参数:
+            centers: 无人机库坐标，形状为(K, 2)或展平的(2K,)
+            radius: 覆盖半径 (与坐标同单位)
+
+        返回:
+            mask: 形状为(N,)的布尔数组
+        """
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        mask = np.empty(self.num_poi, dtype=bool)
+        for start in range(0, self.num_poi, self.chunk_size):
+            stop = min(start + self.chunk_size, self.num_poi)
+            mask[start:stop] = self._inside(centers, radius, start, stop).any(axis=1)
+        return mask
+
+    def inside_matrix(self, centers, radius):
+        """
+        计算每个POI是否落在每个无人机库的覆盖范围内
+
+        参数:
+            centers: 无人机库坐标，形状为(K, 2)或展平的(2K,)
+            radius: 覆盖半径 (与坐标同单位)
+
+        返回:
+            inside: 形状为(N, K)的布尔矩阵
+        """
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        inside = np.empty((self.num_poi, len(centers)), dtype=bool)
+        for start in range(0, self.num_poi, self.chunk_size):
+            stop = min(start + self.chunk_size, self.num_poi)
+            inside[start:stop] = self._inside(centers, radius, start, stop)
+        return inside
+
+    def count_batch(self, centers, radius):
+        """
+        批量统计多组布局各自覆盖的POI数量
+
+        参数:
+            centers: 形状为(B, K, 2)的无人机库坐标
+            radius: 覆盖半径 (与坐标同单位)
+
+        返回:
+            covered: 形状为(B,)的覆盖POI数量
+        """
+        centers = np.asarray(centers, dtype=np.float64)
+        num_layouts, num_drones = centers.shape[0], centers.shape[1]
+        flat_centers = centers.reshape(-1, 2)
+        covered = np.zeros(num_layouts, dtype=np.int64)
+        for start in range(0, self.num_poi, self.chunk_size):
+            stop = min(start + self.chunk_size, self.num_poi)
+            inside = self._inside(flat_centers, radius, start, stop)
+            covered += inside.reshape(-1, num_layouts, num_drones).any(axis=2).sum(axis=0)
+        return covered
+
+    def _inside(self, centers, radius, start, stop):
+        """
+        计算一块POI是否落在各无人机库的覆盖范围内
+
+        参数:
+            centers: 形状为(K, 2)的无人机库坐标
+            radius: 覆盖半径
+            start: POI起始下标
+            stop: POI结束下标
+
+        返回:
+            inside: 形状为(stop-start, K)的布尔矩阵
+        """
+        radius = float(radius)
+        radius_sq = radius ** 2
+        if self.quad_segs is None:
+            inner_sq = radius_sq
+        else:
+            inner_sq = (radius * np.cos(np.pi / (4 * self.quad_segs))) ** 2
+
+        dist_sq = self.distance_sq(centers, start, stop)
+        inside = dist_sq < inner_sq
+        # 边心距与半径之间的环带需要按多边形边精确判断
+        band_rows, band_cols = np.nonzero((dist_sq >= inner_sq) & (dist_sq < radius_sq))
+        if len(band_rows) > 0:
+            dx = self.xs[start + band_rows] - centers[band_cols, 0]
+            dy = self.ys[start + band_rows] - centers[band_cols, 1]
+            inside[band_rows, band_cols] = self._inside_polygon(dx, dy, radius)
+        return inside
+
+    def contains_offsets(self, dx, dy, radius):
+        """
+        判断一组相对中心的偏移是否落在覆盖范围内，判定规则与count完全一致
+        (用于预先计算候选点 × POI 覆盖矩阵)
+
+        参数:
+            dx: 相对中心的横向偏移
+            dy: 相对中心的纵向偏移
+            radius: 覆盖半径
+
+        返回:
+            inside: 布尔数组
+        """
+        dx = np.asarray(dx, dtype=np.float64)
+        dy = np.asarray(dy, dtype=np.float64)
+        radius = float(radius)
+        dist_sq = dx * dx + dy * dy
+        if self.quad_segs is None:
+            return dist_sq < radius ** 2
+        inside = dist_sq < (radius * np.cos(np.pi / (4 * self.quad_segs))) ** 2
+        band = ~inside & (dist_sq < radius ** 2)
+        inside[band] = self._inside_polygon(dx[band], dy[band], radius)
+        return inside
+
+    def _inside_polygon(self, dx, dy, radius):
+        """
+        判断相对中心的偏移(dx, dy)是否严格落在buffer正多边形内部
+
+        参数:
+            dx: 相对中心的横向偏移
+            dy: 相对中心的纵向偏移
+            radius: 多边形外接圆半径
+
+        返回:
+            inside: 布尔数组
+        """
+        num_edges = 4 * self.quad_segs
+        step = 2 * np.pi / num_edges
+        # 找到点所在扇区对应的边 (顶点位于 k*step 角度上，与shapely一致)
+        angle = np.mod(np.arctan2(dy, dx), 2 * np.pi)
+        k = np.floor(angle / step)
+        x0, y0 = radius * np.cos(k * step), radius * np.sin(k * step)
+        x1, y1 = radius * np.cos((k + 1) * step), radius * np.sin((k + 1) * step)
+        # 逆时针的边，内部在左侧；边界上的点不算覆盖，与contains一致
+        cross = (x1 - x0) * (dy - y0) - (y1 - y0) * (dx - x0)
+        return cross > 0
+
+    def count(self, centers, radius):
+        """
+        统计被覆盖的POI数量
+
+        参数:
+            centers: 无人机库坐标
+            radius: 覆盖半径 (与坐标同单位)
+
+        返回:
+            covered: 被覆盖的POI数量
+        """
+        return int(np.count_nonzero(self.covered_mask(centers, radius)))
+
+
+def _shapely_count(poi_gdf, centers, radius):
+    """
+    原实现: 逐行遍历POI并与每个buffer调用contains (用于对照)
+    """
+    from shapely.geometry import Point
+    buffers = [Point(c[0], c[1]).buffer(radius) for c in centers]
+    covered = 0
+    for _, poi in poi_gdf.iterrows():
+        for buffer in buffers:
+            if buffer.contains(poi.geometry):
+                covered += 1
+                break
+    return covered
+
+
+if __name__ == "__main__":
+    # 基准测试: 随POI数量变化的耗时对比
+    import geopandas as gpd
+    from configs import Config
+
+    config = Config()
+    rng = np.random.default_rng(config.SEED)
+    bounds = (119.54, 29.75, 120.19, 30.20)  # 富阳区大致范围
+    radius = config.DRONE_RADIUS / 111000
+    repeats = 20
+
+    print(f"{'POI数量':>10} | {'shapely (ms)':>12} | {'NumPy (ms)':>10} | {'加速比':>8} | 一致")
+    for num_poi in [61, 1000, 10000, 100000, 1000000]:
+        xs = rng.uniform(bounds[0], bounds[2], num_poi)
+        ys = rng.uniform(bounds[1], bounds[3], num_poi)
+        centers = np.column_stack([
+            rng.uniform(bounds[0], bounds[2], config.DRONE_NUM),
+            rng.uniform(bounds[1], bounds[3], config.DRONE_NUM)
+        ]).astype(np.float32)
+        kernel = PoiCoverageKernel(xs, ys)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fast = kernel.count(centers, radius)
+        fast_ms = (time.perf_counter() - start) / repeats * 1000
+
+        # 原实现在大规模POI上太慢，只测到1万
+        if num_poi <= 10000:
+            poi_gdf = gpd.GeoDataFrame(geometry=gpd.points_from_xy(xs, ys), crs="EPSG:4326")
+            start = time.perf_counter()
+            slow = _shapely_count(poi_gdf, centers, radius)
+            slow_ms = (time.perf_counter() - start) * 1000
+            print(f"{num_poi:>10} | {slow_ms:>12.2f} | {fast_ms:>10.3f} | {slow_ms / fast_ms:>7.0f}x | {slow == fast} ({slow}/{fast})")
+        else:
+            print(f"{num_poi:>10} | {'-':>12} | {fast_ms:>10.3f} | {'-':>8} | -")
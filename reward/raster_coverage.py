@@ -0,0 +1,208 @@
+import time
+import numpy as np
+import shapely
+
+
+class RasterCoverage:
+    """
+    栅格化的区域覆盖计算
+
+    初始化时按给定分辨率预先计算区域的布尔掩膜和每个栅格在区域内的面积，
+    每步只需把各无人机库的圆形覆盖范围"盖章"到计数栅格上，
+    覆盖面积和重叠面积都化为对栅格的求和，取代shapely的union与intersection。
+    """
+
+    def __init__(self, region_geometry, resolution, radius, cell_area=None):
+        """
+        初始化栅格覆盖计算
+
+        参数:
+            region_geometry: 区域几何形状
+            resolution: 栅格边长 (与坐标同单位)
+            radius: 无人机覆盖半径 (与坐标同单位)
+            cell_area: 预先计算好的栅格面积数组 (例如来自共享内存)，为None时重新计算
+        """
+        self.region_geometry = region_geometry
+        self.resolution = float(resolution)
+        self.radius = float(radius)
+
+        # 栅格范围在区域边界外扩一个半径，保证区域外的重叠部分也被完整计入
+        min_x, min_y, max_x, max_y = region_geometry.bounds
+        self.origin_x = min_x - self.radius
+        self.origin_y = min_y - self.radius
+        self.width = int(np.ceil((max_x + self.radius - self.origin_x) / self.resolution))
+        self.height = int(np.ceil((max_y + self.radius - self.origin_y) / self.resolution))
+
+        # 栅格中心坐标 (行对应y，列对应x)
+        self.xs = self.origin_x + (np.arange(self.width) + 0.5) * self.resolution
+        self.ys = self.origin_y + (np.arange(self.height) + 0.5) * self.resolution
+
+        # 每个栅格的完整面积，以及落在区域内的面积
+        self.cell_area_full = self.resolution ** 2
+        self.cell_area = self._region_cell_area() if cell_area is None else cell_area
+        self.region_mask = self.cell_area > 0
+        self.region_area = float(self.cell_area.sum())
+
+        self.counts = np.zeros((self.height, self.width), dtype=np.int16)
+
+    def _region_cell_area(self):
+        """
+        计算每个栅格与区域的交集面积，内部栅格为完整面积，边界栅格按精确交集计算
+
+        返回:
+            cell_area: 形状为(H, W)的面积数组
+        """
+        x0 = self.origin_x + np.arange(self.width) * self.resolution
+        y0 = self.origin_y + np.arange(self.height) * self.resolution
+        grid_x0, grid_y0 = np.meshgrid(x0, y0)
+        boxes = shapely.box(grid_x0, grid_y0, grid_x0 + self.resolution, grid_y0 + self.resolution)
+
+        shapely.prepare(self.region_geometry)
+        cell_area = np.zeros((self.height, self.width), dtype=np.float64)
+        inside = shapely.contains(self.region_geometry, boxes)
+        cell_area[inside] = self.cell_area_full
+        boundary = shapely.intersects(self.region_geometry, boxes) & ~inside
+        cell_area[boundary] = shapely.area(shapely.intersection(boxes[boundary], self.region_geometry))
+        return cell_area
+
+    def disk(self, center):
+        """
+        计算一个圆形覆盖范围在栅格上的包围块和块内掩膜
+
+        参数:
+            center: 圆心坐标 (x, y)
+
+        返回:
+            rows: 行切片
+            cols: 列切片
+            mask: 块内栅格中心是否落在圆内的布尔数组
+        """
+        cx, cy = float(center[0]), float(center[1])
+        c0 = max(int(np.floor((cx - self.radius - self.origin_x) / self.resolution)), 0)
+        c1 = min(int(np.ceil((cx + self.radius - self.origin_x) / self.resolution)) + 1, self.width)
+        r0 = max(int(np.floor((cy - self.radius - self.origin_y) / self.resolution)), 0)
+        r1 = min(int(np.ceil((cy + self.radius - self.origin_y) / self.resolution)) + 1, self.height)
+
+        dx = self.xs[c0:c1] - cx
+        dy = self.ys[r0:r1] - cy
+        mask = dy[:, None] ** 2 + dx[None, :] ** 2 <= self.radius ** 2
+        return slice(r0, max(r1, r0)), slice(c0, max(c1, c0)), mask
+
+    def stamp(self, centers):
+        """
+        将所有圆形覆盖范围盖章到一张新的计数栅格
+
+        参数:
+            centers: 形状为(K, 2)的圆心坐标
+
+        返回:
+            counts: 每个栅格被覆盖的次数
+        """
+        counts = np.zeros((self.height, self.width), dtype=np.int16)
+        for center in np.asarray(centers, dtype=np.float64).reshape(-1, 2):
+            rows, cols, mask = self.disk(center)
+            counts[rows, cols] += mask
+        return counts
+
+    def evaluate(self, centers):
+        """
+        计算覆盖面积与两两重叠面积
+
+        只在各圆的包围块内求和，计数栅格用完后减回全零，不需要遍历整张栅格。
+
+        参数:
+            centers: 形状为(K, 2)的圆心坐标
+
+        返回:
+            coverage_area: 覆盖范围与区域的交集面积
+            overlap_area: 所有无人机库两两覆盖范围的交集面积之和 (不裁剪到区域)
+        """
+        blocks = [self.disk(center) for center in np.asarray(centers, dtype=np.float64).reshape(-1, 2)]
+        for rows, cols, mask in blocks:
+            self.counts[rows, cols] += mask
+
+        coverage_area = 0.0
+        pair_cells = 0
+        for rows, cols, mask in blocks:
+            block_counts = self.counts[rows, cols][mask]
+            # 被k个圆覆盖的栅格会在k个块中各出现一次，按1/k加权后恰好计入一次
+            coverage_area += float((self.cell_area[rows, cols][mask] / block_counts).sum())
+            # 两两交集之和中该栅格计入 k*(k-1)/2 次，分摊到k个块各 (k-1)/2 次
+            pair_cells += int((block_counts - 1).sum())
+
+        for rows, cols, mask in blocks:
+            self.counts[rows, cols] -= mask
+
+        overlap_area = pair_cells / 2 * self.cell_area_full
+        return coverage_area, overlap_area
+
+
+    def evaluate_batch(self, centers):
+        """
+        批量计算多组布局的覆盖面积与两两重叠面积
+
+        参数:
+            centers: 形状为(B, K, 2)的圆心坐标
+
+        返回:
+            coverage_area: 形状为(B,)的覆盖面积
+            overlap_area: 形状为(B,)的两两重叠面积之和
+        """
+        results = np.array([self.evaluate(layout) for layout in np.asarray(centers)], dtype=np.float64)
+        return results[:, 0], results[:, 1]
+
+
+def _shapely_areas(region_geometry, centers, radius):
+    """
+    原实现: 逐个union合并buffer，再两两intersection (用于对照)
+    """
+    from shapely.geometry import Point
+    buffers = [Point(c[0], c[1]).buffer(radius) for c in centers]
+    merged_buffer = buffers[0]
+    for buffer in buffers[1:]:
+        merged_buffer = merged_buffer.union(buffer)
+    coverage_area = merged_buffer.intersection(region_geometry).area
+    overlap_area = 0
+    for i in range(len(buffers)):
+        for j in range(i + 1, len(buffers)):
+            overlap_area += buffers[i].intersection(buffers[j]).area
+    return coverage_area, overlap_area
+
+
+if __name__ == "__main__":
+    # 精度与分辨率的关系: 与shapely精确结果对比
+    import geopandas as gpd
+    from configs import Config
+
+    config = Config()
+    region_geometry = gpd.read_file(config.REGION_FILE).geometry.iloc[0]
+    region_area = region_geometry.area
+    radius = config.DRONE_RADIUS / 111000
+    min_x, min_y, max_x, max_y = region_geometry.bounds
+
+    rng = np.random.default_rng(config.SEED)
+    layouts = [
+        np.column_stack([rng.uniform(min_x, max_x, config.DRONE_NUM), rng.uniform(min_y, max_y, config.DRONE_NUM)])
+        for _ in range(50)
+    ]
+
+    start = time.perf_counter()
+    exact = [_shapely_areas(region_geometry, layout, radius) for layout in layouts]
+    shapely_ms = (time.perf_counter() - start) / len(layouts) * 1000
+    exact = np.array(exact) / region_area
+    print(f"shapely: {shapely_ms:.2f} ms/步")
+
+    print(f"{'分辨率(米)':>10} | {'栅格':>9} | {'预计算(ms)':>10} | {'每步(ms)':>8} | {'覆盖率误差(均值/最大)':>20} | {'重叠率误差(均值/最大)':>20}")
+    for resolution_m in [1000, 500, 200, 100, 50]:
+        start = time.perf_counter()
+        raster = RasterCoverage(region_geometry, resolution_m / 111000, radius)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        approx = [raster.evaluate(layout) for layout in layouts]
+        step_ms = (time.perf_counter() - start) / len(layouts) * 1000
+        approx = np.array(approx) / region_area
+
+        err = np.abs(approx - exact)
+        print(f"{resolution_m:>10} | {raster.height:>4}x{raster.width:<4} | {build_ms:>10.1f} | {step_ms:>8.3f} | "
+              f"{err[:, 0].mean():>9.5f} / {err[:, 0].max():<8.5f} | {err[:, 1].mean():>9.5f} / {err[:, 1].max():<8.5f}")
@@ -1,20 +1,21 @@
 import numpy as np
 from shapely.geometry import Point, MultiPolygon
 import geopandas as gpd
-import rasterio
-from pyproj import Transformer
+from scenario.elevation import ElevationGrid
+from reward.overlap import pairwise_overlap
 
 class RewardCalculator:
     """
     奖励计算器，用于计算无人机覆盖的奖励
     """
     
-    def __init__(self, config):
+    def __init__(self, config, elevation_grid=None):
         """
         初始化奖励计算器
         
         参数:
             config: 配置类实例
+            elevation_grid: 共享的ElevationGrid实例，为None时自行加载DEM
         """
         self.config = config
         self.drone_radius = config.DRONE_RADIUS
@@ -23,20 +24,23 @@ class RewardCalculator:
         self.poi_weight = 0.1  # POI覆盖率权重
         self.area_weight = 0.1  # 区域覆盖率权重
         self.overlap_penalty = 0.1  # 重叠惩罚系数
+        self.overlap_mode = config.OVERLAP_MODE  # 重叠面积计算方式
         
         # 海拔相关配置
         self.elevation_threshold = config.ELEVATION_THRESHOLD  # 海拔阈值
         self.elevation_penalty_weight = config.ELEVATION_PENALTY_WEIGHT  # 海拔惩罚权重
         
-        # 加载DEM数据
-        try:
-            self.dem_data = rasterio.open(config.DEM_FILE)
-            # 创建坐标转换器 (GCJ-02 -> EPSG:4326，因为DEM通常是WGS84)
-            self.transformer = Transformer.from_crs("EPSG:4326", self.dem_data.crs.to_string(), always_xy=True)
-        except Exception as e:
-            print(f"加载DEM数据失败: {e}")
-            self.dem_data = None
-            self.transformer = None
+        # 区域与POI只投影一次，按传入对象缓存 (METRIC_CRS为None时沿用经纬度近似)
+        self._scenarios = []
+        
+        # 加载DEM数据 (一次性读入内存)
+        self.elevation_grid = elevation_grid
+        if self.elevation_grid is None:
+            try:
+                self.elevation_grid = ElevationGrid.from_config(config)
+            except Exception as e:
+                print(f"加载DEM数据失败: {e}")
+                self.elevation_grid = None
     
     def get_elevation(self, lon, lat):
         """
@@ -49,29 +53,51 @@ class RewardCalculator:
         返回:
             elevation: 海拔高度 (米)，如果无法获取则返回0
         """
-        if self.dem_data is None:
-            return 0
+        return float(self.get_elevations([[lon, lat]])[0])
+    
+    def get_elevations(self, positions):
+        """
+        批量获取海拔高度
         
-        try:
-            # 转换坐标 (GCJ-02 -> DEM的坐标系统)
-            x, y = self.transformer.transform(lon, lat)
-            
-            # 将坐标转换为像素索引
-            row, col = self.dem_data.index(x, y)
+        参数:
+            positions: 形状为(N, 2)的经纬度数组
             
-            # 读取高程值
-            if 0 <= row < self.dem_data.height and 0 <= col < self.dem_data.width:
-                elevation = self.dem_data.read(1)[row, col]
-                # 检查是否为NODATA
-                if elevation == self.dem_data.nodata:
-                    return 0
-                return float(elevation)
-            else:
-                return 0
+        返回:
+            elevations: 形状为(N,)的海拔数组 (米)，无法获取的位置为0
+        """
+        positions = np.asarray(positions).reshape(-1, 2)
+        if self.elevation_grid is None:
+            return np.zeros(len(positions))
+        
+        try:
+            return self.elevation_grid.sample(positions)
         except Exception as e:
             print(f"获取海拔高度时出错: {e}")
-            return 0
+            return np.zeros(len(positions))
         
+    def _reward_scenario(self, region_geometry, poi_gdf):
+        """
+        获取 (并缓存) 区域与POI在奖励坐标系中的场景
+        
+        参数:
+            region_geometry: 区域几何形状 (经纬度)
+            poi_gdf: POI的GeoDataFrame (经纬度)
+            
+        返回:
+            scenario: 奖励计算所用的Scenario实例
+        """
+        # scenario包依赖reward包中的计算核，这里延迟导入以避免循环导入
+        from scenario.loader import Scenario
+        
+        for cached_region, cached_poi, scenario in self._scenarios:
+            if cached_region is region_geometry and cached_poi is poi_gdf:
+                return scenario
+        
+        scenario = Scenario(region_geometry, poi_gdf.geometry.x.values, poi_gdf.geometry.y.values)
+        scenario = scenario.for_reward(self.config)
+        self._scenarios.append((region_geometry, poi_gdf, scenario))
+        return scenario
+    
     def calculate(self, drone_positions, region_geometry, poi_gdf):
         """
         计算奖励
@@ -85,17 +111,20 @@ class RewardCalculator:
             reward: 奖励值
             info: 额外信息，包含覆盖率等
         """
+        # 区域与POI已在奖励坐标系中 (米制坐标系下覆盖范围是真实的圆)，只需转换无人机库坐标
+        scenario = self._reward_scenario(region_geometry, poi_gdf)
+        radius = self.drone_radius * scenario.units_per_metre
+        reward_positions = scenario.from_lonlat(np.asarray(drone_positions, dtype=np.float64).reshape(-1, 2))
+        region_geometry = scenario.region_geometry
+        
         # 构建无人机库的点
-        drone_points = [Point(pos[0], pos[1]) for pos in drone_positions]
+        drone_points = [Point(pos[0], pos[1]) for pos in reward_positions]
         
-        # 获取每个点的海拔高度
-        drone_elevations = []
-        for pos in drone_positions:
-            elevation = self.get_elevation(pos[0], pos[1])
-            drone_elevations.append(elevation)
+        # 批量获取每个点的海拔高度
+        drone_elevations = self.get_elevations(drone_positions).tolist()
         
         # 计算每个无人机库的覆盖范围 (buffer)
-        drone_buffers = [point.buffer(self.drone_radius) for point in drone_points]
+        drone_buffers = [point.buffer(radius) for point in drone_points]
         
         # 合并所有覆盖范围
         merged_buffer = None
@@ -105,11 +134,18 @@ class RewardCalculator:
                 merged_buffer = merged_buffer.union(buffer)
         
         # 计算覆盖重叠度
-        overlap_area = 0
-        for i in range(len(drone_buffers)):
-            for j in range(i + 1, len(drone_buffers)):
-                intersection = drone_buffers[i].intersection(drone_buffers[j])
-                overlap_area += intersection.area
+        if self.overlap_mode == 'analytic':
+            # 解析公式一次得到总重叠面积与每个库的重叠面积
+            overlap_area, overlap_per_drone = pairwise_overlap(reward_positions, radius)
+        else:
+            overlap_area = 0
+            overlap_per_drone = np.zeros(len(drone_buffers))
+            for i in range(len(drone_buffers)):
+                for j in range(i + 1, len(drone_buffers)):
+                    intersection = drone_buffers[i].intersection(drone_buffers[j])
+                    overlap_area += intersection.area
+                    overlap_per_drone[i] += intersection.area
+                    overlap_per_drone[j] += intersection.area
         
         # 计算与行政区域的交集面积
         region_area = region_geometry.area
@@ -125,14 +161,9 @@ class RewardCalculator:
         # 计算覆盖率
         coverage_ratio = coverage_area / region_area
         
-        # 计算POI覆盖率
-        poi_covered = 0
-        for idx, poi in poi_gdf.iterrows():
-            poi_point = poi.geometry
-            for buffer in drone_buffers:
-                if buffer.contains(poi_point):
-                    poi_covered += 1
-                    break
+        # 计算POI覆盖率 (每个POI是否在每个库的覆盖范围内)
+        poi_inside = scenario.poi_kernel.inside_matrix(reward_positions, radius)
+        poi_covered = int(np.count_nonzero(poi_inside.any(axis=1)))
         
         poi_coverage_ratio = poi_covered / len(poi_gdf)
         
@@ -155,19 +186,13 @@ class RewardCalculator:
         drone_rewards = []
         for i, buffer in enumerate(drone_buffers):
             # 计算单个无人机的POI覆盖
-            poi_covered_single = 0
-            for idx, poi in poi_gdf.iterrows():
-                if buffer.contains(poi.geometry):
-                    poi_covered_single += 1
+            poi_covered_single = int(np.count_nonzero(poi_inside[:, i]))
             
             # 计算单个无人机的区域覆盖
             area_covered_single = buffer.intersection(region_geometry).area
             
-            # 计算与其他无人机的重叠
-            overlap_single = 0
-            for j, other_buffer in enumerate(drone_buffers):
-                if i != j:
-                    overlap_single += buffer.intersection(other_buffer).area
+            # 与其他无人机的重叠
+            overlap_single = overlap_per_drone[i]
             
             # 获取该无人机的海拔惩罚
             elev_penalty_single = 0
@@ -191,8 +216,8 @@ class RewardCalculator:
             'poi_covered': poi_covered,
             'total_poi': len(poi_gdf),
             'drone_rewards': drone_rewards,
-            'merged_buffer': merged_buffer,
-            'drone_buffers': drone_buffers,
+            'merged_buffer': scenario.to_lonlat_geometry(merged_buffer),
+            'drone_buffers': [scenario.to_lonlat_geometry(buffer) for buffer in drone_buffers],
             'drone_elevations': drone_elevations,
             'elevation_penalty': elevation_penalty
         }
@@ -0,0 +1,157 @@
+import time
+import argparse
+import numpy as np
+import shapely
+from models import NumpyPolicy
+from scenario.sampler import RegionSampler
+from env.drone_env import disperse_positions
+
+class PlacementRunner:
+    """
+    轻量推理器
+
+    只加载export.py导出的Actor (TorchScript、NumPy权重或ONNX) 和场景数据包，不创建环境、PPO对象与优化器。
+    使用NumPy权重或ONNX时不需要导入torch。
+    选址结果与eval.py相同: 从与DroneEnvironment.reset相同方式采样的初始布局出发，
+    每步查询Actor并按DroneEnvironment.step的状态转移推进MAX_STEPS步，取最终状态。
+    环境目前不使用动作 (位置只按disperse_positions的主动分散逻辑更新)，因此结果由初始布局决定；
+    Actor的输出取动作均值，只用于与评估保持同样的推理流程。
+    """
+
+    def __init__(self, model_path, bundle_path):
+        """
+        初始化推理器
+
+        参数:
+            model_path: actor.pt (TorchScript)、actor.npz (NumPy权重) 或 actor.onnx (需要onnxruntime)
+            bundle_path: scenario.npz场景数据包
+        """
+        bundle = np.load(bundle_path)
+        self.region_geometry = shapely.from_wkb(bundle['region_wkb'].tobytes())
+        self.sampler = RegionSampler(self.region_geometry)
+        self.bounds = bundle['bounds']
+        self.poi = np.column_stack([bundle['poi_xs'], bundle['poi_ys']])
+        self.drone_num = int(bundle['drone_num'])
+        self.radius = float(bundle['drone_radius'])
+        self.min_distance = float(bundle['min_distance'])
+        self.max_steps = int(bundle['max_steps'])
+
+        # POI坐标为奖励坐标系 (米制) 时，选址结果先转换过去再统计覆盖
+        self.transformer = None
+        crs = str(bundle['crs'])
+        if crs:
+            from pyproj import Transformer
+            self.transformer = Transformer.from_crs("EPSG:4326", crs, always_xy=True)
+
+        if model_path.endswith('.npz'):
+            policy = NumpyPolicy(dict(np.load(model_path)))
+            self._forward = lambda states: policy.forward(states)[0]
+        elif model_path.endswith('.onnx'):
+            import onnxruntime
+            session = onnxruntime.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+            self._forward = lambda states: session.run(None, {'states': states})[0]
+        else:
+            import torch
+            module = torch.jit.load(model_path, map_location='cpu').eval()
+
+            def forward(states):
+                with torch.inference_mode():
+                    return module(torch.from_numpy(states)).numpy()
+            self._forward = forward
+
+    def initial_layouts(self, num_layouts, rng):
+        """
+        采样初始布局 (与DroneEnvironment.reset相同: 最小间距为覆盖半径的20%，无法满足时其余点忽略间距)
+
+        参数:
+            num_layouts: 布局数量
+            rng: numpy随机数生成器
+
+        返回:
+            states: 形状为(num_layouts, 2*DRONE_NUM)的float32状态
+        """
+        layouts = []
+        for _ in range(num_layouts):
+            positions = self.sampler.sample_spaced(self.drone_num, self.min_distance, rng)
+            if len(positions) < self.drone_num:
+                positions = np.vstack([positions, self.sampler.sample(self.drone_num - len(positions), rng)])
+            layouts.append(positions.reshape(-1))
+        return np.array(layouts, dtype=np.float32)
+
+    def step(self, states, actions, rng):
+        """
+        与DroneEnvironment.step相同的状态转移
+
+        参数:
+            states: 形状为(B, 2*DRONE_NUM)的状态
+            actions: 形状为(B, 2*DRONE_NUM)的动作 (与环境一致，目前不参与状态转移)
+            rng: numpy随机数生成器
+
+        返回:
+            states: 新的状态
+        """
+        positions = disperse_positions(states.reshape(len(states), -1, 2), self.bounds, rng)
+        # 所有库都在区域外的布局重新生成
+        inside = shapely.contains_xy(self.region_geometry, positions[..., 0], positions[..., 1])
+        all_outside = ~inside.any(axis=1)
+        states = positions.reshape(len(states), -1)
+        if all_outside.any():
+            states[all_outside] = self.initial_layouts(int(all_outside.sum()), rng)
+        return states
+
+    def place(self, num_layouts=1, seed=None, states=None):
+        """
+        生成选址结果
+
+        参数:
+            num_layouts: 布局数量 (states为None时使用)
+            seed: 采样初始布局与状态转移的随机种子
+            states: 形状为(B, 2*DRONE_NUM)的初始状态，为None时随机采样
+
+        返回:
+            positions: 形状为(B, DRONE_NUM, 2)的经纬度选址结果 (MAX_STEPS步后的状态)
+            inside: 形状为(B, DRONE_NUM)的是否在区域内
+            poi_covered: 形状为(B,)的被覆盖POI数量
+        """
+        rng = np.random.default_rng(seed)
+        if states is None:
+            states = self.initial_layouts(num_layouts, rng)
+        states = np.ascontiguousarray(states, dtype=np.float32)
+        for _ in range(self.max_steps):
+            actions = self._forward(states)
+            states = self.step(states, actions, rng)
+        positions = states.reshape(len(states), -1, 2)
+        inside = shapely.contains_xy(self.region_geometry, positions[..., 0], positions[..., 1])
+
+        centers = positions.astype(np.float64)
+        if self.transformer is not None:
+            x, y = self.transformer.transform(centers[..., 0], centers[..., 1])
+            centers = np.stack([x, y], axis=-1)
+        poi_covered = np.array([
+            int((((self.poi[:, None] - layout[None]) ** 2).sum(axis=-1) <= self.radius ** 2).any(axis=1).sum())
+            for layout in centers
+        ])
+        return positions, inside, poi_covered
+
+if __name__ == "__main__":
+    # 解析命令行参数
+    parser = argparse.ArgumentParser(description="Run exported placement policy")
+    parser.add_argument("--model", type=str, default="result/export/actor.pt", help="Path to exported actor (.pt, .npz or .onnx)")
+    parser.add_argument("--bundle", type=str, default="result/export/scenario.npz", help="Path to scenario bundle")
+    parser.add_argument("--layouts", type=int, default=1, help="Number of layouts to generate")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for initial layouts and state transitions")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    runner = PlacementRunner(args.model, args.bundle)
+    load_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    positions, inside, poi_covered = runner.place(args.layouts, args.seed)
+    place_ms = (time.perf_counter() - start) * 1000
+
+    print(f"加载 {load_ms:.0f} ms, 推理 {place_ms:.1f} ms")
+    for index, layout in enumerate(positions):
+        print(f"布局 {index+1}: 区域内 {int(inside[index].sum())}/{len(layout)}, 覆盖POI {poi_covered[index]}/{len(runner.poi)}")
+        for i, pos in enumerate(layout):
+            print(f"  无人机 {i+1}: 经度={pos[0]:.6f}, 纬度={pos[1]:.6f}")
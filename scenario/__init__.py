@@ -0,0 +1,5 @@
+from scenario.elevation import ElevationGrid
+from scenario.region import RegionIndex
+from scenario.sampler import RegionSampler
+from scenario.candidates import CandidateIndex
+from scenario.loader import Scenario
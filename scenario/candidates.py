@@ -0,0 +1,351 @@
+import os
+import time
+import hashlib
+import numpy as np
+import shapely
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
+
+
+class CandidateIndex:
+    """
+    候选选址点索引
+
+    把区域离散为规则网格上的候选点 (只保留区域内的点)，一次性用KD树求出
+    候选点 × POI 与 候选点 × 栅格 两个CSR稀疏覆盖矩阵，以及每个候选点的海拔，
+    之后任意布局的覆盖只需把位置对齐到最近的候选点，再对稀疏矩阵的行做计数，不再做几何运算。
+    结果按场景与参数的指纹保存为.npz文件，下次直接加载。
+    """
+
+    VERSION = 1
+
+    def __init__(self, sites, poi_matrix, cell_matrix, cell_area, cell_area_full, elevations, radius, spacing,
+                 fingerprint=''):
+        """
+        初始化索引 (一般通过build或load创建)
+
+        参数:
+            sites: 形状为(C, 2)的候选点坐标 (场景坐标系)
+            poi_matrix: 形状为(C, N)的CSR矩阵，候选点覆盖的POI
+            cell_matrix: 形状为(C, M)的CSR矩阵，候选点覆盖的栅格 (栅格中心在圆内)
+            cell_area: 形状为(M,)的每个栅格在区域内的面积 (区域外为0)
+            cell_area_full: 完整栅格的面积
+            elevations: 形状为(C,)的候选点海拔 (米)
+            radius: 覆盖半径 (与坐标同单位)
+            spacing: 候选点间距 (与坐标同单位)
+            fingerprint: 场景与参数的指纹
+        """
+        self.sites = sites
+        self.poi_matrix = poi_matrix
+        self.cell_matrix = cell_matrix
+        # 每行的列下标保持有序，便于按行做有序查找
+        self.poi_matrix.sort_indices()
+        self.cell_matrix.sort_indices()
+        self.cell_area = cell_area
+        self.cell_area_full = float(cell_area_full)
+        self.elevations = elevations
+        self.radius = float(radius)
+        self.spacing = float(spacing)
+        self.fingerprint = fingerprint
+        self.num_sites = len(sites)
+        self.num_poi = poi_matrix.shape[1]
+        self.num_cells = len(cell_area)
+        self.region_area = float(cell_area.sum())
+        self.tree = cKDTree(sites)
+
+    def __len__(self):
+        """
+        返回候选点数量
+        """
+        return self.num_sites
+
+    @staticmethod
+    def fingerprint_of(scenario, spacing, radius, cell_resolution):
+        """
+        计算场景与参数的指纹 (区域、POI坐标、DEM网格数据、坐标系与各参数)
+
+        DEM按内存中的网格数组与仿射变换计入，换了DEM文件或内容后候选点海拔会重新采样。
+
+        返回:
+            fingerprint: 十六进制字符串
+        """
+        digest = hashlib.sha1()
+        digest.update(shapely.to_wkb(scenario.region_geometry))
+        digest.update(scenario.poi_kernel.xs.tobytes())
+        digest.update(scenario.poi_kernel.ys.tobytes())
+        crs = scenario.projection.crs.to_string() if scenario.projection is not None else ''
+        grid = scenario.elevation_grid
+        dem = None
+        if grid is not None:
+            digest.update(np.ascontiguousarray(grid.data).tobytes())
+            dem = (tuple(grid.transform), str(grid.crs), grid.nodata, grid.method, grid.fill_value)
+        digest.update(repr((CandidateIndex.VERSION, crs, dem, float(spacing), float(radius),
+                            float(cell_resolution))).encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def build(cls, scenario, spacing, radius, cell_resolution):
+        """
+        由场景构建索引
+
+        参数:
+            scenario: Scenario实例 (一般为奖励计算所用的米制场景)
+            spacing: 候选点间距 (与坐标同单位)
+            radius: 覆盖半径 (与坐标同单位)
+            cell_resolution: 面积统计所用的栅格边长 (与坐标同单位)
+
+        返回:
+            index: CandidateIndex实例
+        """
+        # 候选点: 区域边界框内的规则网格，只保留区域内的点
+        min_x, min_y, max_x, max_y = scenario.bounds
+        grid_x, grid_y = np.meshgrid(np.arange(min_x + spacing / 2, max_x, spacing),
+                                     np.arange(min_y + spacing / 2, max_y, spacing))
+        sites = np.column_stack([grid_x.ravel(), grid_y.ravel()])
+        sites = sites[scenario.region_index.contains(sites)]
+        site_tree = cKDTree(sites)
+
+        # 候选点 × POI: KD树找出半径内的点对，再按buffer多边形精确判断，与PoiCoverageKernel一致
+        kernel = scenario.poi_kernel
+        poi = np.column_stack([kernel.xs, kernel.ys])
+        pairs = site_tree.sparse_distance_matrix(cKDTree(poi), radius, output_type='ndarray')
+        rows, cols = pairs['i'], pairs['j']
+        inside = kernel.contains_offsets(poi[cols, 0] - sites[rows, 0], poi[cols, 1] - sites[rows, 1], radius)
+        poi_matrix = csr_matrix((np.ones(int(inside.sum()), dtype=np.int8), (rows[inside], cols[inside])),
+                                shape=(len(sites), len(poi)))
+
+        # 候选点 × 栅格: 栅格中心在圆内即计入，栅格范围与RasterCoverage相同 (含区域外的一圈)
+        raster = scenario.raster_coverage(cell_resolution, radius)
+        grid_x, grid_y = np.meshgrid(raster.xs, raster.ys)
+        cells = np.column_stack([grid_x.ravel(), grid_y.ravel()])
+        pairs = site_tree.sparse_distance_matrix(cKDTree(cells), radius, output_type='ndarray')
+        cell_matrix = csr_matrix((np.ones(len(pairs), dtype=np.int8), (pairs['i'], pairs['j'])),
+                                 shape=(len(sites), len(cells)))
+        cell_area = raster.cell_area.ravel()
+
+        # 候选点海拔
+        elevations = np.zeros(len(sites))
+        if scenario.elevation_grid is not None:
+            elevations = scenario.elevation_grid.sample(sites)
+
+        fingerprint = cls.fingerprint_of(scenario, spacing, radius, cell_resolution)
+        return cls(sites, poi_matrix, cell_matrix, cell_area, raster.cell_area_full, elevations, radius, spacing,
+                   fingerprint)
+
+    @classmethod
+    def load_or_build(cls, scenario, spacing, radius, cell_resolution, cache_dir=None):
+        """
+        从缓存目录加载指纹一致的索引，不存在时构建并保存
+
+        参数:
+            scenario: Scenario实例
+            spacing: 候选点间距
+            radius: 覆盖半径
+            cell_resolution: 面积统计所用的栅格边长
+            cache_dir: 缓存目录，为None时不读写缓存
+
+        返回:
+            index: CandidateIndex实例
+        """
+        fingerprint = cls.fingerprint_of(scenario, spacing, radius, cell_resolution)
+        path = os.path.join(cache_dir, f"candidates_{fingerprint[:16]}.npz") if cache_dir else None
+        if path is not None and os.path.exists(path):
+            try:
+                index = cls.load(path)
+                if index.fingerprint == fingerprint:
+                    return index
+            except Exception as e:
+                print(f"加载候选点索引 {path} 失败，重新构建: {e}")
+
+        start = time.perf_counter()
+        index = cls.build(scenario, spacing, radius, cell_resolution)
+        print(f"候选点索引构建完成: {index.num_sites}个候选点, POI覆盖对{index.poi_matrix.nnz}个, "
+              f"栅格覆盖对{index.cell_matrix.nnz}个, 耗时{time.perf_counter() - start:.2f}s")
+        if path is not None:
+            index.save(path)
+        return index
+
+    def save(self, path):
+        """
+        保存为.npz文件 (先写临时文件再重命名)
+
+        参数:
+            path: 输出路径
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}.npz"
+        np.savez(
+            tmp_path,
+            sites=self.sites,
+            poi_indptr=self.poi_matrix.indptr, poi_indices=self.poi_matrix.indices, num_poi=np.array(self.num_poi),
+            cell_indptr=self.cell_matrix.indptr, cell_indices=self.cell_matrix.indices,
+            cell_area=self.cell_area, cell_area_full=np.array(self.cell_area_full),
+            elevations=self.elevations,
+            radius=np.array(self.radius), spacing=np.array(self.spacing),
+            fingerprint=np.array(self.fingerprint)
+        )
+        os.replace(tmp_path, path)
+        print(f"候选点索引已保存到 {path}")
+
+    @classmethod
+    def load(cls, path):
+        """
+        加载save保存的索引
+
+        参数:
+            path: .npz文件路径
+
+        返回:
+            index: CandidateIndex实例
+        """
+        with np.load(path) as data:
+            num_sites = len(data['sites'])
+
+            def matrix(prefix, num_cols):
+                indices = data[f'{prefix}_indices']
+                return csr_matrix((np.ones(len(indices), dtype=np.int8), indices, data[f'{prefix}_indptr']),
+                                  shape=(num_sites, num_cols))
+
+            return cls(data['sites'], matrix('poi', int(data['num_poi'])), matrix('cell', len(data['cell_area'])),
+                       data['cell_area'], float(data['cell_area_full']), data['elevations'], float(data['radius']),
+                       float(data['spacing']), str(data['fingerprint']))
+
+    def nearest(self, positions):
+        """
+        把位置对齐到最近的候选点
+
+        参数:
+            positions: 形状为(..., 2)的坐标
+
+        返回:
+            ids: 形状为(...)的候选点下标
+        """
+        positions = np.asarray(positions, dtype=np.float64)
+        _, ids = self.tree.query(positions.reshape(-1, 2))
+        return ids.reshape(positions.shape[:-1])
+
+    def _row_counts(self, matrix, ids, minlength):
+        """
+        统计一组候选点的行中每一列出现的次数
+        """
+        indptr, indices = matrix.indptr, matrix.indices
+        columns = np.concatenate([indices[indptr[i]:indptr[i + 1]] for i in ids]) if len(ids) else np.empty(0, int)
+        return np.bincount(columns, minlength=minlength)
+
+    def poi_counts(self, ids):
+        """
+        统计每个POI被一组候选点覆盖的次数
+
+        参数:
+            ids: 候选点下标
+
+        返回:
+            counts: 形状为(N,)的覆盖次数
+        """
+        return self._row_counts(self.poi_matrix, np.asarray(ids).ravel(), self.num_poi)
+
+    def cell_counts(self, ids):
+        """
+        统计每个栅格被一组候选点覆盖的次数
+
+        参数:
+            ids: 候选点下标
+
+        返回:
+            counts: 形状为(M,)的覆盖次数
+        """
+        return self._row_counts(self.cell_matrix, np.asarray(ids).ravel(), self.num_cells)
+
+    def evaluate_sites(self, ids):
+        """
+        计算一组候选点的覆盖结果
+
+        参数:
+            ids: 形状为(K,)的候选点下标
+
+        返回:
+            coverage_area: 覆盖栅格在区域内的面积之和
+            overlap_area: 两两重叠面积之和 (不裁剪到区域，与RasterCoverage.evaluate一致)
+            poi_covered: 被覆盖的POI数量
+        """
+        ids = np.asarray(ids).ravel()
+        cell_counts = self.cell_counts(ids)
+        coverage_area = float(self.cell_area[cell_counts > 0].sum())
+        # 被k个圆覆盖的栅格在两两交集之和中计入k*(k-1)/2次
+        overlap_area = float((cell_counts * (cell_counts - 1)).sum()) / 2 * self.cell_area_full
+        poi_covered = int(np.count_nonzero(self.poi_counts(ids)))
+        return coverage_area, overlap_area, poi_covered
+
+    def evaluate(self, positions):
+        """
+        把一组位置对齐到候选点后计算覆盖结果
+
+        参数:
+            positions: 形状为(K, 2)或展平的(2K,)的坐标
+
+        返回:
+            与evaluate_sites相同
+        """
+        return self.evaluate_sites(self.nearest(np.asarray(positions).reshape(-1, 2)))
+
+    def evaluate_batch(self, positions):
+        """
+        批量计算多组布局的覆盖结果
+
+        参数:
+            positions: 形状为(B, K, 2)的坐标
+
+        返回:
+            coverage_area: 形状为(B,)的覆盖面积
+            overlap_area: 形状为(B,)的两两重叠面积之和
+            poi_covered: 形状为(B,)的覆盖POI数量
+        """
+        ids = self.nearest(positions)
+        results = np.array([self.evaluate_sites(layout) for layout in ids], dtype=np.float64).reshape(-1, 3)
+        return results[:, 0], results[:, 1], results[:, 2].astype(np.int64)
+
+
+if __name__ == "__main__":
+    # 构建与加载耗时，以及候选点上的查表结果与几何计算的对照
+    import contextlib
+    import io
+    import tempfile
+    from configs import Config
+    from scenario.loader import Scenario
+
+    config = Config()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scenario = Scenario.from_config(config).for_reward(config)
+    units = scenario.units_per_metre
+    radius = config.DRONE_RADIUS * units
+    rng = np.random.default_rng(config.SEED)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for spacing_m in [2000, 1000, 500]:
+            start = time.perf_counter()
+            index = CandidateIndex.load_or_build(scenario, spacing_m * units, radius,
+                                                 config.CANDIDATE_CELL_RESOLUTION * units, directory)
+            build_s = time.perf_counter() - start
+            start = time.perf_counter()
+            index = CandidateIndex.load_or_build(scenario, spacing_m * units, radius,
+                                                 config.CANDIDATE_CELL_RESOLUTION * units, directory)
+            load_ms = (time.perf_counter() - start) * 1000
+            size_mb = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+                          if name.startswith('candidates_') and f"{index.fingerprint[:16]}" in name) / 2 ** 20
+
+            # 在候选点上的随机布局: 查表与逐步几何计算 (POI核 + 同分辨率栅格) 对照
+            layouts = [index.sites[rng.choice(len(index), config.DRONE_NUM, replace=False)] for _ in range(200)]
+            raster = scenario.raster_coverage(config.CANDIDATE_CELL_RESOLUTION * units, radius)
+            start = time.perf_counter()
+            geometry = [raster.evaluate(layout) + (scenario.poi_kernel.count(layout, radius),) for layout in layouts]
+            geometry_ms = (time.perf_counter() - start) / len(layouts) * 1000
+            start = time.perf_counter()
+            lookup = [index.evaluate(layout) for layout in layouts]
+            lookup_ms = (time.perf_counter() - start) / len(layouts) * 1000
+
+            geometry, lookup = np.array(geometry), np.array(lookup)
+            same_poi = np.array_equal(geometry[:, 2], lookup[:, 2])
+            area_error = np.abs(geometry[:, :2] - lookup[:, :2]).max() / index.region_area
+            print(f"间距{spacing_m}米: {len(index)}个候选点, 构建 {build_s:.2f} s, 加载 {load_ms:.0f} ms, 文件 {size_mb:.1f} MB; "
+                  f"每个布局 几何 {geometry_ms:.3f} ms / 查表 {lookup_ms:.3f} ms; "
+                  f"POI覆盖数一致: {same_poi}, 覆盖/重叠面积最大误差 {area_error:.1e}")
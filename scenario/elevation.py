@@ -0,0 +1,352 @@
+import time
+import numpy as np
+import rasterio
+from rasterio.crs import CRS
+from rasterio.windows import Window
+from rasterio.transform import array_bounds
+from rasterio.warp import Resampling, calculate_default_transform, reproject
+from pyproj import Transformer
+
+
+class ElevationGrid:
+    """
+    内存中的DEM高程网格
+
+    启动时只读取覆盖区域边界的DEM窗口并常驻内存，
+    之后对(N, 2)的经纬度批量查询做向量化的仿射变换与插值，
+    不再在每次查询时从磁盘读取整个DEM波段。
+    """
+
+    def __init__(self, dem_path, bounds=None, src_crs="EPSG:4326", pad=2, method='nearest', fill_value=0.0):
+        """
+        初始化高程网格
+
+        参数:
+            dem_path: DEM文件路径
+            bounds: 区域边界 (min_x, min_y, max_x, max_y)，坐标系为src_crs；为None时读取整个DEM
+            src_crs: 查询坐标的坐标系
+            pad: 窗口四周额外保留的像素数，保证双线性插值在边界处有邻点
+            method: 默认插值方式，'nearest'或'bilinear'
+            fill_value: 超出窗口或为NODATA时返回的值
+        """
+        if method not in ('nearest', 'bilinear'):
+            raise ValueError(f"不支持的插值方式: {method}")
+        self.method = method
+        self.fill_value = float(fill_value)
+
+        with rasterio.open(dem_path) as src:
+            self.src_crs = src_crs
+            self.transformer = self._make_transformer(src.crs, src_crs)
+            window = self._region_window(src, bounds, pad)
+            self._setup(src.read(1, window=window), src.window_transform(window), src.crs, src.nodata)
+            self.window = window
+
+    @classmethod
+    def from_array(cls, data, transform, crs, nodata, src_crs="EPSG:4326", method='nearest', fill_value=0.0, valid=None):
+        """
+        由已在内存中的DEM窗口创建高程网格 (不读取文件，也不复制数组)
+
+        参数:
+            data: DEM窗口数组
+            transform: 窗口的仿射变换
+            crs: DEM坐标系
+            nodata: NODATA值
+            src_crs: 查询坐标的坐标系
+            method: 默认插值方式
+            fill_value: 超出窗口或为NODATA时返回的值
+            valid: 预先计算的有效值掩膜
+
+        返回:
+            grid: ElevationGrid实例
+        """
+        grid = cls.__new__(cls)
+        grid.method = method
+        grid.fill_value = float(fill_value)
+        grid.src_crs = src_crs
+        grid.transformer = cls._make_transformer(crs, src_crs)
+        grid._setup(data, transform, crs, nodata, valid)
+        grid.window = None
+        return grid
+
+    @staticmethod
+    def _make_transformer(crs, src_crs):
+        """
+        创建查询坐标到DEM坐标系的转换器，坐标系一致时返回None以跳过转换
+        """
+        if crs is None or CRS.from_user_input(crs) == CRS.from_user_input(src_crs):
+            return None
+        return Transformer.from_crs(src_crs, CRS.from_user_input(crs).to_string(), always_xy=True)
+
+    def _setup(self, data, transform, crs, nodata, valid=None):
+        """
+        设置网格数据并预计算有效值掩膜与逆仿射变换
+        """
+        self.data = data
+        self.transform = transform
+        self.crs = crs
+        self.nodata = nodata
+
+        # 有效值掩膜 (排除NODATA与非有限值)
+        if valid is None:
+            valid = np.isfinite(self.data)
+            if self.nodata is not None:
+                valid &= self.data != self.nodata
+        self.valid = valid
+        self.height, self.width = self.data.shape
+
+        # 预先取出逆仿射变换系数: col = a*x + b*y + c, row = d*x + e*y + f
+        inverse = ~self.transform
+        self._inv = (inverse.a, inverse.b, inverse.c, inverse.d, inverse.e, inverse.f)
+
+    @classmethod
+    def from_config(cls, config, bounds=None):
+        """
+        根据配置创建高程网格
+
+        参数:
+            config: 配置类实例
+            bounds: 区域边界 (经纬度)
+
+        返回:
+            grid: ElevationGrid实例
+        """
+        return cls(
+            config.DEM_FILE,
+            bounds=bounds,
+            method=config.DEM_INTERPOLATION
+        )
+
+    def _region_window(self, src, bounds, pad):
+        """
+        计算覆盖区域边界的DEM读取窗口
+
+        参数:
+            src: 打开的rasterio数据集
+            bounds: 区域边界
+            pad: 额外保留的像素数
+
+        返回:
+            window: rasterio窗口
+        """
+        if bounds is None:
+            return Window(0, 0, src.width, src.height)
+
+        corner_x = [bounds[0], bounds[2], bounds[0], bounds[2]]
+        corner_y = [bounds[1], bounds[1], bounds[3], bounds[3]]
+        if self.transformer is not None:
+            corner_x, corner_y = self.transformer.transform(corner_x, corner_y)
+
+        inverse = ~src.transform
+        cols, rows = inverse * (np.asarray(corner_x, dtype=np.float64), np.asarray(corner_y, dtype=np.float64))
+        col_start = max(int(np.floor(cols.min())) - pad, 0)
+        row_start = max(int(np.floor(rows.min())) - pad, 0)
+        col_stop = min(int(np.ceil(cols.max())) + pad, src.width)
+        row_stop = min(int(np.ceil(rows.max())) + pad, src.height)
+        if col_stop <= col_start or row_stop <= row_start:
+            raise ValueError(f"区域边界 {bounds} 不在DEM范围内")
+
+        return Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+
+    def to_pixel(self, points):
+        """
+        将经纬度批量转换为窗口内的浮点像素坐标
+
+        参数:
+            points: 形状为(N, 2)的经纬度数组
+
+        返回:
+            rows: 浮点行坐标
+            cols: 浮点列坐标
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        x, y = points[:, 0], points[:, 1]
+        if self.transformer is not None:
+            x, y = self.transformer.transform(x, y)
+            x, y = np.asarray(x), np.asarray(y)
+
+        a, b, c, d, e, f = self._inv
+        cols = a * x + b * y + c
+        rows = d * x + e * y + f
+        return rows, cols
+
+    def sample(self, points, method=None):
+        """
+        批量查询海拔高度
+
+        参数:
+            points: 形状为(N, 2)的经纬度数组
+            method: 插值方式，'nearest'或'bilinear'，为None时使用默认方式
+
+        返回:
+            elevations: 形状为(N,)的海拔数组 (米)，无法获取时为fill_value
+        """
+        method = method or self.method
+        rows, cols = self.to_pixel(points)
+        if method == 'nearest':
+            return self._sample_nearest(rows, cols)
+        if method == 'bilinear':
+            return self._sample_bilinear(rows, cols)
+        raise ValueError(f"不支持的插值方式: {method}")
+
+    def _sample_nearest(self, rows, cols):
+        """
+        最近邻采样，与rasterio的 dataset.index 一致 (向下取整)
+        """
+        r = np.floor(rows).astype(np.int64)
+        c = np.floor(cols).astype(np.int64)
+        inside = (r >= 0) & (r < self.height) & (c >= 0) & (c < self.width)
+
+        elevations = np.full(len(r), self.fill_value, dtype=np.float64)
+        r_in, c_in = r[inside], c[inside]
+        valid = self.valid[r_in, c_in]
+        values = np.where(valid, self.data[r_in, c_in], self.fill_value)
+        elevations[inside] = values
+        return elevations
+
+    def _sample_bilinear(self, rows, cols):
+        """
+        双线性插值采样，NODATA邻点不参与插值，剩余权重重新归一化
+        """
+        # 像素中心位于 +0.5 处
+        r = rows - 0.5
+        c = cols - 0.5
+        r0 = np.floor(r).astype(np.int64)
+        c0 = np.floor(c).astype(np.int64)
+        fr = r - r0
+        fc = c - c0
+
+        weighted = np.zeros(len(r), dtype=np.float64)
+        weights = np.zeros(len(r), dtype=np.float64)
+        for dr, dc, w in ((0, 0, (1 - fr) * (1 - fc)), (0, 1, (1 - fr) * fc),
+                          (1, 0, fr * (1 - fc)), (1, 1, fr * fc)):
+            rr = r0 + dr
+            cc = c0 + dc
+            inside = (rr >= 0) & (rr < self.height) & (cc >= 0) & (cc < self.width)
+            rr = np.clip(rr, 0, self.height - 1)
+            cc = np.clip(cc, 0, self.width - 1)
+            ok = inside & self.valid[rr, cc]
+            w = np.where(ok, w, 0.0)
+            weighted += w * self.data[rr, cc]
+            weights += w
+
+        # 落在窗口外的点 (像素坐标不在窗口内) 与原实现一致返回填充值
+        outside = (rows < 0) | (rows >= self.height) | (cols < 0) | (cols >= self.width)
+        elevations = np.full(len(r), self.fill_value, dtype=np.float64)
+        ok = (weights > 0) & ~outside
+        elevations[ok] = weighted[ok] / weights[ok]
+        return elevations
+
+    def get_elevation(self, lon, lat, method=None):
+        """
+        查询单个点的海拔高度
+
+        参数:
+            lon: 经度
+            lat: 纬度
+            method: 插值方式
+
+        返回:
+            elevation: 海拔高度 (米)
+        """
+        return float(self.sample([[lon, lat]], method)[0])
+
+    def reproject(self, dst_crs, resolution=None):
+        """
+        将DEM窗口一次性重投影到另一个坐标系，之后用该坐标系的坐标查询时只需仿射变换
+
+        参数:
+            dst_crs: 目标坐标系，同时作为新网格的查询坐标系
+            resolution: 目标像素边长 (目标坐标系单位)，为None时自动估计
+
+        返回:
+            grid: 新的ElevationGrid实例
+        """
+        dst_crs = CRS.from_user_input(dst_crs)
+        if self.crs is None:
+            raise ValueError("DEM没有坐标系信息，无法重投影")
+        if CRS.from_user_input(self.crs) == dst_crs:
+            return ElevationGrid.from_array(self.data, self.transform, self.crs, self.nodata,
+                                            src_crs=dst_crs.to_string(), method=self.method,
+                                            fill_value=self.fill_value, valid=self.valid)
+
+        # NODATA统一记为NaN，按默认插值方式重采样
+        source = np.where(self.valid, self.data, np.nan).astype(np.float32)
+        bounds = array_bounds(self.height, self.width, self.transform)
+        dst_transform, dst_width, dst_height = calculate_default_transform(
+            self.crs, dst_crs, self.width, self.height, *bounds, resolution=resolution
+        )
+        destination = np.full((dst_height, dst_width), np.nan, dtype=np.float32)
+        reproject(
+            source, destination,
+            src_transform=self.transform, src_crs=self.crs, src_nodata=np.nan,
+            dst_transform=dst_transform, dst_crs=dst_crs, dst_nodata=np.nan,
+            resampling=Resampling.bilinear if self.method == 'bilinear' else Resampling.nearest
+        )
+        return ElevationGrid.from_array(destination, dst_transform, dst_crs, np.nan,
+                                        src_crs=dst_crs.to_string(), method=self.method,
+                                        fill_value=self.fill_value)
+
+
+def _legacy_elevation(dem_data, transformer, lon, lat):
+    """
+    原实现: 每次查询都读取整个DEM波段 (用于对照)
+    """
+    x, y = transformer.transform(lon, lat)
+    row, col = dem_data.index(x, y)
+    if 0 <= row < dem_data.height and 0 <= col < dem_data.width:
+        elevation = dem_data.read(1)[row, col]
+        if elevation == dem_data.nodata:
+            return 0
+        return float(elevation)
+    return 0
+
+
+if __name__ == "__main__":
+    # 基准测试: 原实现与内存网格的查询延迟对比
+    import os
+    import tempfile
+    from rasterio.transform import from_origin
+    from configs import Config
+
+    config = Config()
+    bounds = (119.54, 29.75, 120.19, 30.20)  # 富阳区大致范围
+    dem_path = config.DEM_FILE
+    if not os.path.exists(dem_path):
+        # 没有DEM文件时生成与合并后ASTER GDEM同尺寸的合成DEM (2°×2°，1角秒分辨率)
+        size = 7201
+        dem_path = os.path.join(tempfile.mkdtemp(), 'synthetic_dem.tif')
+        rng = np.random.default_rng(config.SEED)
+        data = (rng.random((size, size)) * 500).astype(np.int16)
+        data[:100, :100] = -9999
+        with rasterio.open(dem_path, 'w', driver='GTiff', height=size, width=size, count=1,
+                           dtype='int16', crs='EPSG:4326', nodata=-9999,
+                           transform=from_origin(119.0, 31.0, 1 / 3600, 1 / 3600)) as dst:
+            dst.write(data, 1)
+        print(f"未找到DEM文件，使用合成DEM: {dem_path}")
+
+    rng = np.random.default_rng(config.SEED)
+    points = np.column_stack([
+        rng.uniform(bounds[0], bounds[2], config.DRONE_NUM),
+        rng.uniform(bounds[1], bounds[3], config.DRONE_NUM)
+    ])
+
+    start = time.perf_counter()
+    grid = ElevationGrid(dem_path, bounds=bounds)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"窗口大小: {grid.data.shape}, 加载耗时: {load_ms:.1f} ms")
+
+    dem_data = rasterio.open(dem_path)
+    transformer = Transformer.from_crs("EPSG:4326", dem_data.crs.to_string(), always_xy=True)
+    start = time.perf_counter()
+    legacy = [_legacy_elevation(dem_data, transformer, p[0], p[1]) for p in points]
+    legacy_ms = (time.perf_counter() - start) * 1000
+
+    repeats = 1000
+    for method in ('nearest', 'bilinear'):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            values = grid.sample(points, method)
+        fast_ms = (time.perf_counter() - start) / repeats * 1000
+        same = np.array_equal(values, legacy) if method == 'nearest' else '-'
+        print(f"{method:>8}: 原实现 {legacy_ms:.1f} ms/步, 内存网格 {fast_ms:.4f} ms/步, "
+              f"加速比 {legacy_ms / fast_ms:.0f}x, 与原实现一致: {same}")
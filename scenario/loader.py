@@ -0,0 +1,225 @@
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from reward.poi_coverage import PoiCoverageKernel
+from reward.raster_coverage import RasterCoverage
+from scenario.candidates import CandidateIndex
+from scenario.elevation import ElevationGrid
+from scenario.region import RegionIndex
+from scenario.projection import MetricProjection
+from scenario.sampler import RegionSampler
+
+
+class Scenario:
+    """
+    选址场景数据
+
+    区域边界、POI与DEM窗口只加载一次，由多个环境 (以及多个进程) 共享。
+    """
+
+    def __init__(self, region_geometry, poi_xs, poi_ys, elevation_grid=None, region_gdf=None, poi_df=None,
+                 projection=None):
+        """
+        初始化场景
+
+        参数:
+            region_geometry: 区域几何形状
+            poi_xs: POI经度数组
+            poi_ys: POI纬度数组
+            elevation_grid: ElevationGrid实例，为None时海拔按0处理
+            region_gdf: 区域的GeoDataFrame (可选，用于可视化)
+            poi_df: POI的DataFrame (可选，用于可视化)
+            projection: MetricProjection实例，不为None时表示几何与数组已投影到该米制坐标系
+        """
+        self.region_geometry = region_geometry
+        self.bounds = region_geometry.bounds  # (min_x, min_y, max_x, max_y)
+        # 预处理后的区域多边形，批量判断点是否在区域内
+        self.region_index = RegionIndex(region_geometry)
+        self.region_gdf = region_gdf
+        self.poi_df = poi_df
+        self.poi_gdf = None
+        if poi_df is not None:
+            self.poi_gdf = gpd.GeoDataFrame(
+                poi_df,
+                geometry=gpd.points_from_xy(poi_df.longitude, poi_df.latitude),
+                crs="EPSG:4326"  # 假设为WGS84，但实际数据为GCJ-02
+            )
+
+        # POI坐标一次性存为连续数组，供向量化的覆盖计算使用
+        self.poi_kernel = PoiCoverageKernel(poi_xs, poi_ys)
+        self.elevation_grid = elevation_grid
+        self._rasters = {}
+        self._candidates = {}
+        self._sampler = None
+
+        # 坐标单位: 经纬度场景中按约1度=111km近似，米制场景中为1
+        self.projection = projection
+        self.units_per_metre = 1.0 if projection is not None else 1 / 111000
+        self.metric_scenarios = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        按配置从文件加载场景
+
+        参数:
+            config: 配置类实例
+
+        返回:
+            scenario: Scenario实例
+        """
+        # 加载区域边界数据 (GCJ-02坐标系)
+        print(f"加载区域数据: {config.REGION_FILE}")
+        region_gdf = gpd.read_file(config.REGION_FILE)
+        region_geometry = region_gdf.geometry.iloc[0]
+        print(f"区域边界: {region_geometry.bounds}")
+
+        # 加载POI数据 (GCJ-02坐标系)
+        print(f"加载POI数据: {config.POI_FILE}")
+        poi_df = pd.read_csv(config.POI_FILE)
+        print(f"加载POI点数量: {len(poi_df)}")
+
+        # 加载DEM数据 (只读取覆盖区域边界的窗口，常驻内存)
+        print(f"加载DEM数据: {config.DEM_FILE}")
+        try:
+            elevation_grid = ElevationGrid.from_config(config, region_geometry.bounds)
+            print(f"DEM数据加载成功，窗口形状: {elevation_grid.data.shape}, CRS: {elevation_grid.crs}")
+        except Exception as e:
+            print(f"加载DEM数据失败: {e}")
+            elevation_grid = None
+
+        return cls(
+            region_geometry,
+            poi_df.longitude.values,
+            poi_df.latitude.values,
+            elevation_grid=elevation_grid,
+            region_gdf=region_gdf,
+            poi_df=poi_df
+        )
+
+    def to_metric(self, crs='auto'):
+        """
+        获取 (并缓存) 投影到米制坐标系的场景
+
+        区域多边形、POI坐标与DEM窗口只在这里投影一次，之后奖励计算直接以米为单位使用这些数组。
+
+        参数:
+            crs: 'auto' 时使用区域中心所在的UTM分带，否则为指定的坐标系
+
+        返回:
+            scenario: 米制坐标的Scenario实例
+        """
+        if crs not in self.metric_scenarios:
+            projection = MetricProjection.from_geometry(self.region_geometry, crs)
+            poi = projection.forward(np.column_stack([self.poi_kernel.xs, self.poi_kernel.ys]))
+            elevation_grid = None
+            if self.elevation_grid is not None:
+                try:
+                    elevation_grid = self.elevation_grid.reproject(projection.crs.to_string())
+                except Exception as e:
+                    print(f"DEM重投影失败: {e}")
+            self.metric_scenarios[crs] = Scenario(
+                projection.forward_geometry(self.region_geometry),
+                poi[:, 0],
+                poi[:, 1],
+                elevation_grid=elevation_grid,
+                poi_df=self.poi_df,
+                projection=projection
+            )
+        return self.metric_scenarios[crs]
+
+    def for_reward(self, config):
+        """
+        返回奖励计算所用的场景
+
+        参数:
+            config: 配置类实例，METRIC_CRS为None时沿用经纬度近似
+
+        返回:
+            scenario: 自身或米制坐标的Scenario实例
+        """
+        if config.METRIC_CRS is None:
+            return self
+        return self.to_metric(config.METRIC_CRS)
+
+    def from_lonlat(self, points):
+        """
+        将经纬度坐标转换为本场景的坐标
+
+        参数:
+            points: 形状为(..., 2)的经纬度数组
+
+        返回:
+            points: 同形状的坐标数组
+        """
+        if self.projection is None:
+            return np.asarray(points, dtype=np.float64)
+        return self.projection.forward(points)
+
+    def to_lonlat_geometry(self, geometry):
+        """
+        将本场景坐标的几何形状转换回经纬度 (只在输出结果时调用)
+        """
+        if self.projection is None or geometry is None:
+            return geometry
+        return self.projection.inverse_geometry(geometry)
+
+    def region_sampler(self):
+        """
+        获取 (并缓存) 区域内的均匀采样器 (首次调用时做三角剖分)
+
+        返回:
+            sampler: RegionSampler实例
+        """
+        if self._sampler is None:
+            self._sampler = RegionSampler(self.region_geometry)
+        return self._sampler
+
+    def raster_coverage(self, resolution, radius):
+        """
+        获取 (并缓存) 指定分辨率与半径的栅格覆盖计算器
+
+        参数:
+            resolution: 栅格边长 (与坐标同单位)
+            radius: 覆盖半径 (与坐标同单位)
+
+        返回:
+            raster: RasterCoverage实例
+        """
+        key = (float(resolution), float(radius))
+        if key not in self._rasters:
+            self._rasters[key] = RasterCoverage(self.region_geometry, resolution, radius)
+        return self._rasters[key]
+
+    def candidate_index(self, spacing, radius, cell_resolution, cache_dir=None):
+        """
+        获取 (并缓存) 候选点覆盖索引，cache_dir不为None时从磁盘加载或构建后保存
+
+        参数:
+            spacing: 候选点间距 (与坐标同单位)
+            radius: 覆盖半径 (与坐标同单位)
+            cell_resolution: 面积统计所用的栅格边长 (与坐标同单位)
+            cache_dir: 索引文件的缓存目录
+
+        返回:
+            index: CandidateIndex实例
+        """
+        key = (float(spacing), float(radius), float(cell_resolution))
+        if key not in self._candidates:
+            self._candidates[key] = CandidateIndex.load_or_build(self, spacing, radius, cell_resolution, cache_dir)
+        return self._candidates[key]
+
+    def add_raster_coverage(self, raster):
+        """
+        登记一个已有的栅格覆盖计算器 (例如由共享内存中的栅格面积构建)
+
+        参数:
+            raster: RasterCoverage实例
+        """
+        self._rasters[(raster.resolution, raster.radius)] = raster
+
+    def raster_coverages(self):
+        """
+        返回已缓存的全部栅格覆盖计算器
+        """
+        return list(self._rasters.values())
@@ -0,0 +1,97 @@
+import numpy as np
+import shapely
+from pyproj import CRS, Transformer
+
+
+class MetricProjection:
+    """
+    经纬度与局部米制坐标系之间的转换
+
+    默认按区域中心选取对应的UTM分带，在该坐标系中圆形覆盖范围是真实的圆，面积单位为平方米。
+    """
+
+    def __init__(self, crs, src_crs="EPSG:4326"):
+        """
+        初始化坐标转换
+
+        参数:
+            crs: 米制坐标系 (EPSG代码或pyproj可识别的字符串)
+            src_crs: 原始经纬度坐标系
+        """
+        self.crs = CRS.from_user_input(crs)
+        self.src_crs = CRS.from_user_input(src_crs)
+        self._forward = Transformer.from_crs(self.src_crs, self.crs, always_xy=True)
+        self._inverse = Transformer.from_crs(self.crs, self.src_crs, always_xy=True)
+
+    @classmethod
+    def from_geometry(cls, geometry, crs='auto', src_crs="EPSG:4326"):
+        """
+        按区域几何形状选取米制坐标系
+
+        参数:
+            geometry: 经纬度坐标的区域几何形状
+            crs: 'auto' 时使用区域中心所在的UTM分带，否则为指定的坐标系
+            src_crs: 原始经纬度坐标系
+
+        返回:
+            projection: MetricProjection实例
+        """
+        if crs == 'auto':
+            centroid = geometry.centroid
+            crs = utm_crs(centroid.x, centroid.y)
+        return cls(crs, src_crs)
+
+    def forward(self, points):
+        """
+        经纬度转米制坐标
+
+        参数:
+            points: 形状为(..., 2)的经纬度数组
+
+        返回:
+            projected: 同形状的米制坐标数组
+        """
+        points = np.asarray(points, dtype=np.float64)
+        x, y = self._forward.transform(points[..., 0], points[..., 1])
+        return np.stack([x, y], axis=-1)
+
+    def inverse(self, points):
+        """
+        米制坐标转经纬度
+
+        参数:
+            points: 形状为(..., 2)的米制坐标数组
+
+        返回:
+            lonlat: 同形状的经纬度数组
+        """
+        points = np.asarray(points, dtype=np.float64)
+        x, y = self._inverse.transform(points[..., 0], points[..., 1])
+        return np.stack([x, y], axis=-1)
+
+    def forward_geometry(self, geometry):
+        """
+        将经纬度几何形状转换到米制坐标系
+        """
+        return shapely.transform(geometry, self.forward)
+
+    def inverse_geometry(self, geometry):
+        """
+        将米制几何形状转换回经纬度
+        """
+        return shapely.transform(geometry, self.inverse)
+
+
+def utm_crs(lon, lat):
+    """
+    返回经纬度所在的WGS84 UTM分带坐标系
+
+    参数:
+        lon: 经度
+        lat: 纬度
+
+    返回:
+        crs: 例如富阳区为 EPSG:32650 (UTM 50N)
+    """
+    zone = int(np.floor((lon + 180) / 6)) % 60 + 1
+    return f"EPSG:{(32600 if lat >= 0 else 32700) + zone}"
@@ -0,0 +1,220 @@
+import time
+import numpy as np
+import shapely
+
+
+class RegionSampler:
+    """
+    区域内均匀采样器
+
+    初始化时对区域多边形做一次Delaunay三角剖分，按三角形面积缓存累积分布；
+    采样时先按面积选三角形，再在三角形内按重心坐标均匀取点，整批向量化完成，
+    不需要在边界框内反复拒绝采样，耗时与多边形是否凹、是否细长无关。
+    """
+
+    def __init__(self, region_geometry):
+        """
+        初始化采样器
+
+        参数:
+            region_geometry: 区域几何形状 (Polygon或MultiPolygon)
+        """
+        self.geometry = region_geometry
+        shapely.prepare(self.geometry)
+        self.bounds = region_geometry.bounds
+
+        triangles = self.triangulate(region_geometry)
+        coords = shapely.get_coordinates(shapely.get_exterior_ring(triangles)).reshape(len(triangles), 4, 2)
+        self.vertices = coords[:, :3]  # (T, 3, 2)
+        self.origins = self.vertices[:, 0]
+        self.edges_1 = self.vertices[:, 1] - self.origins
+        self.edges_2 = self.vertices[:, 2] - self.origins
+        areas = 0.5 * np.abs(self.edges_1[:, 0] * self.edges_2[:, 1] - self.edges_1[:, 1] * self.edges_2[:, 0])
+        self.area = float(areas.sum())
+        self.cdf = np.cumsum(areas) / self.area
+        self.cdf[-1] = 1.0
+
+    @staticmethod
+    def triangulate(region_geometry):
+        """
+        把区域剖分为三角形
+
+        shapely>=2.1时使用约束Delaunay三角剖分 (三角形恰好拼成区域)；
+        更早的版本 (如requirements.txt中的2.0.1) 对区域顶点做普通Delaunay三角剖分，
+        丢弃重心不在区域内的三角形 (凸包中区域外与洞内的部分)。
+
+        参数:
+            region_geometry: 区域几何形状 (Polygon或MultiPolygon)
+
+        返回:
+            triangles: 三角形Polygon数组
+        """
+        if hasattr(shapely, 'constrained_delaunay_triangles'):
+            return shapely.get_parts(shapely.constrained_delaunay_triangles(region_geometry))
+        triangles = shapely.get_parts(shapely.delaunay_triangles(region_geometry))
+        return triangles[shapely.contains(region_geometry, shapely.centroid(triangles))]
+
+    def __len__(self):
+        """
+        返回三角形数量
+        """
+        return len(self.cdf)
+
+    def sample(self, size, rng=None):
+        """
+        在区域内均匀采样
+
+        参数:
+            size: 点的数量，可以是整数或形状元组
+            rng: numpy随机数生成器，为None时使用全局np.random
+
+        返回:
+            points: 形状为(*size, 2)的坐标数组
+        """
+        rng = np.random if rng is None else rng
+        shape = (size,) if np.isscalar(size) else tuple(size)
+        num = int(np.prod(shape))
+
+        triangle = np.searchsorted(self.cdf, rng.random(num), side='right')
+        triangle = np.minimum(triangle, len(self.cdf) - 1)
+        u = rng.random(num)
+        v = rng.random(num)
+        # 落在平行四边形另一半的点关于对角线翻折回三角形内
+        flip = u + v > 1
+        u[flip] = 1 - u[flip]
+        v[flip] = 1 - v[flip]
+        points = (self.origins[triangle] + u[:, None] * self.edges_1[triangle]
+                  + v[:, None] * self.edges_2[triangle])
+        return points.reshape(shape + (2,))
+
+    def sample_spaced(self, num_points, min_distance, rng=None, batch_size=None, max_batches=20):
+        """
+        采样两两距离不小于min_distance的均匀随机点
+
+        候选点按批从三角剖分中均匀采样，再用Bridson方法的背景网格 (边长min_distance/√2，每格最多一个点)
+        检查间距，每个候选只需查看周围5×5个格子。
+
+        参数:
+            num_points: 需要的点数
+            min_distance: 最小间距
+            rng: numpy随机数生成器，为None时使用全局np.random
+            batch_size: 每批候选点数量，默认为num_points的4倍
+            max_batches: 最多采样的批数
+
+        返回:
+            points: 形状为(M, 2)的坐标数组，M <= num_points (间距要求无法满足时少于num_points)
+        """
+        if min_distance <= 0:
+            return self.sample(num_points, rng)
+
+        batch_size = batch_size or max(4 * num_points, 16)
+        cell = min_distance / np.sqrt(2)
+        width = int(np.ceil((self.bounds[2] - self.bounds[0]) / cell)) + 1
+        height = int(np.ceil((self.bounds[3] - self.bounds[1]) / cell)) + 1
+        grid = np.full((height + 4, width + 4), -1, dtype=np.int64)  # 四周各留2格，省去边界判断
+        min_distance_sq = min_distance ** 2
+
+        points = np.empty((num_points, 2))
+        count = 0
+        for _ in range(max_batches):
+            candidates = self.sample(batch_size, rng)
+            cols = ((candidates[:, 0] - self.bounds[0]) / cell).astype(np.int64) + 2
+            rows = ((candidates[:, 1] - self.bounds[1]) / cell).astype(np.int64) + 2
+            for candidate, row, col in zip(candidates, rows, cols):
+                neighbours = grid[row - 2:row + 3, col - 2:col + 3]
+                neighbours = neighbours[neighbours >= 0]
+                if len(neighbours) > 0 and (((points[neighbours] - candidate) ** 2).sum(axis=1) < min_distance_sq).any():
+                    continue
+                points[count] = candidate
+                grid[row, col] = count
+                count += 1
+                if count == num_points:
+                    return points
+        return points[:count]
+
+
+def _rejection_sample(region_geometry, num_points, min_distance, max_attempts=100, max_placement_attempts=30):
+    """
+    原实现: 边界框拒绝采样 + 逐个检查间距 (用于对照)
+    """
+    from shapely.geometry import Point
+    bounds = region_geometry.bounds
+    positions = []
+
+    def get_random_point_in_region():
+        for _ in range(max_attempts):
+            x = np.random.uniform(bounds[0], bounds[2])
+            y = np.random.uniform(bounds[1], bounds[3])
+            if region_geometry.contains(Point(x, y)):
+                return [x, y]
+        centroid = region_geometry.centroid
+        return [centroid.x + np.random.uniform(-0.01, 0.01), centroid.y + np.random.uniform(-0.01, 0.01)]
+
+    for _ in range(num_points):
+        for _ in range(max_placement_attempts):
+            candidate = get_random_point_in_region()
+            too_close = False
+            for j in range(0, len(positions), 2):
+                if np.sqrt((candidate[0] - positions[j]) ** 2 + (candidate[1] - positions[j + 1]) ** 2) < min_distance:
+                    too_close = True
+                    break
+            if not too_close:
+                break
+        positions.extend(candidate)
+    return np.array(positions).reshape(-1, 2)
+
+
+if __name__ == "__main__":
+    # 不同形状区域与不同库数量下，与原拒绝采样的耗时比较
+    import contextlib
+    import io
+    from shapely.geometry import Polygon
+    from configs import Config
+    from scenario.loader import Scenario
+
+    config = Config()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scenario = Scenario.from_config(config)
+    min_distance = config.DRONE_RADIUS / 111000 * 0.2
+
+    # 细长的梳状凹多边形: 面积只占边界框的很小一部分
+    teeth = []
+    x0, y0 = scenario.bounds[0], scenario.bounds[1]
+    for k in range(12):
+        teeth.append(shapely.box(x0 + k * 0.05, y0, x0 + k * 0.05 + 0.008, y0 + 0.45))
+    comb = shapely.union_all(teeth + [shapely.box(x0, y0, x0 + 0.6, y0 + 0.008)])
+
+    regions = [('富阳区', scenario.region_geometry), ('梳状凹多边形', comb)]
+    print(f"{'区域':>10} {'面积/边界框':>10} {'库数量':>6} {'原实现(ms)':>10} {'三角剖分(ms)':>12} {'最小间距满足':>10}")
+    for name, geometry in regions:
+        start = time.perf_counter()
+        sampler = RegionSampler(geometry)
+        build_ms = (time.perf_counter() - start) * 1000
+        box = shapely.box(*geometry.bounds).area
+        for num_points in [8, 64, 256]:
+            repeats = 20 if num_points <= 64 else 5
+            np.random.seed(config.SEED)
+            start = time.perf_counter()
+            for _ in range(repeats):
+                _rejection_sample(geometry, num_points, min_distance)
+            legacy_ms = (time.perf_counter() - start) / repeats * 1000
+
+            start = time.perf_counter()
+            for _ in range(repeats):
+                points = sampler.sample_spaced(num_points, min_distance)
+            fast_ms = (time.perf_counter() - start) / repeats * 1000
+
+            diff = points[:, None] - points[None]
+            distance = np.sqrt((diff ** 2).sum(axis=-1)) + np.eye(len(points)) * 1e9
+            ok = len(points) == num_points and distance.min() >= min_distance
+            inside = shapely.contains_xy(geometry, points[:, 0], points[:, 1]).all()
+            print(f"{name:>10} {geometry.area / box:>10.3f} {num_points:>6} {legacy_ms:>10.2f} {fast_ms:>12.3f} "
+                  f"{str(ok and inside):>10}")
+        print(f"{name}: 三角形 {len(sampler)} 个，剖分耗时 {build_ms:.1f} ms")
+
+    # 均匀性检查: 三角剖分采样落在区域左半部分的比例应与面积比例一致
+    sampler = RegionSampler(scenario.region_geometry)
+    points = sampler.sample(200000, np.random.default_rng(config.SEED))
+    middle = (scenario.bounds[0] + scenario.bounds[2]) / 2
+    left = shapely.intersection(scenario.region_geometry, shapely.box(scenario.bounds[0], scenario.bounds[1], middle, scenario.bounds[3]))
+    print(f"左半部分: 采样比例 {(points[:, 0] < middle).mean():.4f}, 面积比例 {left.area / scenario.region_geometry.area:.4f}")
@@ -0,0 +1,208 @@
+import numpy as np
+import shapely
+from multiprocessing import shared_memory
+from rasterio.crs import CRS
+from rasterio.transform import Affine
+from reward.raster_coverage import RasterCoverage
+from scenario.elevation import ElevationGrid
+from scenario.loader import Scenario
+from scenario.projection import MetricProjection
+
+
+class SharedArray:
+    """
+    放在共享内存中的NumPy数组
+
+    父进程创建并写入数据，子进程凭句柄 (名称、形状、类型) 直接映射同一块内存，不发生复制。
+    """
+
+    def __init__(self, shape, dtype, name=None):
+        """
+        创建或映射共享数组
+
+        参数:
+            shape: 数组形状
+            dtype: 数组类型
+            name: 共享内存名称，为None时新建
+        """
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        nbytes = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=nbytes if self.owner else 0)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    @classmethod
+    def from_array(cls, array):
+        """
+        新建共享数组并复制数据
+
+        参数:
+            array: 源数组
+
+        返回:
+            shared: SharedArray实例
+        """
+        array = np.ascontiguousarray(array)
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        凭句柄映射已存在的共享数组
+
+        参数:
+            handle: handle()返回的元组
+
+        返回:
+            shared: SharedArray实例
+        """
+        name, shape, dtype = handle
+        return cls(shape, dtype, name=name)
+
+    def handle(self):
+        """
+        返回可传给子进程的句柄
+        """
+        return (self.shm.name, self.shape, self.dtype.str)
+
+    def close(self):
+        """
+        解除映射，创建者同时释放共享内存
+        """
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class SharedScenario:
+    """
+    把场景中的大数组发布到共享内存
+
+    包括POI坐标、DEM窗口及其有效值掩膜、栅格覆盖的栅格面积；
+    区域多边形以WKB字节随句柄传递 (只有几十KB)。已构建的米制场景也一并发布。
+    """
+
+    def __init__(self, scenario, rasters=None):
+        """
+        发布场景
+
+        参数:
+            scenario: 父进程中已加载的Scenario实例
+            rasters: 需要共享的RasterCoverage实例列表，为None时共享场景中已缓存的全部栅格
+        """
+        self.arrays = {
+            'poi_xs': SharedArray.from_array(scenario.poi_kernel.xs),
+            'poi_ys': SharedArray.from_array(scenario.poi_kernel.ys),
+        }
+        self.meta = {
+            'region_wkb': shapely.to_wkb(scenario.region_geometry),
+            'elevation': None,
+            'rasters': [],
+            'projection': None,
+        }
+        if scenario.projection is not None:
+            self.meta['projection'] = {
+                'crs': scenario.projection.crs.to_string(),
+                'src_crs': scenario.projection.src_crs.to_string(),
+            }
+
+        grid = scenario.elevation_grid
+        if grid is not None:
+            self.arrays['dem_data'] = SharedArray.from_array(grid.data)
+            self.arrays['dem_valid'] = SharedArray.from_array(grid.valid)
+            self.meta['elevation'] = {
+                'transform': tuple(grid.transform)[:6],
+                'crs': CRS.from_user_input(grid.crs).to_string() if grid.crs is not None else None,
+                'nodata': grid.nodata,
+                'src_crs': grid.src_crs,
+                'method': grid.method,
+                'fill_value': grid.fill_value,
+            }
+
+        if rasters is None:
+            rasters = scenario.raster_coverages()
+        for i, raster in enumerate(rasters):
+            key = f'raster_{i}'
+            self.arrays[key] = SharedArray.from_array(raster.cell_area)
+            self.meta['rasters'].append({'key': key, 'resolution': raster.resolution, 'radius': raster.radius})
+
+        self.metric = {crs: SharedScenario(metric) for crs, metric in scenario.metric_scenarios.items()}
+
+    def handle(self):
+        """
+        返回可传给子进程的句柄 (只包含名称、形状与少量元数据)
+        """
+        return {
+            'arrays': {key: shared.handle() for key, shared in self.arrays.items()},
+            'meta': self.meta,
+            'metric': {crs: shared.handle() for crs, shared in self.metric.items()},
+        }
+
+    @staticmethod
+    def attach(handle):
+        """
+        在子进程中映射共享场景
+
+        参数:
+            handle: handle()返回的字典
+
+        返回:
+            scenario: 数组直接指向共享内存的Scenario实例
+            attached: 映射的SharedArray列表，进程退出前需要close
+        """
+        attached = {key: SharedArray.attach(h) for key, h in handle['arrays'].items()}
+        meta = handle['meta']
+        region_geometry = shapely.from_wkb(meta['region_wkb'])
+
+        elevation_grid = None
+        if meta['elevation'] is not None:
+            elevation = meta['elevation']
+            elevation_grid = ElevationGrid.from_array(
+                attached['dem_data'].array,
+                Affine(*elevation['transform']),
+                elevation['crs'],
+                elevation['nodata'],
+                src_crs=elevation['src_crs'],
+                method=elevation['method'],
+                fill_value=elevation['fill_value'],
+                valid=attached['dem_valid'].array
+            )
+
+        projection = None
+        if meta['projection'] is not None:
+            projection = MetricProjection(meta['projection']['crs'], meta['projection']['src_crs'])
+
+        scenario = Scenario(
+            region_geometry,
+            attached['poi_xs'].array,
+            attached['poi_ys'].array,
+            elevation_grid=elevation_grid,
+            projection=projection
+        )
+        for raster_meta in meta['rasters']:
+            scenario.add_raster_coverage(RasterCoverage(
+                region_geometry,
+                raster_meta['resolution'],
+                raster_meta['radius'],
+                cell_area=attached[raster_meta['key']].array
+            ))
+        attached = list(attached.values())
+        for crs, metric_handle in handle['metric'].items():
+            scenario.metric_scenarios[crs], metric_attached = SharedScenario.attach(metric_handle)
+            attached.extend(metric_attached)
+        return scenario, attached
+
+    def close(self):
+        """
+        释放共享内存
+        """
+        for shared in self.arrays.values():
+            shared.close()
+        for shared in self.metric.values():
+            shared.close()
+        self.arrays = {}
+        self.metric = {}
@@ -0,0 +1,193 @@
+import os
+import json
+import argparse
+import numpy as np
+from configs import Config
+from scenario import Scenario
+from solvers import PlacementObjective, LazyGreedySolver, MilpSolver, AnnealingRefiner, optimality_gap
+
+
+def save_placement(result, output_path):
+    """
+    把选址结果保存为JSON
+
+    参数:
+        result: 求解器返回的结果字典
+        output_path: 输出路径
+    """
+    data = {key: value.tolist() if hasattr(value, 'tolist') else value for key, value in result.items()}
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def render_placement(scenario, config, result, output_path):
+    """
+    绘制选址结果 (覆盖范围按米制坐标系中的真实圆生成，与训练快照一致)
+
+    参数:
+        scenario: 经纬度坐标的Scenario实例
+        config: 配置类实例
+        result: 求解器返回的结果字典
+        output_path: 输出路径
+    """
+    from visual_worker import FrameRenderer, VisualWorker, frame_request
+    info = dict(result)
+    info['drone_positions'] = result['positions']
+    FrameRenderer(VisualWorker.scene_arrays(scenario, config)).render(frame_request(info, output_path))
+
+
+def print_placement(result, num_poi):
+    """
+    打印选址结果
+
+    参数:
+        result: 求解器返回的结果字典
+        num_poi: POI总数
+    """
+    for i, (pos, elevation) in enumerate(zip(result['positions'], result['drone_elevations'])):
+        print(f"  无人机 {i+1}: 经度={pos[0]:.6f}, 纬度={pos[1]:.6f}, 海拔={elevation:.1f}米")
+    print(f"目标值: {result['score']:.4f}")
+    if 'bound' in result:
+        print(f"上界: {result['bound']:.4f}, 最优性差距: {result['gap']:.2%} ({'已证明最优' if result['optimal'] else result['status']})")
+    print(f"POI覆盖率: {result['poi_coverage']:.2f} ({result['poi_covered']}/{num_poi}), "
+          f"加权POI覆盖率: {result['weighted_poi_coverage']:.2f}")
+    print(f"区域覆盖率: {result['area_coverage']:.2f}, 重叠度: {result['overlap_ratio']:.2f}, "
+          f"海拔惩罚: {result['elevation_penalty']:.4f}")
+
+
+def refine_placement(objective, site_ids, config, name, curve_path=None):
+    """
+    用模拟退火在固定的时间预算内优化一个选址结果
+
+    参数:
+        objective: PlacementObjective实例
+        site_ids: 初始选址的候选点下标 (其他方法的经纬度结果先用objective.nearest_sites对齐)
+        config: 配置类实例
+        name: 初始选址的名称 (用于输出)
+        curve_path: 改进曲线图片的输出路径，为None时不绘制
+
+    返回:
+        result: AnnealingRefiner.refine返回的结果字典
+    """
+    refiner = AnnealingRefiner(objective, config.ANNEAL_TIME_BUDGET, move_prob=config.ANNEAL_MOVE_PROB, seed=config.SEED)
+    result = refiner.refine(site_ids)
+    result['drone_elevations'] = objective.index.elevations[result['site_ids']]
+    curve = result['curve']
+    checkpoints = [t for t in (0.1, 0.5, 1, 2, 5, 10, 30, 60) if t < round(result['time'], 1)] + [result['time']]
+    print(f"\n模拟退火优化{name}选址 ({result['time']:.1f} s, {result['iterations']}次邻域操作, 接受 {result['accepted']}次): "
+          f"目标值 {result['initial_score']:.4f} -> {result['score']:.4f}")
+    print("改进曲线: " + ', '.join(f"{t:.1f}s {curve[curve[:, 0] <= t, 2].max():.4f}" for t in checkpoints))
+    if curve_path is not None:
+        from view import visualize_refinement
+        visualize_refinement({name: curve}, curve_path)
+    return result
+
+
+def solve(config=None, num_drones=None, render=False, solver='greedy', refine=False):
+    """
+    用经典方法求解最大覆盖选址，不需要训练模型
+
+    参数:
+        config: 配置类实例，为None时使用默认配置
+        num_drones: 无人机库数量，为None时使用config.DRONE_NUM
+        render: 是否生成可视化结果
+        solver: 'greedy' 在CANDIDATE_SPACING网格上惰性贪心求解，
+                'milp' 在MILP_SPACING网格上用混合整数规划精确求解 (受MILP_TIME_LIMIT限制)，
+                'random' 在CANDIDATE_SPACING网格上随机选址 (作为优化的起点)
+        refine: 是否再用模拟退火优化求解结果
+
+    返回:
+        result: 求解结果字典
+    """
+    config = config or Config()
+    num_drones = num_drones or config.DRONE_NUM
+    scenario = Scenario.from_config(config)
+
+    if solver == 'milp':
+        spacing = config.MILP_SPACING
+        objective = PlacementObjective.from_config(scenario, config, spacing, config.MILP_CELL_RESOLUTION)
+        result = MilpSolver(objective, config.MILP_TIME_LIMIT).solve(num_drones)
+        name = '混合整数规划'
+    elif solver == 'random':
+        spacing = config.CANDIDATE_SPACING
+        objective = PlacementObjective.from_config(scenario, config)
+        site_ids = np.random.default_rng(config.SEED).choice(len(objective.index), num_drones, replace=False)
+        result = objective.evaluate(site_ids)
+        result.update({'solver': 'random', 'site_ids': site_ids, 'positions': objective.lonlat(site_ids), 'time': 0.0})
+        name = '随机'
+    else:
+        spacing = config.CANDIDATE_SPACING
+        objective = PlacementObjective.from_config(scenario, config)
+        result = LazyGreedySolver(objective).solve(num_drones)
+        name = '惰性贪心'
+    result['drone_elevations'] = objective.index.elevations[result['site_ids']]
+
+    print(f"\n{name}选址: {num_drones}个无人机库, 候选点 {len(objective.index)} 个 (间距{spacing}米), "
+          f"耗时 {result['time'] * 1000:.1f} ms")
+    print_placement(result, objective.index.num_poi)
+
+    os.makedirs(config.SOLVE_DIR, exist_ok=True)
+    output_path = os.path.join(config.SOLVE_DIR, f"{solver}_{num_drones}.json")
+    save_placement(result, output_path)
+    print(f"选址结果已保存到 {output_path}")
+    if render:
+        render_placement(scenario, config, result, os.path.join(config.SOLVE_DIR, f"{solver}_{num_drones}.png"))
+
+    if refine:
+        prefix = os.path.join(config.SOLVE_DIR, f"{solver}_annealed_{num_drones}")
+        result = refine_placement(objective, result['site_ids'], config, name, f"{prefix}_curve.png")
+        print_placement(result, objective.index.num_poi)
+        save_placement(result, f"{prefix}.json")
+        print(f"优化后的选址结果已保存到 {prefix}.json")
+        if render:
+            render_placement(scenario, config, result, f"{prefix}.png")
+    return result
+
+
+def compare_placements(scenario, config, placements, num_drones=None):
+    """
+    在精确求解的候选点网格上，用同一目标函数比较各选址结果与MILP上界的差距
+
+    其他方法的位置先对齐到最近的候选点再计算目标值 (至多带来半个MILP_SPACING的位置误差)。
+
+    参数:
+        scenario: 经纬度坐标的Scenario实例
+        config: 配置类实例
+        placements: {名称: 形状为(K, 2)的经纬度位置} 字典，例如PPO的选址结果
+        num_drones: 无人机库数量，为None时使用config.DRONE_NUM
+
+    返回:
+        rows: {名称: 结果字典}，每个结果都含score与gap (相对MILP上界的差距)
+    """
+    num_drones = num_drones or config.DRONE_NUM
+    objective = PlacementObjective.from_config(scenario, config, config.MILP_SPACING, config.MILP_CELL_RESOLUTION)
+    exact = MilpSolver(objective, config.MILP_TIME_LIMIT).solve(num_drones)
+
+    rows = {}
+    for name, positions in placements.items():
+        rows[name] = objective.evaluate(objective.nearest_sites(positions))
+    rows['greedy'] = LazyGreedySolver(objective).solve(num_drones)
+    rows['milp'] = exact
+    for row in rows.values():
+        row['gap'] = max(optimality_gap(row['score'], exact['bound']), 0.0)
+
+    print(f"\n与最优解的比较 (候选点间距{config.MILP_SPACING}米, {len(objective.index)}个候选点, "
+          f"MILP上界 {exact['bound']:.4f}, {'已证明最优' if exact['optimal'] else exact['status']}):")
+    print(f"{'方法':<8} {'目标值':>8} {'最优性差距':>10} {'POI覆盖':>8} {'区域覆盖率':>10} {'重叠度':>8} {'耗时(s)':>8}")
+    for name, row in rows.items():
+        elapsed = f"{row['time']:.2f}" if 'time' in row else '-'
+        print(f"{name:<8} {row['score']:>8.4f} {row['gap']:>10.2%} {row['poi_covered']:>8} "
+              f"{row['area_coverage']:>10.3f} {row['overlap_ratio']:>8.3f} {elapsed:>8}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="最大覆盖选址求解")
+    parser.add_argument("--drones", type=int, default=None, help="无人机库数量，默认为Config.DRONE_NUM")
+    parser.add_argument("--solver", type=str, default="greedy", choices=["greedy", "milp", "random"],
+                        help="求解方法: greedy (惰性贪心)、milp (混合整数规划精确求解) 或 random (随机选址)")
+    parser.add_argument("--refine", action="store_true", help="是否再用模拟退火优化求解结果")
+    parser.add_argument("--render", action="store_true", help="是否生成可视化结果")
+    args = parser.parse_args()
+
+    solve(Config(), args.drones, args.render, args.solver, args.refine)
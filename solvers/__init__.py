@@ -0,0 +1,4 @@
+from solvers.objective import PlacementObjective, poi_weights
+from solvers.greedy import LazyGreedySolver
+from solvers.milp import MilpSolver, optimality_gap
+from solvers.annealing import AnnealingRefiner, IncrementalObjective
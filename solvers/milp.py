@@ -0,0 +1,165 @@
+import time
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+
+def optimality_gap(score, bound):
+    """
+    目标值相对上界的差距
+
+    参数:
+        score: 某个选址结果的目标函数值
+        bound: 最优目标函数值的上界 (MILP的对偶界)
+
+    返回:
+        gap: (bound - score) / |bound|，bound为0时返回0
+    """
+    return (bound - score) / abs(bound) if bound != 0 else 0.0
+
+
+class MilpSolver:
+    """
+    最大覆盖选址的混合整数规划精确求解 (scipy.optimize.milp，HiGHS)
+
+    变量: 每个候选点是否建库 x_j (0/1)，每个POI是否被覆盖 y_i、每个区域栅格是否被覆盖 z_m (松弛到[0, 1])，
+    以及每个栅格的重叠对数 o_m (非负)。
+    约束: y_i ≤ Σ_j a_ij x_j，z_m ≤ Σ_j b_mj x_j，Σ_j x_j = K。
+    栅格被k个圆覆盖时重叠对数为k(k-1)/2，它是k的凸函数，等于直线 t·k - t(t+1)/2 (t = 1..K-1) 的上包络，
+    因此用 o_m ≥ t·Σ_j b_mj x_j - t(t+1)/2 精确表示 (目标函数惩罚o_m，最优解中o_m取到上包络)。
+    目标函数与PlacementObjective.score完全一致，HiGHS给出的对偶界是该候选点网格上所有选址的目标值上界。
+    """
+
+    def __init__(self, objective, time_limit=60):
+        """
+        初始化求解器
+
+        参数:
+            objective: PlacementObjective实例
+            time_limit: 求解时间上限 (秒)
+        """
+        self.objective = objective
+        self.index = objective.index
+        self.time_limit = time_limit
+
+    def problem(self, num_sites):
+        """
+        构建混合整数规划问题 (最小化目标函数的相反数)
+
+        参数:
+            num_sites: 建库数量K
+
+        返回:
+            c: 目标系数
+            constraints: LinearConstraint列表
+            integrality: 整数变量标记
+            bounds: 变量上下界
+        """
+        objective = self.objective
+        num_candidates = len(self.index)
+        site_cells = self.index.cell_matrix.tocsc()
+
+        # 只保留能被覆盖的POI与区域栅格，可能被两个以上候选点覆盖的栅格才需要重叠变量
+        poi_cover = self.index.poi_matrix.T.tocsr()
+        poi_rows = np.flatnonzero(np.diff(poi_cover.indptr) > 0)
+        cell_cover = site_cells.T.tocsr()
+        cover_count = np.diff(cell_cover.indptr)
+        area_rows = np.flatnonzero((cover_count > 0) & (objective.cell_gain > 0))
+        overlap_rows = np.flatnonzero(cover_count > 1)
+        poi_cover, area_cover, overlap_cover = poi_cover[poi_rows], cell_cover[area_rows], cell_cover[overlap_rows]
+        num_poi, num_area, num_overlap = len(poi_rows), len(area_rows), len(overlap_rows)
+
+        # 变量顺序: x (候选点), y (POI), z (区域栅格), o (重叠对数)
+        c = np.concatenate([
+            objective.site_penalty,
+            -objective.POI_COEF * objective.poi_weight[poi_rows],
+            -objective.cell_gain[area_rows],
+            np.full(num_overlap, objective.pair_penalty)
+        ])
+
+        def block(*parts):
+            return sparse.hstack(parts, format='csr')
+
+        zeros = lambda rows, cols: sparse.csr_matrix((rows, cols))
+        identity = lambda size: sparse.identity(size, format='csr')
+        constraints = [
+            # y_i - Σ_j a_ij x_j ≤ 0
+            LinearConstraint(block(-poi_cover, identity(num_poi), zeros(num_poi, num_area + num_overlap)), -np.inf, 0),
+            # z_m - Σ_j b_mj x_j ≤ 0
+            LinearConstraint(block(-area_cover, zeros(num_area, num_poi), identity(num_area),
+                                   zeros(num_area, num_overlap)), -np.inf, 0),
+            # Σ_j x_j = K
+            LinearConstraint(block(sparse.csr_matrix(np.ones((1, num_candidates))),
+                                   zeros(1, num_poi + num_area + num_overlap)), num_sites, num_sites)
+        ]
+        # t·Σ_j b_mj x_j - o_m ≤ t(t+1)/2，t = 1..K-1
+        for t in range(1, num_sites):
+            constraints.append(LinearConstraint(
+                block(t * overlap_cover, zeros(num_overlap, num_poi + num_area), -identity(num_overlap)),
+                -np.inf, t * (t + 1) / 2))
+
+        num_vars = len(c)
+        integrality = np.zeros(num_vars)
+        integrality[:num_candidates] = 1
+        upper = np.concatenate([np.ones(num_candidates + num_poi + num_area), np.full(num_overlap, np.inf)])
+        return c, constraints, integrality, Bounds(np.zeros(num_vars), upper)
+
+    def solve(self, num_sites):
+        """
+        求解K个库的选址
+
+        参数:
+            num_sites: 建库数量K
+
+        返回:
+            result: 包含site_ids、positions、目标函数值与各项指标，以及bound (上界)、gap (相对差距)、
+                    optimal (是否证明最优)、status、耗时的字典
+        """
+        start = time.perf_counter()
+        c, constraints, integrality, bounds = self.problem(num_sites)
+        build_time = time.perf_counter() - start
+        solution = milp(c, constraints=constraints, integrality=integrality, bounds=bounds,
+                        options={'time_limit': self.time_limit})
+        if solution.x is None:
+            raise RuntimeError(f"MILP求解失败: {solution.message}")
+
+        selected = np.flatnonzero(solution.x[:len(self.index)] > 0.5)
+        result = self.objective.evaluate(selected)
+        result.update({
+            'solver': 'milp',
+            'site_ids': selected,
+            'positions': self.objective.lonlat(selected),
+            'bound': -float(solution.mip_dual_bound),
+            'optimal': solution.status == 0,
+            'status': solution.message,
+            'build_time': build_time,
+            'time': time.perf_counter() - start
+        })
+        # 证明最优时两者只差数值误差
+        result['gap'] = max(optimality_gap(result['score'], result['bound']), 0.0)
+        return result
+
+
+if __name__ == "__main__":
+    # 不同候选点间距下的求解耗时、对偶界与贪心结果的差距
+    import contextlib
+    import io
+    from configs import Config
+    from scenario.loader import Scenario
+    from solvers.greedy import LazyGreedySolver
+    from solvers.objective import PlacementObjective
+
+    config = Config()
+    with contextlib.redirect_stdout(io.StringIO()):
+        scenario = Scenario.from_config(config)
+
+    for spacing, cell_resolution in [(4000, 2000), (2000, 2000), (2000, 1000)]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            objective = PlacementObjective.from_config(scenario, config, spacing, cell_resolution)
+        greedy = LazyGreedySolver(objective).solve(config.DRONE_NUM)
+        result = MilpSolver(objective, config.MILP_TIME_LIMIT).solve(config.DRONE_NUM)
+        print(f"间距{spacing}米/栅格{cell_resolution}米 {len(objective.index)}个候选点: "
+              f"MILP {result['time']:.1f} s (建模 {result['build_time']:.2f} s, {'最优' if result['optimal'] else result['status']}), "
+              f"目标值 {result['score']:.4f}, 上界 {result['bound']:.4f}, 差距 {result['gap']:.2%}; "
+              f"贪心 {greedy['time'] * 1000:.0f} ms, 目标值 {greedy['score']:.4f}, "
+              f"差距 {max(optimality_gap(greedy['score'], result['bound']), 0.0):.2%}")
@@ -0,0 +1,173 @@
+import numpy as np
+
+
+def poi_weights(poi_df, population_weight=0.5):
+    """
+    按POI的重要度与人口计算权重
+
+    权重 = importance × (1 + population_weight × population / 1000)，缺少某一列时该项按1 (人口按0) 处理。
+
+    参数:
+        poi_df: POI的DataFrame，为None时所有POI权重相同
+        population_weight: 每千人口增加的权重倍数
+
+    返回:
+        weights: 形状为(N,)的非负权重
+    """
+    if poi_df is None:
+        return None
+    importance = poi_df['importance'].to_numpy(np.float64) if 'importance' in poi_df else np.ones(len(poi_df))
+    population = poi_df['population'].to_numpy(np.float64) if 'population' in poi_df else np.zeros(len(poi_df))
+    weights = np.nan_to_num(importance, nan=1.0) * (1 + population_weight * np.nan_to_num(population) / 1000)
+    return np.maximum(weights, 0)
+
+
+class PlacementObjective:
+    """
+    候选点上的选址目标函数
+
+    与环境奖励的各项一致: POI覆盖 (按权重) × 1 + 区域覆盖率 × 0.3 - 重叠率 × 0.1 - 海拔惩罚 × ELEVATION_PENALTY_WEIGHT，
+    覆盖、重叠与海拔都从CandidateIndex的稀疏覆盖矩阵中查出。
+    覆盖项的边际增益随已选点增多而减小，重叠项的边际惩罚随之增大，海拔项与已选点无关，因此目标函数是子模的。
+    """
+
+    POI_COEF = 1.0
+    AREA_COEF = 0.3
+    OVERLAP_COEF = 0.1
+
+    def __init__(self, index, region_area, weights=None, elevation_threshold=50, elevation_penalty_weight=0.2,
+                 projection=None):
+        """
+        初始化目标函数
+
+        参数:
+            index: CandidateIndex实例
+            region_area: 区域面积 (与索引坐标同单位)
+            weights: 形状为(N,)的POI权重，为None时所有POI权重相同
+            elevation_threshold: 海拔阈值 (米)
+            elevation_penalty_weight: 海拔惩罚权重
+            projection: 索引坐标所在的MetricProjection，为None时索引坐标即为经纬度
+        """
+        self.index = index
+        self.projection = projection
+        self.region_area = float(region_area)
+        weights = np.ones(index.num_poi) if weights is None else np.asarray(weights, dtype=np.float64)
+        total = weights.sum()
+        # 归一化后所有POI都被覆盖时POI项为1，权重相同时与环境的POI覆盖率一致
+        self.poi_weight = weights / total if total > 0 else np.zeros(index.num_poi)
+        # 每个候选点的海拔惩罚 (已乘以权重)
+        self.elevation_penalty = np.maximum(index.elevations - elevation_threshold, 0) / 100
+        self.site_penalty = self.elevation_penalty * elevation_penalty_weight
+        # 每个栅格的覆盖增益与每个重叠栅格对的惩罚，均已换算为目标函数的单位
+        self.cell_gain = index.cell_area * (self.AREA_COEF / self.region_area)
+        self.pair_penalty = index.cell_area_full * (self.OVERLAP_COEF / self.region_area)
+
+    @classmethod
+    def from_config(cls, scenario, config, spacing=None, cell_resolution=None):
+        """
+        按配置构建候选点索引与目标函数
+
+        参数:
+            scenario: 经纬度坐标的Scenario实例
+            config: 配置类实例
+            spacing: 候选点间距 (米)，为None时使用config.CANDIDATE_SPACING
+            cell_resolution: 统计面积的栅格边长 (米)，为None时使用config.CANDIDATE_CELL_RESOLUTION
+
+        返回:
+            objective: PlacementObjective实例
+        """
+        reward_scenario = scenario.for_reward(config)
+        units = reward_scenario.units_per_metre
+        index = reward_scenario.candidate_index(
+            (spacing or config.CANDIDATE_SPACING) * units,
+            config.DRONE_RADIUS * units,
+            (cell_resolution or config.CANDIDATE_CELL_RESOLUTION) * units,
+            config.CANDIDATE_CACHE_DIR
+        )
+        return cls(index, reward_scenario.region_index.area,
+                   weights=poi_weights(scenario.poi_df, config.POI_POPULATION_WEIGHT),
+                   elevation_threshold=config.ELEVATION_THRESHOLD,
+                   elevation_penalty_weight=config.ELEVATION_PENALTY_WEIGHT,
+                   projection=reward_scenario.projection)
+
+    def lonlat(self, site_ids):
+        """
+        返回候选点的经纬度坐标
+
+        参数:
+            site_ids: 候选点下标
+
+        返回:
+            positions: 形状为(K, 2)的经纬度
+        """
+        sites = self.index.sites[np.asarray(site_ids, dtype=np.int64)]
+        if self.projection is None:
+            return sites.copy()
+        return self.projection.inverse(sites)
+
+    def nearest_sites(self, positions):
+        """
+        把经纬度位置对齐到最近的候选点 (用于在同一目标函数下比较其他方法的选址结果)
+
+        参数:
+            positions: 形状为(K, 2)的经纬度
+
+        返回:
+            site_ids: 形状为(K,)的候选点下标
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        if self.projection is not None:
+            positions = self.projection.forward(positions)
+        return self.index.nearest(positions)
+
+    def counts(self, site_ids):
+        """
+        统计一组候选点对每个POI与每个栅格的覆盖次数
+
+        返回:
+            poi_counts: 形状为(N,)的POI覆盖次数
+            cell_counts: 形状为(M,)的栅格覆盖次数
+        """
+        site_ids = np.asarray(site_ids, dtype=np.int64)
+        return self.index.poi_counts(site_ids), self.index.cell_counts(site_ids)
+
+    def score(self, site_ids):
+        """
+        计算一组候选点的目标函数值
+
+        参数:
+            site_ids: 候选点下标
+
+        返回:
+            score: 目标函数值
+        """
+        return self.evaluate(site_ids)['score']
+
+    def evaluate(self, site_ids):
+        """
+        计算一组候选点的目标函数值与各项指标
+
+        参数:
+            site_ids: 候选点下标
+
+        返回:
+            result: 包含score与poi_coverage、area_coverage、overlap_ratio、elevation_penalty等指标的字典
+        """
+        site_ids = np.asarray(site_ids, dtype=np.int64)
+        poi_counts, cell_counts = self.counts(site_ids)
+        weighted_poi = float(self.poi_weight[poi_counts > 0].sum())
+        area_coverage = float(self.index.cell_area[cell_counts > 0].sum()) / self.region_area
+        overlap_ratio = float((cell_counts * (cell_counts - 1)).sum()) / 2 * self.index.cell_area_full / self.region_area
+        elevation_penalty = float(self.elevation_penalty[site_ids].sum())
+        score = (self.POI_COEF * weighted_poi + self.AREA_COEF * area_coverage - self.OVERLAP_COEF * overlap_ratio
+                 - float(self.site_penalty[site_ids].sum()))
+        poi_covered = int(np.count_nonzero(poi_counts))
+        return {
+            'score': score,
+            'weighted_poi_coverage': weighted_poi,
+            'poi_coverage': poi_covered / self.index.num_poi if self.index.num_poi > 0 else 0.0,
+            'poi_covered': poi_covered,
+            'area_coverage': area_coverage,
+            'overlap_ratio': overlap_ratio,
+            'elevation_penalty': elevation_penalty
+        }
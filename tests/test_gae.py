@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+import torch
+
+from configs import Config
+from models.ppo import PPO, _scalar_gae
+
+
+@pytest.fixture(scope='module')
+def agent():
+    return PPO(4, 4, Config())
+
+
+def reference_gae(rewards, values, terminated, truncated, bootstrap_values, last_values, gamma, gae_lambda):
+    """
+    逐环境、逐时间步的标量GAE参考实现
+
+    终止时下一状态价值为0，截断时取结束状态的bootstrap_values，两者都切断优势的累积；
+    缓冲区最后一步未结束时从last_values自举。
+    """
+    num_steps, num_envs = len(rewards), len(last_values)
+    advantages = np.zeros((num_steps, num_envs))
+    for e in range(num_envs):
+        gae = 0.0
+        for t in reversed(range(num_steps)):
+            if terminated[t][e]:
+                next_value = 0.0
+            elif truncated[t][e]:
+                next_value = bootstrap_values[t][e]
+            elif t == num_steps - 1:
+                next_value = last_values[e]
+            else:
+                next_value = values[t + 1][e]
+            delta = rewards[t][e] + gamma * next_value - values[t][e]
+            if terminated[t][e] or truncated[t][e]:
+                gae = delta
+            else:
+                gae = delta + gamma * gae_lambda * gae
+            advantages[t, e] = gae
+    return advantages, advantages + np.asarray(values)
+
+
+def random_rollout(num_steps, num_envs, seed):
+    """
+    生成带有中途终止与截断的随机经验 (float64)
+    """
+    rng = np.random.default_rng(seed)
+    shape = (num_steps, num_envs)
+    terminated = np.zeros(shape)
+    truncated = np.zeros(shape)
+    # 每个环境在中间各有一次终止与一次截断，另加一些随机的结束
+    terminated[num_steps // 3, :] = 1
+    truncated[2 * num_steps // 3, :] = 1
+    ends = rng.random(shape) < 0.05
+    kinds = rng.random(shape) < 0.5
+    terminated[ends & kinds] = 1
+    truncated[ends & ~kinds & (terminated == 0)] = 1
+    bootstrap_values = rng.normal(size=shape) * truncated
+    return (rng.normal(size=shape), rng.normal(size=shape), terminated, truncated, bootstrap_values,
+            rng.normal(size=num_envs))
+
+
+@pytest.mark.parametrize('num_steps, num_envs', [(1, 1), (7, 1), (64, 5)])
+def test_matches_scalar_reference_with_mid_rollout_ends(agent, num_steps, num_envs):
+    arrays = random_rollout(num_steps, num_envs, seed=num_steps * 100 + num_envs)
+    expected_advantages, expected_returns = reference_gae(*arrays, agent.gamma, agent.gae_lambda)
+    advantages, returns = agent._compute_gae(*(torch.as_tensor(a) for a in arrays))
+    np.testing.assert_allclose(advantages.numpy(), expected_advantages, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(returns.numpy(), expected_returns, rtol=1e-12, atol=1e-12)
+
+
+def test_matches_original_flattened_gae_when_only_terminated(agent):
+    # 只有终止、且每个环境最后一步终止时，与原来在展平序列上计算的实现一致
+    rewards, values, terminated, _, _, _ = random_rollout(50, 4, seed=0)
+    terminated[-1] = 1
+    zeros = torch.zeros(terminated.shape, dtype=torch.float64)
+    advantages, returns = agent._compute_gae(torch.as_tensor(rewards), torch.as_tensor(values),
+                                             torch.as_tensor(terminated), zeros, zeros,
+                                             torch.zeros(4, dtype=torch.float64))
+    flat = lambda a: torch.as_tensor(a).T.reshape(-1)
+    expected_advantages, expected_returns = _scalar_gae(flat(rewards), flat(terminated), flat(values).tolist(),
+                                                        agent.gamma, agent.gae_lambda)
+    np.testing.assert_allclose(advantages.T.reshape(-1).numpy(), expected_advantages.numpy(), atol=1e-12)
+    np.testing.assert_allclose(returns.T.reshape(-1).numpy(), expected_returns.numpy(), atol=1e-12)
+
+
+def test_truncation_bootstraps_from_final_state(agent):
+    # 单步截断: 优势为 r + γ·V(结束状态) - V(s)，与下一时间步 (新回合) 的价值无关
+    rewards = torch.tensor([[1.0], [0.0]], dtype=torch.float64)
+    values = torch.tensor([[0.5], [100.0]], dtype=torch.float64)
+    terminated = torch.zeros(2, 1, dtype=torch.float64)
+    truncated = torch.tensor([[1.0], [0.0]], dtype=torch.float64)
+    bootstrap_values = torch.tensor([[2.0], [0.0]], dtype=torch.float64)
+    advantages, _ = agent._compute_gae(rewards, values, terminated, truncated, bootstrap_values,
+                                       torch.zeros(1, dtype=torch.float64))
+    assert advantages[0, 0].item() == pytest.approx(1.0 + agent.gamma * 2.0 - 0.5)
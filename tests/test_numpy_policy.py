@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+import torch
+
+from configs import Config
+from models import PPO, NumpyPolicy
+
+DRONE_NUM = Config.DRONE_NUM
+BOUNDS = (119.54, 29.75, 120.19, 30.20)
+
+
+def lonlat_states(num, seed):
+    """
+    接近真实的经纬度状态
+    """
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(BOUNDS[0], BOUNDS[2], (num, DRONE_NUM)),
+                            rng.uniform(BOUNDS[1], BOUNDS[3], (num, DRONE_NUM))]).astype(np.float32)
+
+
+@pytest.fixture(params=['scaled', 'unscaled'])
+def agent(request):
+    torch.manual_seed(0)
+    dim = 2 * DRONE_NUM
+    bounds = None
+    if request.param == 'scaled':
+        bounds = (np.array(BOUNDS[:2] * DRONE_NUM), np.array(BOUNDS[2:] * DRONE_NUM))
+    return PPO(dim, dim, Config(), bounds)
+
+
+def test_forward_matches_torch(agent):
+    states = lonlat_states(256, seed=1)
+    mu, sigma, values = agent.numpy_policy().forward(states)
+    with torch.no_grad():
+        torch_mu, torch_sigma = agent.actor(torch.from_numpy(states))
+        torch_values = agent.critic(torch.from_numpy(states))[:, 0]
+    np.testing.assert_allclose(mu, torch_mu.numpy(), rtol=1e-4, atol=1e-5)
+    np.testing.assert_allclose(sigma, torch_sigma.numpy(), rtol=1e-4, atol=1e-5)
+    np.testing.assert_allclose(values, torch_values.numpy(), rtol=1e-4, atol=1e-5)
+
+
+def test_log_probs_match_torch_for_stored_actions(agent):
+    # 返回的对数概率属于实际返回的动作 (含探索噪声)，与PPO更新时的计算一致
+    states = lonlat_states(256, seed=2)
+    actions, log_probs, values = agent.numpy_policy().select_actions(states, np.random.default_rng(0))
+    with torch.no_grad():
+        torch_values, torch_log_probs, _ = agent.evaluate_actions(torch.from_numpy(states), torch.from_numpy(actions))
+    np.testing.assert_allclose(log_probs, torch_log_probs.numpy(), rtol=1e-4, atol=1e-3)
+    np.testing.assert_allclose(values, torch_values.numpy()[:, 0], rtol=1e-4, atol=1e-5)
+
+
+def test_torch_select_actions_log_probs_match_evaluate(agent):
+    states = lonlat_states(256, seed=3)
+    actions, log_probs, _ = agent.select_actions(states)
+    with torch.no_grad():
+        _, torch_log_probs, _ = agent.evaluate_actions(torch.from_numpy(states), torch.from_numpy(actions))
+    np.testing.assert_allclose(log_probs, torch_log_probs.numpy(), rtol=1e-5, atol=1e-4)
+
+
+def test_single_state_matches_batch(agent):
+    policy = agent.numpy_policy()
+    states = lonlat_states(4, seed=4)
+    values = policy.estimate_values(states)
+    assert values.shape == (4,)
+    assert policy.estimate_values(states[0]) == pytest.approx(values[0], rel=1e-6)
+    action, log_prob, value = policy.select_action(states[0], np.random.default_rng(0))
+    assert action.shape == (2 * DRONE_NUM,)
+    assert isinstance(log_prob, float) and value == pytest.approx(values[0], rel=1e-6)
+
+
+def test_weights_without_input_scaling_load_unscaled(agent):
+    # 旧版本导出的权重中没有缩放缓冲区，按不缩放计算
+    weights = {name: value for name, value in agent.numpy_policy().weights.items() if 'obs_' not in name}
+    policy = NumpyPolicy(weights)
+    states = lonlat_states(8, seed=5)
+    with torch.no_grad():
+        agent.actor.obs_center.zero_()
+        agent.actor.obs_scale.fill_(1.0)
+        torch_mu, _ = agent.actor(torch.from_numpy(states))
+    np.testing.assert_allclose(policy.forward(states)[0], torch_mu.numpy(), rtol=1e-4, atol=1e-5)
+
+
+def test_zero_ppo_epochs_is_rejected():
+    config = Config()
+    config.PPO_EPOCHS = 0
+    with pytest.raises(ValueError):
+        PPO(2 * DRONE_NUM, 2 * DRONE_NUM, config)
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import Point, box
+
+from reward.overlap import lens_area, pairwise_overlap, clipped_pair_area
+from reward.raster_coverage import RasterCoverage
+
+RADIUS = 10.0
+# 圆心距离的边界情况: 重合、几乎重合、一般相交、相切、相离
+DISTANCES = {
+    'coincident': 0.0,
+    'nearly_coincident': 1e-6,
+    'intersecting': RADIUS,
+    'nearly_tangent': 2 * RADIUS - 0.1,
+    'tangent': 2 * RADIUS,
+    'disjoint': 3 * RADIUS,
+}
+
+
+def shapely_lens(distance, radius=RADIUS, region=None):
+    """
+    用高精度多边形圆求交作为参考 (可选裁剪到区域内)，接近相切时多边形近似的相对误差约2e-4
+    """
+    a = Point(0.0, 0.0).buffer(radius, quad_segs=512)
+    b = Point(distance, 0.0).buffer(radius, quad_segs=512)
+    both = a.intersection(b)
+    if region is not None:
+        both = both.intersection(region)
+    return both.area
+
+
+@pytest.mark.parametrize('name', DISTANCES)
+def test_lens_area_matches_shapely(name):
+    distance = DISTANCES[name]
+    expected = shapely_lens(distance)
+    assert lens_area(distance, RADIUS) == pytest.approx(expected, rel=5e-4, abs=1e-9)
+
+
+def test_lens_area_limits():
+    assert lens_area(0.0, RADIUS) == pytest.approx(np.pi * RADIUS ** 2, rel=1e-12)
+    assert lens_area(2 * RADIUS, RADIUS) == 0.0
+    assert lens_area(5 * RADIUS, RADIUS) == 0.0
+    # 数组输入保持形状，且随距离单调不增
+    distance = np.linspace(0, 3 * RADIUS, 60).reshape(3, -1)
+    areas = lens_area(distance, RADIUS)
+    assert areas.shape == distance.shape
+    assert np.all(np.diff(areas.ravel()) <= 1e-9)
+
+
+@pytest.mark.parametrize('name', DISTANCES)
+def test_pairwise_overlap_matches_shapely(name):
+    distance = DISTANCES[name]
+    centers = np.array([[0.0, 0.0], [distance, 0.0]])
+    total, per_drone = pairwise_overlap(centers, RADIUS)
+    expected = shapely_lens(distance)
+    assert total == pytest.approx(expected, rel=5e-4, abs=1e-9)
+    np.testing.assert_allclose(per_drone, [expected, expected], rtol=5e-4, atol=1e-9)
+
+
+def test_pairwise_overlap_sums_every_pair_once():
+    # 三个圆: 两两相交、第三个与第一个重合，另加一个相离的圆
+    centers = np.array([[0.0, 0.0], [RADIUS, 0.0], [0.0, 0.0], [10 * RADIUS, 0.0]])
+    total, per_drone = pairwise_overlap(centers.ravel(), RADIUS)
+    disks = [Point(x, y).buffer(RADIUS, quad_segs=512) for x, y in centers]
+    pairs = {(i, j): disks[i].intersection(disks[j]).area for i in range(4) for j in range(4) if i != j}
+    assert total == pytest.approx(sum(area for (i, j), area in pairs.items() if i < j), rel=5e-4)
+    np.testing.assert_allclose(per_drone, [sum(pairs[i, j] for j in range(4) if j != i) for i in range(4)], rtol=5e-4)
+    assert per_drone[3] == 0.0
+
+
+# 区域为正方形，第一个圆心放在区域边界上，使交集有一部分落在区域外
+REGION = box(0.0, -50.0, 100.0, 50.0)
+RESOLUTION = 0.1
+
+
+@pytest.fixture(scope='module')
+def raster():
+    return RasterCoverage(REGION, RESOLUTION, RADIUS)
+
+
+@pytest.mark.parametrize('name', DISTANCES)
+def test_clipped_pair_area_matches_shapely(raster, name):
+    distance = DISTANCES[name]
+    centers = np.array([[0.0, 0.0], [distance, 0.0]])
+    area = clipped_pair_area(raster.disk(centers[0]), raster.disk(centers[1]), raster)
+    expected = shapely_lens(distance, region=REGION)
+    # 栅格按格中心判断是否在圆内，误差约为交集边界长度乘以半个栅格
+    tolerance = 4 * np.pi * RADIUS * RESOLUTION / 2
+    assert area == pytest.approx(expected, abs=tolerance)
+    if name in ('tangent', 'disjoint'):
+        assert area <= RESOLUTION ** 2
+
+
+def test_pairwise_overlap_with_raster_matches_clipped_shapely(raster):
+    centers = np.array([[0.0, 0.0], [RADIUS, 0.0], [0.0, 0.0], [2 * RADIUS, 0.0], [90.0, 0.0]])
+    total, per_drone = pairwise_overlap(centers, RADIUS, raster)
+    disks = [shapely.intersection(Point(x, y).buffer(RADIUS, quad_segs=512), REGION) for x, y in centers]
+    expected = [[disks[i].intersection(disks[j]).area if i != j else 0.0 for j in range(5)] for i in range(5)]
+    tolerance = 4 * np.pi * RADIUS * RESOLUTION / 2
+    assert total == pytest.approx(np.sum(np.triu(expected, k=1)), abs=6 * tolerance)
+    np.testing.assert_allclose(per_drone, np.sum(expected, axis=1), atol=4 * tolerance)
+    assert per_drone[4] == 0.0
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+import torch
+
+from configs import Config
+from train import train
+
+EPOCHS = 3
+SPLIT = 1
+
+
+def tiny_config(model_dir, epochs, num_envs):
+    """
+    很小的训练配置: 回合跨越迭代边界，中断处保存resume.pth
+    """
+    config = Config()
+    config.MODEL_DIR = str(model_dir)
+    config.EPOCHS = epochs
+    config.NUM_STEPS = 40
+    config.MAX_STEPS = 15
+    config.BATCH_SIZE = 16
+    config.NUM_ENVS = num_envs
+    config.NUM_WORKERS = 0
+    config.SAVE_INTERVAL = SPLIT
+    config.VISUAL_INTERVAL = 10 ** 9
+    config.VISUAL_WORKERS = 0
+    return config
+
+
+def differences(a, b, path='state'):
+    """
+    递归比较两个状态，返回不逐位一致的键路径
+    """
+    if torch.is_tensor(a):
+        return [] if torch.is_tensor(b) and a.dtype == b.dtype and torch.equal(a, b) else [path]
+    if isinstance(a, dict):
+        if a.keys() != b.keys():
+            return [path]
+        return [diff for key in a for diff in differences(a[key], b[key], f"{path}.{key}")]
+    if isinstance(a, (list, tuple)):
+        if len(a) != len(b):
+            return [path]
+        return [diff for i, (x, y) in enumerate(zip(a, b)) for diff in differences(x, y, f"{path}[{i}]")]
+    return [] if a == b else [path]
+
+
+@pytest.mark.parametrize('num_envs', [1, 2])
+def test_resumed_training_is_bit_identical(tmp_path, num_envs):
+    torch.set_num_threads(1)
+    full = train(tiny_config(tmp_path / 'full', EPOCHS, num_envs)).checkpoint_state()
+    train(tiny_config(tmp_path / 'split', SPLIT, num_envs))
+    resume_path = os.path.join(tmp_path / 'split', 'resume.pth')
+    assert os.path.exists(resume_path)
+    resumed = train(tiny_config(tmp_path / 'split', EPOCHS, num_envs), resume_path).checkpoint_state()
+
+    assert full['total_steps'] == resumed['total_steps'] == EPOCHS
+    for key in ('actor', 'critic', 'actor_optimizer', 'critic_optimizer'):
+        assert differences(full[key], resumed[key], key) == []
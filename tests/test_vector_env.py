@@ -0,0 +1,50 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from configs import Config
+from env.drone_env import DroneEnvironment
+from env.vector_env import VectorDroneEnvironment
+from scenario import Scenario
+
+NUM_LAYOUTS = 8
+
+
+@pytest.fixture(scope='module')
+def scenario():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Scenario.from_config(Config())
+
+
+@pytest.mark.parametrize('coverage_mode, overlap_mode', [
+    ('shapely', 'shapely'),
+    ('shapely', 'analytic'),
+    ('raster', 'shapely'),
+    ('raster', 'analytic'),
+])
+def test_batched_rewards_match_single_env(scenario, coverage_mode, overlap_mode):
+    """
+    同一COVERAGE_MODE/OVERLAP_MODE下，批量环境对每个布局的奖励与DroneEnvironment一致
+    """
+    config = Config()
+    config.COVERAGE_MODE = coverage_mode
+    config.OVERLAP_MODE = overlap_mode
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = DroneEnvironment(config, scenario)
+        vector_env = VectorDroneEnvironment(config, NUM_LAYOUTS, scenario)
+    np.random.seed(0)
+    vector_env.reset()
+    rewards, infos = vector_env._compute_reward(vector_env.positions)
+
+    for index, positions in enumerate(vector_env.positions):
+        # 栅格模式的增量覆盖状态每个布局都从头计算
+        env.reset()
+        env.state = positions.reshape(-1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            reward, info = env._compute_reward()
+        assert rewards[index] == pytest.approx(reward, rel=1e-9, abs=1e-12)
+        assert infos['area_coverage'][index] == pytest.approx(info['area_coverage'], rel=1e-9, abs=1e-12)
+        assert infos['overlap_ratio'][index] == pytest.approx(info['overlap_ratio'], rel=1e-9, abs=1e-12)
+        assert infos['poi_covered'][index] == info['poi_covered']
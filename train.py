@@ -1,18 +1,24 @@
 import os
 import time
+import random
+import argparse
 import numpy as np
 import torch
 from configs import Config
-from env import DroneEnvironment
-from models import PPO, Memory
-from view import visualize
+from env import DroneEnvironment, VectorDroneEnvironment, RolloutPool
+from models import PPO, RolloutBuffer, CheckpointWriter
+from visual_worker import VisualWorker
 
-def train():
+def train(config=None, resume=None):
     """
     训练主函数
+    
+    参数:
+        config: 配置类实例，为None时使用默认配置
+        resume: 断点续训的检查点路径 (resume.pth)，为None时从头开始
     """
     # 创建配置和目录
-    config = Config()
+    config = config or Config()
     config.make_dirs()
     
     # 设置随机种子
@@ -23,88 +29,333 @@ def train():
     
     # 创建环境
     env = DroneEnvironment(config)
+    # 多环境时用批量环境同时推进NUM_ENVS个回合，共享同一份区域、POI与DEM数据
+    # NUM_WORKERS大于0时把这些环境分给多个子进程，场景数据通过共享内存传递
+    if config.NUM_WORKERS > 0:
+        vector_env = RolloutPool(config, max(config.NUM_ENVS, config.NUM_WORKERS), config.NUM_WORKERS, scenario=env.scenario)
+    elif config.NUM_ENVS > 1:
+        vector_env = VectorDroneEnvironment(config, config.NUM_ENVS, scenario=env.scenario)
+    else:
+        vector_env = None
     
     # 初始化PPO算法
     state_dim = env.observation_space.shape[0]
     action_dim = env.action_space.shape[0]
-    agent = PPO(state_dim, action_dim, config)
+    agent = PPO(state_dim, action_dim, config, (env.observation_space.low, env.observation_space.high))
+    
+    # 创建经验缓冲区: 每次迭代收集固定的NUM_STEPS步经验 (批量环境时向上取整为环境数的整数倍)
+    num_envs = vector_env.num_envs if vector_env is not None else 1
+    rollout_steps = -(-config.NUM_STEPS // num_envs)
+    memory = RolloutBuffer(rollout_steps, state_dim, action_dim, num_envs=num_envs, device=config.DEVICE)
+    
+    # 回合统计与经验收集分开记录，回合可以跨越两次迭代
+    stats = EpisodeStats(num_envs)
+    if isinstance(vector_env, RolloutPool):
+        # 子进程有各自的NumPy随机数状态，按SEED显式设置 (子进程i使用SEED+i)，否则子进程从系统熵初始化
+        states, _ = vector_env.reset(seed=config.SEED)
+    elif vector_env is not None:
+        states, _ = vector_env.reset()
+    else:
+        states, _ = env.reset()
+    
+    # 检查点在后台线程中写盘，训练线程只复制一份CPU快照
+    checkpoints = CheckpointWriter(keep=config.CHECKPOINT_KEEP)
     
-    # 创建经验回放缓冲区
-    memory = Memory()
+    # 训练快照在子进程中绘制，训练线程只提交位置与指标
+    visuals = VisualWorker(env.scenario, config, config.VISUAL_WORKERS, config.VISUAL_QUEUE_SIZE)
     
-    # 训练参数
-    total_rewards = []
-    avg_rewards = []
-    best_reward = float('-inf')
+    # 经验收集所用的策略: NumPy快照在每次更新后重新生成
+    policy = agent.numpy_policy() if config.ROLLOUT_POLICY == 'numpy' else agent
+    
+    # 断点续训: 在所有对象按同样的顺序创建完之后，恢复参数、环境、回合统计与随机数状态
+    total_steps = 0
+    start_iteration = 0
+    if resume is not None:
+        start_iteration, total_steps, states = load_training_state(resume, agent, env, vector_env, stats)
+        if config.ROLLOUT_POLICY == 'numpy':
+            policy = agent.numpy_policy()
+        print(f"从 {resume} 恢复训练: 第{start_iteration}次迭代, {total_steps}个环境步")
     
     # 开始训练
-    for episode in range(config.EPOCHS):
-        # 重置环境
-        state, _ = env.reset()
-        episode_reward = 0
-        episode_steps = 0
-        
-        # 收集经验
-        for step in range(config.NUM_STEPS):
-            # 选择动作
-            action, log_prob, value = agent.select_action(state)
-            
-            # 执行动作
-            next_state, reward, terminated, truncated, info = env.step(action)
-            done = terminated or truncated
-            
-            # 将经验添加到缓冲区
-            memory.push(state, action, log_prob, reward, done, value)
-            
-            # 更新状态
-            state = next_state
-            episode_reward += reward
-            episode_steps += 1
-            
-            # 如果回合结束，重置环境
-            if done:
-                # 最后状态的价值
-                _, _, value = agent.select_action(state)
-                memory.values.append(value)
-                
-                # 记录奖励
-                total_rewards.append(episode_reward)
-                if len(total_rewards) > 100:
-                    avg_reward = np.mean(total_rewards[-100:])
-                else:
-                    avg_reward = np.mean(total_rewards)
-                avg_rewards.append(avg_reward)
-                
-                print(f"Episode: {episode+1}, Step: {episode_steps}, Reward: {episode_reward:.2f}, Avg Reward: {avg_reward:.2f}")
-                print(f"Info: POI Coverage: {info['poi_coverage']:.2f}, Area Coverage: {info['area_coverage']:.2f}, Overlap: {info['overlap_ratio']:.2f}")
-                
-                # 保存最佳模型
-                if episode_reward > best_reward:
-                    best_reward = episode_reward
-                    agent.save_models(os.path.join(config.MODEL_DIR, "best_model.pth"))
-                
-                # 可视化
-                if (episode + 1) % config.VISUAL_INTERVAL == 0:
-                    print("Visualizing...")
-                    drone_positions = state.reshape(-1, 2)
-                    output_path = os.path.join(config.VISUAL_DIR, f"episode_{episode+1}.png")
-                    visualize(env.region_geometry, env.poi_gdf, drone_positions, config.DRONE_RADIUS, output_path, info)
-                
-                break
+    for iteration in range(start_iteration, config.EPOCHS):
+        start_time = time.perf_counter()
+        if vector_env is not None:
+            states = collect_vector_rollout(vector_env, policy, memory, states, stats)
+        else:
+            states = collect_rollout(env, policy, memory, states, stats)
+        collect_time = time.perf_counter() - start_time
+        total_steps += len(memory)
         
         # 更新PPO
-        if len(memory) >= config.NUM_STEPS:
-            agent.update(memory)
-            memory.clear()
+        update_stats = agent.update(memory)
+        print(f"Iteration: {iteration+1}, Steps: {total_steps}, Collect: {len(memory) / collect_time:.0f} steps/s, "
+              f"Epochs: {update_stats['epochs']}, Sample Reuse: {update_stats['sample_reuse']:.2f}, "
+              f"KL: {update_stats['approx_kl']:.4f}, Clip Fraction: {update_stats['clip_fraction']:.3f}, "
+              f"Update: {update_stats['update_time']:.2f}s ({len(memory) * update_stats['sample_reuse'] / update_stats['update_time']:.0f} samples/s)")
+        memory.clear()
+        if config.ROLLOUT_POLICY == 'numpy':
+            policy = agent.numpy_policy()
+        
+        # 本次迭代中结束的回合
+        best = stats.pop_iteration()
+        if best is not None:
+            episode_reward, episode_steps, info = best
+            print(f"Episodes: {stats.num_episodes}, Iteration Best Reward: {episode_reward:.2f} ({episode_steps} steps), "
+                  f"Avg Reward: {stats.avg_rewards[-1]:.2f}")
+            print(f"Info: POI Coverage: {info['poi_coverage']:.2f}, Area Coverage: {info['area_coverage']:.2f}, Overlap: {info['overlap_ratio']:.2f}")
+            
+            # 保存最佳模型
+            if episode_reward > stats.best_reward:
+                stats.best_reward = episode_reward
+                checkpoints.save(os.path.join(config.MODEL_DIR, "best_model.pth"), agent.checkpoint_state())
+            
+            # 可视化
+            if (iteration + 1) % config.VISUAL_INTERVAL == 0:
+                visuals.submit(info, os.path.join(config.VISUAL_DIR, f"iteration_{iteration+1}.png"))
         
         # 定期保存模型
-        if (episode + 1) % config.SAVE_INTERVAL == 0:
-            agent.save_models(os.path.join(config.MODEL_DIR, f"model_{episode+1}.pth"))
+        if (iteration + 1) % config.SAVE_INTERVAL == 0:
+            checkpoints.save(os.path.join(config.MODEL_DIR, f"model_{iteration+1}.pth"), agent.checkpoint_state(),
+                             group='periodic')
+        
+        # 定期保存断点续训所需的完整状态
+        if (iteration + 1) % config.SAVE_INTERVAL == 0 or iteration + 1 == config.EPOCHS:
+            checkpoints.save(os.path.join(config.MODEL_DIR, "resume.pth"),
+                             training_state(iteration + 1, total_steps, states, agent, env, vector_env, stats))
     
     # 训练结束，保存最终模型
-    agent.save_models(os.path.join(config.MODEL_DIR, "final_model.pth"))
+    checkpoints.save(os.path.join(config.MODEL_DIR, "final_model.pth"), agent.checkpoint_state())
+    checkpoints.close()
+    visuals.close()
+    if vector_env is not None:
+        vector_env.close()
     
     print("Training completed!")
+    return agent
+
+def training_state(iteration, total_steps, states, agent, env, vector_env, stats):
+    """
+    收集断点续训所需的完整状态
+    
+    每次迭代结束时经验缓冲区已清空，NumPy策略快照可由参数重新生成，
+    因此只需保存参数与优化器、环境、回合统计以及NumPy、torch与Python的随机数状态。
+    
+    参数:
+        iteration: 下一次要执行的迭代编号
+        total_steps: 已收集的环境步数
+        states: 当前状态
+        agent: PPO智能体
+        env: 单环境
+        vector_env: 批量环境或经验收集池，为None时使用单环境
+        stats: EpisodeStats回合统计
+        
+    返回:
+        state: 状态字典
+    """
+    return {
+        'iteration': iteration,
+        'total_steps': total_steps,
+        'states': np.array(states, copy=True),
+        'agent': agent.checkpoint_state(),
+        'env': vector_env.get_state() if vector_env is not None else env.get_state(),
+        'stats': stats.get_state(),
+        'random': {
+            'numpy': np.random.get_state(),
+            'torch': torch.get_rng_state(),
+            'cuda': torch.cuda.get_rng_state_all() if torch.cuda.is_available() else None,
+            'python': random.getstate()
+        }
+    }
+
+def load_training_state(path, agent, env, vector_env, stats):
+    """
+    恢复training_state保存的状态
+    
+    参数:
+        path: 检查点路径
+        agent: PPO智能体
+        env: 单环境
+        vector_env: 批量环境或经验收集池，为None时使用单环境
+        stats: EpisodeStats回合统计
+        
+    返回:
+        iteration: 下一次要执行的迭代编号
+        total_steps: 已收集的环境步数
+        states: 当前状态
+    """
+    state = torch.load(path, map_location='cpu', weights_only=False)
+    agent.load_state(state['agent'])
+    if vector_env is not None:
+        vector_env.set_state(state['env'])
+    else:
+        env.set_state(state['env'])
+    stats.set_state(state['stats'])
+    
+    np.random.set_state(state['random']['numpy'])
+    torch.set_rng_state(state['random']['torch'])
+    if state['random']['cuda'] is not None and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['random']['cuda'])
+    random.setstate(state['random']['python'])
+    return state['iteration'], state['total_steps'], state['states']
+
+class EpisodeStats:
+    """
+    回合统计
+    
+    经验收集按步数进行，回合在任意一步结束；每个环境的累计奖励和步数在这里单独记录，
+    回合结束时登记一次，训练循环在每次迭代后取出本次迭代中奖励最高的回合用于日志、保存与可视化。
+    """
+    
+    def __init__(self, num_envs):
+        """
+        初始化回合统计
+        
+        参数:
+            num_envs: 环境数
+        """
+        self.episode_rewards = np.zeros(num_envs)
+        self.episode_steps = np.zeros(num_envs, dtype=np.int64)
+        self.total_rewards = []
+        self.avg_rewards = []
+        self.best_reward = float('-inf')
+        self.iteration_best = None
+    
+    @property
+    def num_episodes(self):
+        """
+        已结束的回合数
+        """
+        return len(self.total_rewards)
+    
+    def step(self, rewards, dones, infos):
+        """
+        累加一步的奖励，并登记结束的回合
+        
+        参数:
+            rewards: 形状为(E,)的奖励
+            dones: 形状为(E,)的回合结束标志
+            infos: 函数infos(i)返回第i个环境结束时的信息
+        """
+        self.episode_rewards += rewards
+        self.episode_steps += 1
+        for i in np.flatnonzero(dones):
+            episode_reward = float(self.episode_rewards[i])
+            self.total_rewards.append(episode_reward)
+            self.avg_rewards.append(np.mean(self.total_rewards[-100:]))
+            if self.iteration_best is None or episode_reward > self.iteration_best[0]:
+                self.iteration_best = (episode_reward, int(self.episode_steps[i]), infos(i))
+            self.episode_rewards[i] = 0
+            self.episode_steps[i] = 0
+    
+    def get_state(self):
+        """
+        返回可恢复的状态副本
+        """
+        return {
+            'episode_rewards': self.episode_rewards.copy(),
+            'episode_steps': self.episode_steps.copy(),
+            'total_rewards': list(self.total_rewards),
+            'avg_rewards': list(self.avg_rewards),
+            'best_reward': self.best_reward
+        }
+    
+    def set_state(self, state):
+        """
+        恢复get_state返回的状态
+        """
+        self.episode_rewards[:] = state['episode_rewards']
+        self.episode_steps[:] = state['episode_steps']
+        self.total_rewards = list(state['total_rewards'])
+        self.avg_rewards = list(state['avg_rewards'])
+        self.best_reward = state['best_reward']
+        self.iteration_best = None
+    
+    def pop_iteration(self):
+        """
+        取出并清空本次迭代中奖励最高的回合
+        
+        返回:
+            (episode_reward, episode_steps, info)，本次迭代没有回合结束时为None
+        """
+        best, self.iteration_best = self.iteration_best, None
+        return best
+
+def collect_rollout(env, policy, memory, state, stats):
+    """
+    在单个环境中收集固定步数的经验，回合结束时立即重置并继续
+    
+    参数:
+        env: 环境
+        policy: 选择动作的策略 (PPO智能体或其NumpyPolicy快照)
+        memory: 经验缓冲区，收集到填满为止
+        state: 当前状态
+        stats: EpisodeStats回合统计
+        
+    返回:
+        state: 收集结束时的状态，下一次迭代从这里继续
+    """
+    for _ in range(memory.num_steps):
+        # 选择动作
+        action, log_prob, value = policy.select_action(state)
+        
+        # 执行动作
+        next_state, reward, terminated, truncated, info = env.step(action)
+        
+        # 将经验添加到缓冲区: 截断时从结束状态的价值自举
+        bootstrap_value = policy.estimate_values(next_state) if truncated else 0.0
+        memory.push(state, action, log_prob, reward, terminated, truncated, value, bootstrap_value)
+        
+        done = terminated or truncated
+        stats.step(np.array([reward]), np.array([done]), lambda _: info)
+        
+        # 如果回合结束，重置环境
+        state = env.reset()[0] if done else next_state
+    
+    # 在收集截止处从当前状态的价值自举
+    memory.set_last_values(policy.estimate_values(state))
+    return state
+
+def collect_vector_rollout(vector_env, policy, memory, states, stats):
+    """
+    在批量环境中收集固定步数的经验，回合结束的环境由批量环境自动重置
+    
+    参数:
+        vector_env: 批量环境
+        policy: 选择动作的策略 (PPO智能体或其NumpyPolicy快照)
+        memory: 经验缓冲区，收集到填满为止 (每个时间步写入所有环境的一行)
+        states: 当前状态，形状为(E, state_dim)
+        stats: EpisodeStats回合统计
+        
+    返回:
+        states: 收集结束时的状态，下一次迭代从这里继续
+    """
+    num_envs = vector_env.num_envs
+    for _ in range(memory.num_steps):
+        # 对所有环境批量选择动作
+        actions, log_probs, values = policy.select_actions(states)
+        
+        # 执行动作
+        next_states, rewards, terminated, truncated, infos = vector_env.step(actions)
+        
+        # 所有环境同一时间步的经验作为缓冲区的一行写入
+        # 截断的环境已自动重置，自举用final_observation中结束时的状态
+        bootstrap_values = np.zeros(num_envs)
+        if truncated.any():
+            bootstrap_values[truncated] = policy.estimate_values(infos['final_observation'][truncated])
+        memory.push(states, actions, log_probs, rewards, terminated, truncated, values, bootstrap_values)
+        
+        stats.step(rewards, terminated | truncated, lambda i: infos['final_info'][i])
+        states = next_states
+    
+    # 在收集截止处从当前状态的价值自举
+    memory.set_last_values(policy.estimate_values(states))
+    return states
 
 if __name__ == "__main__":
-    train() 
\ No newline at end of file
+    # 解析命令行参数
+    parser = argparse.ArgumentParser(description="Train drone hangar placement policy")
+    parser.add_argument("--resume", type=str, default=None, help="Path to resume.pth")
+    
+    args = parser.parse_args()
+    
+    train(resume=args.resume)
@@ -1,32 +1,24 @@
 import os
 import time
 import numpy as np
+import matplotlib
+import matplotlib.image
 import matplotlib.pyplot as plt
-from matplotlib.patches import Patch
-import geopandas as gpd
-from shapely.geometry import Point, MultiPolygon, Polygon
-import rasterio
+from matplotlib.patches import Patch, PathPatch
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.font_manager import FontProperties
+from matplotlib.lines import Line2D
+from matplotlib.path import Path
+import shapely
+from shapely.geometry import Polygon
 from matplotlib.colors import LinearSegmentedColormap
 
-def visualize(region_geometry, poi_gdf, drone_positions, drone_radius, output_path=None, info=None):
+def _setup_fonts():
     """
-    可视化无人机覆盖情况
-    
-    参数:
-        region_geometry: 区域几何形状
-        poi_gdf: POI的GeoDataFrame
-        drone_positions: 无人机库位置坐标
-        drone_radius: 无人机覆盖半径(米)
-        output_path: 输出路径
-        info: 额外信息
+    设置中文字体与绘图风格 (对之后创建的所有图形生效)
     """
-    # 创建画布，使用更大的尺寸以提高清晰度
-    fig, ax = plt.subplots(figsize=(14, 12), dpi=100)
-    
-    # 设置中文字体
-    import os
-    import matplotlib
-    
     # 确保字体编码正确
     matplotlib.rcParams['pdf.fonttype'] = 42
     matplotlib.rcParams['ps.fonttype'] = 42
@@ -57,277 +49,347 @@ def visualize(region_geometry, poi_gdf, drone_positions, drone_radius, output_pa
     
     # 设置更现代的风格
     plt.style.use('seaborn-v0_8-whitegrid')
+
+def _view_config():
+    """
+    读取可视化用到的配置
     
-    # 转换无人机覆盖半径(米)为经纬度
-    drone_radius_degree = drone_radius / 111000  # 转为度
-    
-    # 先绘制行政区域作为底图，使用更淡的颜色
-    gpd.GeoSeries([region_geometry]).plot(ax=ax, color='#E6F3FF', edgecolor='#6BAED6', alpha=0.2, linewidth=0.8)
-    
-    # 尝试获取配置和DEM数据以可视化海拔
+    返回:
+        dem_file: 存在的DEM文件路径，不存在或配置加载失败时为None
+        elevation_threshold: 海拔阈值(米)
+    """
     dem_file = None
+    elevation_threshold = 50  # 默认阈值，如果有配置可以替换
     try:
         from configs import Config
         config = Config()
         if os.path.exists(config.DEM_FILE):
             dem_file = config.DEM_FILE
+        elevation_threshold = config.ELEVATION_THRESHOLD
     except Exception as e:
         print(f"加载配置失败: {e}")
+    return dem_file, elevation_threshold
+
+def _draw_dem(fig, ax, dem_file, bounds, scale_factor=8):
+    """
+    在区域边界范围内绘制降采样的DEM图层与色条
     
-    # 绘制DEM数据
-    dem_shown = False
-    if dem_file:
-        try:
-            # 获取区域边界用于设置绘图范围
-            bounds = region_geometry.bounds  # (minx, miny, maxx, maxy)
-            
-            with rasterio.open(dem_file) as src:
-                # 读取DEM数据
-                dem_data = src.read(1)
-                
-                # 创建地形图配色方案 (低海拔为绿色，高海拔为棕色)
-                terrain_colors = {'green': '#267300', 'yellow': '#FFFF00', 'brown': '#A87000', 'white': '#FFFFFF'}
-                cmap = LinearSegmentedColormap.from_list('terrain', 
-                                                        [(0.0, terrain_colors['green']), 
-                                                         (0.3, terrain_colors['green']),
-                                                         (0.5, terrain_colors['yellow']),
-                                                         (0.7, terrain_colors['brown']),
-                                                         (1.0, terrain_colors['white'])])
-                
-                # 设置最小、最大值以增强对比度
-                vmin = max(0, np.nanmin(dem_data))
-                vmax = min(500, np.nanmax(dem_data))
-                
-                # 创建DEM数据的网格
-                rows, cols = dem_data.shape
-                
-                # 获取地理变换信息，用于将行列索引转换为地理坐标
-                transform = src.transform
-                xs = np.array([transform[0] + (col + 0.5) * transform[1] for col in range(cols)])
-                ys = np.array([transform[3] + (row + 0.5) * transform[5] for row in range(rows)])
-                
-                # 使用pcolormesh进行显示（比imshow更适合地理数据）
-                # 由于xs和ys可能很大，我们使用一个缩放系数来减少数据量
-                scale_factor = 8  # 减少8倍数据点，提高精度
-                # 设置zorder为1，确保DEM在底层显示
-                dem_plot = ax.pcolormesh(
-                    xs[::scale_factor], 
-                    ys[::scale_factor], 
-                    dem_data[::scale_factor, ::scale_factor],
-                    cmap=cmap, 
-                    vmin=vmin, 
-                    vmax=vmax, 
-                    alpha=0.5,
-                    zorder=1  # 设置较低的zorder确保在底层
-                )
-                
-                # 添加色条，使用更现代的样式，调整位置和大小避免与经度标签重叠
-                cbar = plt.colorbar(dem_plot, ax=ax, label='海拔 (米)', shrink=0.35, pad=0.08, 
-                                   location='bottom', orientation='horizontal')
-                
-                # 调整色条标签字体大小，确保中文显示正常
-                cbar.ax.set_xlabel('海拔 (米)', fontsize=10, fontproperties='SimHei')
-                cbar.ax.tick_params(labelsize=9)
-                
-                # 设置绘图区域范围与行政区域一致
-                ax.set_xlim(bounds[0], bounds[2])
-                ax.set_ylim(bounds[1], bounds[3])
-                
-                dem_shown = True
-                print(f"DEM显示成功，数据范围: {vmin}-{vmax}米")
-        except Exception as e:
-            print(f"绘制DEM数据失败: {e}")
-            import traceback
-            traceback.print_exc()
-    
-    # 如果DEM绘制成功，增强行政区域边界的可见性，使用更精致的样式
-    if dem_shown:
-        # 使用更细腻的线条和更现代的颜色
-        gpd.GeoSeries([region_geometry]).plot(ax=ax, color='none', edgecolor='#3182bd', 
-                                           alpha=0.9, linewidth=1.2, zorder=6)
-    
-    # 检查drone_positions是否有效
-    if drone_positions is None or len(drone_positions) == 0:
-        print("警告: 无人机位置数据为空")
-        plt.title('无人机机库选址 (数据错误)')
-        if output_path:
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
-            plt.close()
-        else:
-            plt.show()
-        return
-    
-    # 确保drone_positions的形状正确
-    if isinstance(drone_positions, np.ndarray) and drone_positions.ndim == 2:
-        drone_points = [Point(pos[0], pos[1]) for pos in drone_positions]
-    else:
-        try:
-            # 尝试重塑数组
-            reshaped_positions = np.array(drone_positions).reshape(-1, 2)
-            drone_points = [Point(pos[0], pos[1]) for pos in reshaped_positions]
-            print(f"重塑无人机位置数据: {len(drone_points)}个点")
-        except Exception as e:
-            print(f"无法处理无人机位置数据: {e}")
-            drone_points = []
-    
-    # 使用传入的drone_buffers或计算新的
-    if info and 'drone_buffers' in info and info['drone_buffers']:
-        buffers = info['drone_buffers']
-        print(f"使用预计算的buffers: {len(buffers)}个")
-    else:
-        print(f"计算新的buffer，点数: {len(drone_points)}")
-        buffers = [point.buffer(drone_radius_degree) for point in drone_points]
-    
-    # 绘制每个无人机覆盖范围，使用更精致的样式和适当的zorder
-    for i, buffer in enumerate(buffers):
-        # 使用半透明红色，细线条边框
-        gpd.GeoSeries([buffer]).plot(ax=ax, color='#ff9999', edgecolor='#e74c3c', 
-                                    alpha=0.25, linewidth=0.6, zorder=2)
-    
-    # 绘制有效覆盖区域（与行政区域的交集）
-    merged_buffer = None
-    if info and 'merged_buffer' in info:
-        merged_buffer = info['merged_buffer']
-    else:
-        # 合并缓冲区
-        if buffers:
-            try:
-                merged_buffer = buffers[0]
-                for buffer in buffers[1:]:
-                    merged_buffer = merged_buffer.union(buffer)
-            except Exception as e:
-                print(f"合并缓冲区时出错: {e}")
-    
-    if merged_buffer:
-        try:
-            if isinstance(merged_buffer, MultiPolygon):
-                # 计算每个polygon与区域的交集
-                valid_polys = []
-                for p in merged_buffer.geoms:
-                    try:
-                        intersection = p.intersection(region_geometry)
-                        if not intersection.is_empty and (isinstance(intersection, Polygon) or isinstance(intersection, MultiPolygon)):
-                            valid_polys.append(intersection)
-                    except Exception as e:
-                        print(f"计算多边形交集时出错: {e}")
-                
-                if valid_polys:
-                    try:
-                        if len(valid_polys) > 1:
-                            coverage_poly = MultiPolygon(valid_polys)
-                        else:
-                            coverage_poly = valid_polys[0]
-                        # 绘制有效覆盖区域，使用更精致的样式
-                        gpd.GeoSeries([coverage_poly]).plot(ax=ax, color='#6BAED6', 
-                                                          edgecolor='#3182bd', alpha=0.4, 
-                                                          linewidth=0.8, zorder=3)
-                    except Exception as e:
-                        print(f"绘制有效覆盖区域时出错: {e}")
-            else:
-                try:
-                    coverage_poly = merged_buffer.intersection(region_geometry)
-                    if not coverage_poly.is_empty:
-                        gpd.GeoSeries([coverage_poly]).plot(ax=ax, color='#6BAED6', 
-                                                          edgecolor='#3182bd', alpha=0.4, 
-                                                          linewidth=0.8, zorder=3)
-                except Exception as e:
-                    print(f"计算单一buffer交集时出错: {e}")
-        except Exception as e:
-            print(f"处理merged_buffer时出错: {e}")
+    只读取覆盖区域边界的DEM窗口，像元中心坐标由仿射变换向量化计算。
     
-    # 获取海拔信息
-    drone_elevations = info.get('drone_elevations', [0] * len(drone_points)) if info else [0] * len(drone_points)
-    elevation_threshold = 50  # 默认阈值，如果有配置可以替换
+    参数:
+        fig: 图形
+        ax: 坐标轴
+        dem_file: DEM文件路径
+        bounds: 区域边界 (minx, miny, maxx, maxy)
+        scale_factor: 降采样倍数
+        
+    返回:
+        dem_shown: 是否绘制成功
+    """
     try:
-        from configs import Config
-        elevation_threshold = Config.ELEVATION_THRESHOLD
-    except:
-        pass
-    
-    # 创建无人机点的GeoDataFrame并绘制，根据海拔使用不同颜色
-    drone_gdf = gpd.GeoDataFrame(geometry=drone_points)
-    # 添加海拔数据作为属性
-    drone_gdf['elevation'] = drone_elevations
-    
-    # 根据海拔分类绘制点: 低于阈值为绿色，高于阈值为红色
-    low_elevation_points = drone_gdf[drone_gdf['elevation'] <= elevation_threshold]
-    high_elevation_points = drone_gdf[drone_gdf['elevation'] > elevation_threshold]
-    
-    # 绘制低海拔和高海拔的点，使用更专业的样式
-    if not low_elevation_points.empty:
-        low_elevation_points.plot(ax=ax, color='#2ca02c', markersize=120, marker='o', linewidth=1.5, 
-                                 edgecolor='white', zorder=5)
-    if not high_elevation_points.empty:
-        high_elevation_points.plot(ax=ax, color='#d62728', markersize=120, marker='o', linewidth=1.5, 
-                                  edgecolor='white', zorder=5)
-    
-    # 绘制POI点位，使用更精致的样式
-    poi_gdf.plot(ax=ax, color='#9467bd', markersize=25, marker='o', edgecolor='white', linewidth=0.8, 
-                alpha=0.8, zorder=4)
-    
-    # 添加图例，使用更现代的样式
-    from matplotlib.font_manager import FontProperties
-    font_prop = FontProperties(family='SimHei')
-    
-    legend_elements = [
-        Patch(facecolor='#E6F3FF', edgecolor='#6BAED6', alpha=0.5, label='行政区域'),
-        Patch(facecolor='red', alpha=0.3, label='无人机覆盖范围'),
-        Patch(facecolor='#6BAED6', alpha=0.5, label='有效覆盖区域'),
-        plt.Line2D([], [], color='#2ca02c', marker='o', markeredgecolor='white', linestyle='None', 
-                  markersize=8, label=f'无人机点位 (≤{elevation_threshold}米)'),
-        plt.Line2D([], [], color='#d62728', marker='o', markeredgecolor='white', linestyle='None', 
-                  markersize=8, label=f'无人机点位 (>{elevation_threshold}米)'),
-        plt.Line2D([], [], color='#9467bd', marker='o', markeredgecolor='white', linestyle='None', 
-                  markersize=6, label='POI点位')
-    ]
-    # 调整图例位置，避免与其他元素重叠，并设置中文字体
-    ax.legend(handles=legend_elements, loc='upper right', framealpha=0.9, edgecolor='#cccccc', 
-             bbox_to_anchor=(0.98, 0.98), prop=font_prop)
-    
-    # 添加标题和信息
-    coverage_ratio = info['poi_coverage'] * 100 if info and 'poi_coverage' in info else 0
-    area_coverage = info['area_coverage'] * 100 if info and 'area_coverage' in info else 0
-    overlap_ratio = info['overlap_ratio'] * 100 if info and 'overlap_ratio' in info else 0
-    elevation_penalty = info['elevation_penalty'] if info and 'elevation_penalty' in info else 0
+        from scenario.elevation import ElevationGrid
+        grid = ElevationGrid(dem_file, bounds=bounds)
+        dem_data = np.where(grid.valid, grid.data, np.nan).astype(np.float64)
+        
+        # 创建地形图配色方案 (低海拔为绿色，高海拔为棕色)
+        terrain_colors = {'green': '#267300', 'yellow': '#FFFF00', 'brown': '#A87000', 'white': '#FFFFFF'}
+        cmap = LinearSegmentedColormap.from_list('terrain', 
+                                                [(0.0, terrain_colors['green']), 
+                                                 (0.3, terrain_colors['green']),
+                                                 (0.5, terrain_colors['yellow']),
+                                                 (0.7, terrain_colors['brown']),
+                                                 (1.0, terrain_colors['white'])])
+        
+        # 设置最小、最大值以增强对比度
+        vmin = max(0, np.nanmin(dem_data))
+        vmax = min(500, np.nanmax(dem_data))
+        
+        # 像元中心的地理坐标 (窗口的仿射变换: x = c + col*a, y = f + row*e)
+        rows, cols = dem_data.shape
+        transform = grid.transform
+        xs = transform.c + (np.arange(cols) + 0.5) * transform.a
+        ys = transform.f + (np.arange(rows) + 0.5) * transform.e
+        
+        # 使用pcolormesh进行显示，降采样减少数据量；设置zorder为1，确保DEM在底层显示
+        dem_plot = ax.pcolormesh(
+            xs[::scale_factor], 
+            ys[::scale_factor], 
+            dem_data[::scale_factor, ::scale_factor],
+            cmap=cmap, 
+            vmin=vmin, 
+            vmax=vmax, 
+            alpha=0.5,
+            zorder=1
+        )
+        
+        # 添加色条，调整位置和大小避免与经度标签重叠
+        cbar = fig.colorbar(dem_plot, ax=ax, label='海拔 (米)', shrink=0.35, pad=0.08, 
+                            location='bottom', orientation='horizontal')
+        cbar.ax.set_xlabel('海拔 (米)', fontsize=10, fontproperties='SimHei')
+        cbar.ax.tick_params(labelsize=9)
+        
+        # 设置绘图区域范围与行政区域一致
+        ax.set_xlim(bounds[0], bounds[2])
+        ax.set_ylim(bounds[1], bounds[3])
+        
+        print(f"DEM显示成功，数据范围: {vmin}-{vmax}米")
+        return True
+    except Exception as e:
+        print(f"绘制DEM数据失败: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def _geometry_path(geometry):
+    """
+    把多边形 (含MultiPolygon与几何集合中的多边形部分) 转换为带孔洞的matplotlib路径
     
-    # 设置标题，确保中文正确显示
-    plt.title(f'无人机机库选址 (POI覆盖率: {coverage_ratio:.1f}%)', fontsize=14, pad=10, fontproperties='SimHei')
+    参数:
+        geometry: shapely几何形状
+        
+    返回:
+        path: 复合路径，没有多边形部分时为None
+    """
+    if geometry is None or geometry.is_empty:
+        return None
+    paths = []
+    for part in shapely.get_parts(geometry):
+        if isinstance(part, Polygon):
+            paths.append(Path(np.asarray(part.exterior.coords)[:, :2]))
+            paths.extend(Path(np.asarray(ring.coords)[:, :2]) for ring in part.interiors)
+        elif hasattr(part, 'geoms'):
+            sub_path = _geometry_path(part)
+            if sub_path is not None:
+                paths.append(sub_path)
+    return Path.make_compound_path(*paths) if paths else None
+
+class SnapshotRenderer:
+    """
+    可复用的选址快照绘制器
     
-    # 添加坐标轴标签，确保中文正确显示
-    plt.xlabel('经度', fontsize=12, fontproperties='SimHei')
-    plt.ylabel('纬度', fontsize=12, fontproperties='SimHei')
+    创建时把不随布局变化的部分 (行政区域、降采样的DEM与色条、坐标轴、图例) 渲染一次并缓存为RGBA底图，
+    POI与区域边界等需要盖在覆盖范围之上的静态图层也只创建一次。
+    每帧只恢复底图，再按zorder绘制覆盖圆、有效覆盖区域、库点位、标题与标签，
+    不再重复读取DEM、重新布局整张图或经过geopandas绘制。
+    输出与visualize的原实现相同: 14×12英寸、300 dpi、按内容裁剪边距的RGBA PNG。
+    """
     
-    # 调整坐标轴标签位置，避免与图例重叠
-    ax.xaxis.set_label_coords(0.5, -0.08)
+    def __init__(self, region_geometry, poi_gdf, drone_radius, dem_file=None, elevation_threshold=50, dpi=300):
+        """
+        初始化并渲染底图
+        
+        参数:
+            region_geometry: 区域几何形状 (经纬度)
+            poi_gdf: POI的GeoDataFrame
+            drone_radius: 无人机覆盖半径(米)
+            dem_file: DEM文件路径，为None时不绘制DEM
+            elevation_threshold: 海拔阈值(米)
+            dpi: 输出分辨率
+        """
+        self.region_geometry = region_geometry
+        self.drone_radius = drone_radius
+        self.drone_radius_degree = drone_radius / 111000  # 转为度
+        self.elevation_threshold = elevation_threshold
+        
+        # 设置中文字体与绘图风格，直接使用Agg画布，不经过pyplot的图形管理
+        _setup_fonts()
+        self.figure = Figure(figsize=(14, 12), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        ax = self.ax = self.figure.add_subplot()
+        self.font_prop = FontProperties(family='SimHei')
+        
+        # 行政区域底图
+        region_path = _geometry_path(region_geometry)
+        ax.add_patch(PathPatch(region_path, facecolor='#E6F3FF', edgecolor='#6BAED6', alpha=0.2, linewidth=0.8,
+                               zorder=1))
+        
+        # DEM图层；没有DEM时按区域边界向外扩展一个覆盖半径，使边缘的覆盖圆完整可见
+        bounds = region_geometry.bounds
+        dem_shown = dem_file is not None and _draw_dem(self.figure, ax, dem_file, bounds)
+        if not dem_shown:
+            pad = self.drone_radius_degree
+            ax.set_xlim(bounds[0] - pad, bounds[2] + pad)
+            ax.set_ylim(bounds[1] - pad, bounds[3] + pad)
+        # 与geopandas绘制经纬度数据时相同的纵横比 (1/cos(纬度))，覆盖圆显示为圆形
+        ax.set_aspect(1 / np.cos(np.radians((bounds[1] + bounds[3]) / 2)))
+        
+        # 盖在覆盖范围之上的静态图层 (POI与区域边界): 每帧只重绘，不重新创建
+        poi_xy = np.column_stack([poi_gdf.geometry.x, poi_gdf.geometry.y])
+        self.overlays = [ax.scatter(poi_xy[:, 0], poi_xy[:, 1], s=25, color='#9467bd', marker='o', edgecolors='white',
+                                    linewidths=0.8, alpha=0.8, zorder=4)]
+        if dem_shown:
+            self.overlays.append(ax.add_patch(PathPatch(region_path, facecolor='none', edgecolor='#3182bd', alpha=0.9,
+                                                        linewidth=1.2, zorder=6)))
+        
+        # 图例与坐标轴标签
+        # 图例放在底图中 (会被半透明的覆盖范围盖住，与原实现的zorder略有不同，但每帧省去图例的重新排版)
+        legend_elements = [
+            Patch(facecolor='#E6F3FF', edgecolor='#6BAED6', alpha=0.5, label='行政区域'),
+            Patch(facecolor='red', alpha=0.3, label='无人机覆盖范围'),
+            Patch(facecolor='#6BAED6', alpha=0.5, label='有效覆盖区域'),
+            Line2D([], [], color='#2ca02c', marker='o', markeredgecolor='white', linestyle='None', 
+                   markersize=8, label=f'无人机点位 (≤{elevation_threshold}米)'),
+            Line2D([], [], color='#d62728', marker='o', markeredgecolor='white', linestyle='None', 
+                   markersize=8, label=f'无人机点位 (>{elevation_threshold}米)'),
+            Line2D([], [], color='#9467bd', marker='o', markeredgecolor='white', linestyle='None', 
+                   markersize=6, label='POI点位')
+        ]
+        ax.legend(handles=legend_elements, loc='upper right', framealpha=0.9, edgecolor='#cccccc', 
+                  bbox_to_anchor=(0.98, 0.98), prop=self.font_prop)
+        ax.set_xlabel('经度', fontsize=12, fontproperties='SimHei')
+        ax.set_ylabel('纬度', fontsize=12, fontproperties='SimHei')
+        ax.xaxis.set_label_coords(0.5, -0.08)
+        
+        # 标题每帧更新: 按最长的标题确定裁剪范围，底图中不包含标题
+        self._set_title(100.0)
+        for artist in self.overlays + [ax.title]:
+            artist.set_animated(True)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        
+        # 与savefig(bbox_inches='tight', pad_inches=0.1)相同的裁剪范围 (像素，原点在左上角)
+        renderer = self.canvas.get_renderer()
+        tight = self.figure.get_tightbbox(renderer).padded(0.1)
+        height = int(self.figure.bbox.height)
+        width = int(self.figure.bbox.width)
+        self.crop = (slice(max(int(np.floor(height - tight.y1 * dpi)), 0), min(int(np.ceil(height - tight.y0 * dpi)), height)),
+                     slice(max(int(np.floor(tight.x0 * dpi)), 0), min(int(np.ceil(tight.x1 * dpi)), width)))
+    
+    def _set_title(self, coverage_ratio=None):
+        """
+        设置标题，coverage_ratio为None时表示没有有效的无人机位置
+        """
+        title = '无人机机库选址 (数据错误)' if coverage_ratio is None else f'无人机机库选址 (POI覆盖率: {coverage_ratio:.1f}%)'
+        self.ax.set_title(title, fontsize=14, pad=10, fontproperties='SimHei')
+    
+    def render(self, drone_positions, info=None, output_path=None):
+        """
+        绘制一帧
+        
+        参数:
+            drone_positions: 无人机库位置坐标 (经纬度)
+            info: 额外信息，与visualize相同 (可含drone_buffers、merged_buffer、drone_elevations与各项指标)
+            output_path: 输出路径，为None时不保存
+            
+        返回:
+            image: 裁剪后的RGBA图像 (画布缓冲区的视图，下一次绘制前有效)
+        """
+        ax = self.ax
+        info = info or {}
+        if drone_positions is None or len(drone_positions) == 0:
+            print("警告: 无人机位置数据为空")
+            drone_positions = np.zeros((0, 2))
+        positions = np.asarray(drone_positions, dtype=np.float64).reshape(-1, 2)
+        
+        # 使用传入的drone_buffers或计算新的
+        buffers = info.get('drone_buffers')
+        if not buffers:
+            buffers = list(shapely.buffer(shapely.points(positions), self.drone_radius_degree))
+        
+        # 有效覆盖区域 (合并的覆盖范围与行政区域的交集)
+        merged_buffer = info.get('merged_buffer')
+        if merged_buffer is None and buffers:
+            merged_buffer = shapely.union_all(buffers)
+        coverage_path = None
+        if merged_buffer is not None:
+            coverage_path = _geometry_path(merged_buffer.intersection(self.region_geometry))
+        
+        artists = [PolyCollection([np.asarray(buffer.exterior.coords)[:, :2] for buffer in buffers],
+                                  facecolors='#ff9999', edgecolors='#e74c3c', alpha=0.25, linewidths=0.6, zorder=2)]
+        ax.add_collection(artists[0], autolim=False)
+        if coverage_path is not None:
+            artists.append(ax.add_artist(PathPatch(coverage_path, facecolor='#6BAED6', edgecolor='#3182bd', alpha=0.4,
+                                                  linewidth=0.8, zorder=3)))
+        
+        # 库点位: 低于阈值为绿色，高于阈值为红色
+        elevations = np.asarray(info.get('drone_elevations', np.zeros(len(positions))), dtype=np.float64)
+        high = elevations > self.elevation_threshold
+        for mask, color in [(~high, '#2ca02c'), (high, '#d62728')]:
+            if mask.any():
+                artists.append(ax.scatter(positions[mask, 0], positions[mask, 1], s=120, color=color, marker='o',
+                                          edgecolors='white', linewidths=1.5, zorder=5))
+        
+        # 标题、点位标签与覆盖信息
+        coverage_ratio = info.get('poi_coverage', 0) * 100
+        area_coverage = info.get('area_coverage', 0) * 100
+        overlap_ratio = info.get('overlap_ratio', 0) * 100
+        elevation_penalty = info.get('elevation_penalty', 0)
+        self._set_title(coverage_ratio if len(positions) > 0 else None)
+        for i, (position, elev) in enumerate(zip(positions, elevations)):
+            artists.append(ax.annotate(f"D{i+1}\n{elev:.0f}m", xy=(position[0], position[1]), xytext=(7, 7), 
+                                       textcoords='offset points', fontsize=9, fontweight='bold',
+                                       bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="#cccccc", alpha=0.85),
+                                       zorder=10))
+        info_text = (
+            f'POI覆盖率: {coverage_ratio:.1f}%\n'
+            f'区域覆盖率: {area_coverage:.1f}%\n'
+            f'重叠率: {overlap_ratio:.1f}%\n'
+            f'覆盖POI点数: {info.get("poi_covered", 0)}\n'
+            f'无人机数量: {len(positions)}\n'
+            f'海拔惩罚: {elevation_penalty:.4f}'
+        )
+        artists.append(ax.annotate(info_text, xy=(0.98, 0.02), xycoords='axes fraction', 
+                                   xytext=(-10, 10), textcoords='offset points',
+                                   bbox=dict(boxstyle="round,pad=0.5", fc="white", ec="#cccccc", alpha=0.85),
+                                   ha='right', va='bottom', zorder=20, fontproperties=self.font_prop))
+        
+        # 在底图上按zorder绘制动态与静态覆盖图层
+        self.canvas.restore_region(self.background)
+        for artist in sorted(artists + self.overlays + [ax.title], key=lambda artist: artist.get_zorder()):
+            ax.draw_artist(artist)
+        image = np.asarray(self.canvas.buffer_rgba())[self.crop]
+        for artist in artists:
+            artist.remove()
+        
+        if output_path:
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            # 以最低压缩级别保存 (与默认级别相比编码更快，文件约大三分之一)
+            matplotlib.image.imsave(output_path, image, dpi=self.figure.dpi, pil_kwargs={'compress_level': 1})
+            print(f"已保存可视化结果到: {output_path}")
+        return image
+
+_renderers = {}
+
+def snapshot_renderer(region_geometry, poi_gdf, drone_radius):
+    """
+    获取 (并缓存) 给定区域、POI与覆盖半径的SnapshotRenderer
     
-    # 将点的坐标添加为标签，显示海拔信息，使用更精致的样式
-    for i, (point, elev) in enumerate(zip(drone_points, drone_elevations)):
-        plt.annotate(f"D{i+1}\n{elev:.0f}m", xy=(point.x, point.y), xytext=(7, 7), 
-                     textcoords='offset points', fontsize=9, fontweight='bold',
-                     bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="#cccccc", alpha=0.85),
-                     zorder=10)
+    参数:
+        region_geometry: 区域几何形状
+        poi_gdf: POI的GeoDataFrame
+        drone_radius: 无人机覆盖半径(米)
+        
+    返回:
+        renderer: SnapshotRenderer实例
+    """
+    key = (id(region_geometry), id(poi_gdf), drone_radius)
+    if key not in _renderers:
+        dem_file, elevation_threshold = _view_config()
+        renderer = SnapshotRenderer(region_geometry, poi_gdf, drone_radius, dem_file, elevation_threshold)
+        # 同时保存原对象，保证其id在缓存期间不会被复用
+        _renderers[key] = (renderer, region_geometry, poi_gdf)
+    return _renderers[key][0]
+
+def visualize(region_geometry, poi_gdf, drone_positions, drone_radius, output_path=None, info=None):
+    """
+    可视化无人机覆盖情况
     
-    # 添加覆盖信息文本，移到右下角并使用半透明背景，确保不遮挡DEM
-    info_text = (
-        f'POI覆盖率: {coverage_ratio:.1f}%\n'
-        f'区域覆盖率: {area_coverage:.1f}%\n'
-        f'重叠率: {overlap_ratio:.1f}%\n'
-        f'覆盖POI点数: {info["poi_covered"] if info and "poi_covered" in info else 0}\n'
-        f'无人机数量: {len(drone_points)}\n'
-        f'海拔惩罚: {elevation_penalty:.4f}'
-    )
-    plt.annotate(info_text, xy=(0.98, 0.02), xycoords='axes fraction', 
-                 xytext=(-10, 10), textcoords='offset points',
-                 bbox=dict(boxstyle="round,pad=0.5", fc="white", ec="#cccccc", alpha=0.85),
-                 ha='right', va='bottom', zorder=20, fontproperties=font_prop)
+    使用缓存底图的SnapshotRenderer，同一区域的后续调用只绘制随布局变化的图层。
     
-    # 保存或显示图形
-    if output_path:
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        plt.savefig(output_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"已保存可视化结果到: {output_path}")
-    else:
+    参数:
+        region_geometry: 区域几何形状
+        poi_gdf: POI的GeoDataFrame
+        drone_positions: 无人机库位置坐标
+        drone_radius: 无人机覆盖半径(米)
+        output_path: 输出路径，为None时交互显示
+        info: 额外信息
+    """
+    image = snapshot_renderer(region_geometry, poi_gdf, drone_radius).render(drone_positions, info, output_path)
+    if output_path is None:
+        # 交互显示绘制好的图像 (图像是画布缓冲区的视图，先复制)
+        plt.figure(figsize=(14, 12))
+        plt.imshow(image.copy())
+        plt.axis('off')
         plt.show()
 
 def visualize_training_progress(rewards, avg_rewards, output_path=None):
@@ -356,6 +418,32 @@ def visualize_training_progress(rewards, avg_rewards, output_path=None):
     else:
         plt.show()
 
+def visualize_refinement(curves, output_path=None):
+    """
+    可视化模拟退火的改进曲线
+    
+    参数:
+        curves: {名称: 形状为(P, 3)的 [已用时间, 当前目标值, 最好目标值] 数组}
+        output_path: 输出路径
+    """
+    plt.figure(figsize=(10, 5))
+    for name, curve in curves.items():
+        line, = plt.plot(curve[:, 0], curve[:, 2], label=f'{name} (best)')
+        plt.plot(curve[:, 0], curve[:, 1], color=line.get_color(), alpha=0.3, linewidth=0.8)
+    plt.xlabel('Time (s)')
+    plt.ylabel('Objective')
+    plt.title('Annealing Refinement')
+    plt.legend()
+    plt.grid(True)
+    
+    if output_path:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        plt.savefig(output_path, dpi=300, bbox_inches='tight')
+        plt.close()
+        print(f"已保存改进曲线到: {output_path}")
+    else:
+        plt.show()
+
 if __name__ == "__main__":
     # 测试可视化模块
     from configs import Config
@@ -377,6 +465,7 @@ if __name__ == "__main__":
         
         # 计算奖励和信息
         reward, info = env._compute_reward()
+        info = env.render_info(info)
         
         print(f"生成的无人机位置数量: {len(drone_positions)}")
         print(f"POI覆盖率: {info['poi_coverage']*100:.2f}%")
@@ -395,6 +484,20 @@ if __name__ == "__main__":
         # 再次显示输出路径
         print(f"可视化结果已保存到: {output_path}")
         
+        # 缓存底图后每帧的绘制与保存耗时 (第一次调用visualize时已渲染底图)
+        repeats = 3
+        renderer = snapshot_renderer(env.region_geometry, env.poi_gdf, config.DRONE_RADIUS)
+        start = time.perf_counter()
+        for i in range(repeats):
+            renderer.render(drone_positions, info)
+        render_time = (time.perf_counter() - start) / repeats
+        start = time.perf_counter()
+        for i in range(repeats):
+            visualize(env.region_geometry, env.poi_gdf, drone_positions, config.DRONE_RADIUS,
+                      os.path.join(output_dir, f"test_snapshot_{i}.png"), info)
+        frame_time = (time.perf_counter() - start) / repeats
+        print(f"缓存底图: 每帧 {frame_time:.2f} s (绘制 {render_time:.2f} s, PNG编码 {frame_time - render_time:.2f} s)")
+        
     except Exception as e:
         import traceback
         print(f"测试过程中出错: {e}")
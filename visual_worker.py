@@ -0,0 +1,251 @@
+import os
+import time
+import queue
+import traceback
+import multiprocessing as mp
+import numpy as np
+import shapely
+
+
+def frame_request(info, output_path):
+    """
+    把环境返回的信息整理成只含普通数组与数值的绘制请求
+
+    info中的shapely覆盖范围不发送到子进程，子进程按位置重新生成。
+
+    参数:
+        info: 环境返回的信息字典
+        output_path: 输出路径
+
+    返回:
+        request: 绘制请求字典
+    """
+    metrics = {key: float(info[key]) for key in ('poi_coverage', 'area_coverage', 'overlap_ratio', 'elevation_penalty')
+               if key in info}
+    if 'poi_covered' in info:
+        metrics['poi_covered'] = int(info['poi_covered'])
+    positions = np.asarray(info['drone_positions'], dtype=np.float64).reshape(-1, 2)
+    elevations = np.asarray(info.get('drone_elevations', np.zeros(len(positions))), dtype=np.float64)
+    return {'positions': positions, 'elevations': elevations, 'metrics': metrics, 'output_path': output_path}
+
+
+class FrameRenderer:
+    """
+    在当前进程中绘制训练快照
+
+    区域与POI只在初始化时构建一次；每帧按位置生成覆盖圆
+    (有米制坐标系时在米制坐标中生成真实的圆再转回经纬度，与DroneEnvironment.render_info一致)。
+    """
+
+    def __init__(self, scene):
+        """
+        初始化绘制器
+
+        参数:
+            scene: VisualWorker.scene_arrays返回的字典
+        """
+        import geopandas as gpd
+        from scenario.projection import MetricProjection
+
+        self.region_geometry = shapely.from_wkb(scene['region_wkb'])
+        self.poi_gdf = gpd.GeoDataFrame(geometry=gpd.points_from_xy(scene['poi_xs'], scene['poi_ys']), crs="EPSG:4326")
+        self.drone_radius = scene['drone_radius']
+        self.projection = MetricProjection(scene['crs']) if scene['crs'] else None
+
+    def buffers(self, positions):
+        """
+        生成覆盖圆 (经纬度)
+
+        参数:
+            positions: 形状为(D, 2)的经纬度位置
+
+        返回:
+            buffers: 覆盖圆列表
+        """
+        if self.projection is None:
+            return list(shapely.buffer(shapely.points(positions), self.drone_radius / 111000))
+        circles = shapely.buffer(shapely.points(self.projection.forward(positions)), self.drone_radius)
+        return [self.projection.inverse_geometry(circle) for circle in circles]
+
+    def render(self, request):
+        """
+        绘制一帧
+
+        参数:
+            request: frame_request返回的绘制请求
+        """
+        from view import visualize
+
+        positions = request['positions']
+        buffers = self.buffers(positions)
+        info = dict(request['metrics'])
+        info['drone_buffers'] = buffers
+        info['merged_buffer'] = shapely.union_all(buffers) if buffers else None
+        info['drone_elevations'] = request['elevations'].tolist()
+        visualize(self.region_geometry, self.poi_gdf, positions, self.drone_radius, request['output_path'], info)
+
+
+def _visual_worker(worker_index, scene, requests, counters):
+    """
+    可视化子进程主循环: 从队列中取出绘制请求并保存图片，收到None时退出
+
+    参数:
+        worker_index: 子进程编号
+        scene: 场景数组
+        requests: 绘制请求队列
+        counters: 共享计数 [已绘制帧数, 绘制总耗时]
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    renderer = FrameRenderer(scene)
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        start = time.perf_counter()
+        try:
+            renderer.render(request)
+        except Exception:
+            print(f"可视化子进程 {worker_index} 绘制 {request['output_path']} 失败:\n{traceback.format_exc()}")
+            continue
+        with counters.get_lock():
+            counters[0] += 1
+            counters[1] += time.perf_counter() - start
+
+
+class VisualWorker:
+    """
+    训练快照的后台可视化
+
+    绘制请求放入有界队列，由独立的子进程池绘制并保存；训练线程只发送位置与指标等普通数组，不等待绘制完成。
+    队列已满时丢弃最早的未绘制帧，保证训练吞吐量不受绘制速度影响，最新的快照总能被绘制。
+    num_workers为0时在训练线程中同步绘制。
+    """
+
+    def __init__(self, scenario, config, num_workers=1, queue_size=2):
+        """
+        初始化并启动子进程
+
+        参数:
+            scenario: 经纬度坐标的Scenario实例
+            config: 配置类实例
+            num_workers: 子进程数量，为0时同步绘制
+            queue_size: 排队等待绘制的帧数上限
+        """
+        scene = self.scene_arrays(scenario, config)
+        self.num_workers = num_workers
+        self.num_submitted = 0
+        self.num_dropped = 0
+        self.submit_time = 0.0
+        self.renderer = None
+        self.processes = []
+        if num_workers == 0:
+            self.renderer = FrameRenderer(scene)
+            self.counters = [0, 0.0]
+            return
+
+        # spawn方式，子进程不继承父进程中的torch等状态
+        context = mp.get_context('spawn')
+        self.requests = context.Queue(maxsize=max(queue_size, 1))
+        self.counters = context.Array('d', 2)
+        for worker_index in range(num_workers):
+            process = context.Process(target=_visual_worker, args=(worker_index, scene, self.requests, self.counters),
+                                      daemon=True)
+            process.start()
+            self.processes.append(process)
+
+    @staticmethod
+    def scene_arrays(scenario, config):
+        """
+        提取绘制所需的场景数据 (区域WKB、POI经纬度、覆盖半径与米制坐标系)
+
+        参数:
+            scenario: 经纬度坐标的Scenario实例
+            config: 配置类实例
+
+        返回:
+            scene: 只含字节串、数组与数值的字典
+        """
+        reward_scenario = scenario.for_reward(config)
+        return {
+            'region_wkb': shapely.to_wkb(scenario.region_geometry),
+            'poi_xs': np.asarray(scenario.poi_kernel.xs),
+            'poi_ys': np.asarray(scenario.poi_kernel.ys),
+            'drone_radius': float(config.DRONE_RADIUS),
+            'crs': reward_scenario.projection.crs.to_string() if reward_scenario.projection is not None else ''
+        }
+
+    def submit(self, info, output_path):
+        """
+        提交一帧，立即返回
+
+        参数:
+            info: 环境返回的信息字典
+            output_path: 输出路径
+        """
+        start = time.perf_counter()
+        request = frame_request(info, output_path)
+        self.num_submitted += 1
+        if self.renderer is not None:
+            self.renderer.render(request)
+            self.counters[0] += 1
+        else:
+            while True:
+                try:
+                    self.requests.put_nowait(request)
+                    break
+                except queue.Full:
+                    # 丢弃最早的未绘制帧后重试 (子进程可能恰好取走了一帧)
+                    try:
+                        self.requests.get_nowait()
+                        self.num_dropped += 1
+                    except queue.Empty:
+                        pass
+        self.submit_time += time.perf_counter() - start
+
+    @property
+    def num_rendered(self):
+        """
+        已绘制的帧数
+        """
+        return int(self.counters[0])
+
+    def close(self):
+        """
+        绘制完队列中剩余的帧并停止子进程
+        """
+        for _ in self.processes:
+            self.requests.put(None)
+        for process in self.processes:
+            process.join()
+        self.processes = []
+        if self.num_dropped:
+            print(f"可视化: 提交 {self.num_submitted} 帧, 绘制 {self.num_rendered} 帧, 丢弃 {self.num_dropped} 帧")
+
+
+if __name__ == "__main__":
+    # 训练线程上同步绘制与提交到后台子进程的耗时比较
+    import tempfile
+    from configs import Config
+    from env import DroneEnvironment
+
+    config = Config()
+    env = DroneEnvironment(config)
+    env.reset(seed=config.SEED)
+    _, _, _, _, info = env.step(env.action_space.sample())
+
+    frames = 6
+    with tempfile.TemporaryDirectory() as directory:
+        results = {}
+        for num_workers in [0, 1]:
+            worker = VisualWorker(env.scenario, config, num_workers=num_workers, queue_size=2)
+            start = time.perf_counter()
+            for i in range(frames):
+                worker.submit(info, os.path.join(directory, f"workers{num_workers}_{i}.png"))
+            submit_ms = (time.perf_counter() - start) / frames * 1000
+            worker.close()
+            total = time.perf_counter() - start
+            results[num_workers] = (submit_ms, worker.num_rendered, worker.num_dropped, total)
+        for num_workers, (submit_ms, rendered, dropped, total) in results.items():
+            name = '同步绘制' if num_workers == 0 else f'{num_workers}个子进程'
+            print(f"{name}: 训练线程每帧 {submit_ms:.1f} ms, 绘制 {rendered} 帧, 丢弃 {dropped} 帧, 含收尾共 {total:.1f} s")